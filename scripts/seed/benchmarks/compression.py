@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+"""Recall vs. memory for reduced-dimension embeddings and vector compression.
+
+Ground truth is exact cosine top-k over the full-dimension vectors. Each
+variant truncates to ``dims`` (Matryoshka-style, re-normalised) and optionally
+compresses the vectors the way Weaviate's quantizers do:
+
+- ``sq``: 8-bit scalar quantisation per dimension
+- ``bq``: 1 bit per dimension (sign), compared with Hamming distance
+- ``pq``: product quantisation with 256 centroids per segment
+
+Candidates from the compressed codes are rescored against the uncompressed
+vectors, as Weaviate does, using ``--rescore`` candidates. Recall is measured with exact search over the
+compressed codes, so it isolates compression loss from HNSW graph loss.
+
+Run from the seed directory, either on synthetic vectors or on real ones
+exported to a ``.npy`` file (N x D float32):
+
+    python -m benchmarks.compression --dims 3072 1024 512 256
+    python -m benchmarks.compression --vectors vectors.npy
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Bytes per neighbour link and links per node on HNSW layer 0 (2 * maxConnections).
+_LINK_BYTES = 8
+_DEFAULT_MAX_CONNECTIONS = 32
+
+
+def synthetic_vectors(count: int, dims: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors whose variance decays along the dimensions.
+
+    Matryoshka-trained models front-load information into the leading
+    dimensions; a decaying spectrum mimics that so truncation behaves
+    realistically without calling the embedding API.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = rng.standard_normal((max(8, count // 200), dims)).astype(np.float32)
+    assignment = rng.integers(0, len(clusters), size=count)
+    vectors = clusters[assignment] + 0.6 * rng.standard_normal((count, dims)).astype(np.float32)
+    return _normalise(vectors * spectrum(dims)[None, :])
+
+
+def spectrum(dims: int) -> np.ndarray:
+    return 1.0 / (1.0 + np.arange(dims, dtype=np.float32) / 32.0)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, candidates, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row_found) & set(row_truth)) for row_found, row_truth in zip(found, truth))
+    return hits / truth.size
+
+
+def _rescore(
+    candidates: np.ndarray, base: np.ndarray, queries: np.ndarray, k: int
+) -> np.ndarray:
+    exact = np.einsum("qd,qcd->qc", queries, base[candidates])
+    order = exact.argsort(axis=1)[:, ::-1][:, :k]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def search_sq(base: np.ndarray, queries: np.ndarray, k: int, rescore: int) -> np.ndarray:
+    low, high = base.min(axis=0), base.max(axis=0)
+    scale = np.where(high > low, (high - low) / 255.0, 1.0)
+    codes = np.round((base - low) / scale).astype(np.uint8)
+    decoded = codes.astype(np.float32) * scale + low
+    candidates = _top_k(queries @ decoded.T, rescore)
+    return _rescore(candidates, base, queries, k)
+
+
+def search_bq(base: np.ndarray, queries: np.ndarray, k: int, rescore: int) -> np.ndarray:
+    base_bits = np.packbits(base > 0, axis=1)
+    query_bits = np.packbits(queries > 0, axis=1)
+    popcount = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+    distances = np.stack(
+        [popcount[np.bitwise_xor(base_bits, row)].sum(axis=1) for row in query_bits]
+    )
+    candidates = _top_k(-distances.astype(np.float32), rescore)
+    return _rescore(candidates, base, queries, k)
+
+
+def search_pq(
+    base: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rescore: int,
+    segments: int,
+    seed: int = 0,
+) -> np.ndarray:
+    dims = base.shape[1]
+    segments = max(1, min(segments, dims))
+    while dims % segments:
+        segments -= 1
+    width = dims // segments
+    rng = np.random.default_rng(seed)
+    centroids = min(256, len(base))
+    codes = np.empty((len(base), segments), dtype=np.int32)
+    tables = np.empty((len(queries), segments, centroids), dtype=np.float32)
+    for segment in range(segments):
+        part = base[:, segment * width : (segment + 1) * width]
+        codebook = part[rng.choice(len(part), centroids, replace=False)]
+        for _ in range(8):
+            assignment = _nearest(part, codebook)
+            for index in range(centroids):
+                members = part[assignment == index]
+                if len(members):
+                    codebook[index] = members.mean(axis=0)
+        codes[:, segment] = _nearest(part, codebook)
+        tables[:, segment, :] = queries[:, segment * width : (segment + 1) * width] @ codebook.T
+    scores = np.zeros((len(queries), len(base)), dtype=np.float32)
+    for segment in range(segments):
+        scores += tables[:, segment, codes[:, segment]]
+    candidates = _top_k(scores, rescore)
+    return _rescore(candidates, base, queries, k)
+
+
+def _nearest(points: np.ndarray, codebook: np.ndarray) -> np.ndarray:
+    distances = (
+        (points**2).sum(axis=1, keepdims=True)
+        - 2 * points @ codebook.T
+        + (codebook**2).sum(axis=1)[None, :]
+    )
+    return distances.argmin(axis=1)
+
+
+def vector_bytes(dims: int, compression: Optional[str], segments: int) -> float:
+    if compression == "sq":
+        return float(dims)
+    if compression == "bq":
+        return dims / 8.0
+    if compression == "pq":
+        return float(segments)
+    return dims * 4.0
+
+
+def run(
+    vectors: np.ndarray,
+    dims_list: List[int],
+    compressions: List[Optional[str]],
+    queries: int,
+    k: int,
+    rescore: int,
+    pq_ratio: int,
+    max_connections: int,
+    synthetic: bool = False,
+) -> List[Dict[str, object]]:
+    rng = np.random.default_rng(1)
+    query_ids = rng.choice(len(vectors), size=queries, replace=False)
+    # Queries are perturbed copies of stored vectors, like paraphrased prompts.
+    noise = rng.standard_normal((queries, vectors.shape[1])).astype(np.float32)
+    if synthetic:
+        noise *= spectrum(vectors.shape[1])[None, :]
+    full_queries = _normalise(vectors[query_ids] + 0.02 * noise)
+    truth = _top_k(full_queries @ vectors.T, k)
+
+    results: List[Dict[str, object]] = []
+    for dims in dims_list:
+        base = _normalise(vectors[:, :dims])
+        query = _normalise(full_queries[:, :dims])
+        for compression in compressions:
+            segments = max(1, dims // pq_ratio)
+            started = time.perf_counter()
+            if compression is None:
+                found = _top_k(query @ base.T, k)
+            elif compression == "sq":
+                found = search_sq(base, query, k, rescore)
+            elif compression == "bq":
+                found = search_bq(base, query, k, rescore)
+            else:
+                found = search_pq(base, query, k, rescore, segments)
+            elapsed = time.perf_counter() - started
+            per_vector = vector_bytes(dims, compression, segments)
+            graph = 2 * max_connections * _LINK_BYTES
+            results.append(
+                {
+                    "dims": dims,
+                    "compression": compression or "none",
+                    "recall": _recall(found, truth),
+                    "bytes_per_object": per_vector + graph,
+                    "gib_per_million": (per_vector + graph) * 1_000_000 / 2**30,
+                    "seconds": elapsed,
+                }
+            )
+    return results
+
+
+def _print(results: List[Dict[str, object]], k: int) -> None:
+    baseline = next(
+        float(row["bytes_per_object"]) for row in results if row["compression"] == "none"
+    )
+    print(f"{'dims':>6} {'compression':>11} {f'recall@{k}':>10} {'bytes/obj':>10} "
+          f"{'GiB/1M':>8} {'vs full':>8}")
+    for row in results:
+        print(
+            f"{row['dims']:>6} {row['compression']:>11} {row['recall']:>10.3f} "
+            f"{row['bytes_per_object']:>10.0f} {row['gib_per_million']:>8.2f} "
+            f"{baseline / float(row['bytes_per_object']):>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help="Optional .npy file of full-dimension vectors.")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--full-dims", type=int, default=3072)
+    parser.add_argument("--dims", type=int, nargs="+", default=[3072, 1536, 1024, 512, 256])
+    parser.add_argument("--compression", nargs="+", default=["none", "sq", "bq", "pq"])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=200)
+    parser.add_argument(
+        "--pq-ratio", type=int, default=8, help="Dimensions per PQ segment (segments = dims / ratio)."
+    )
+    parser.add_argument("--max-connections", type=int, default=_DEFAULT_MAX_CONNECTIONS)
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = _normalise(np.load(args.vectors, mmap_mode="r").astype(np.float32))
+    else:
+        vectors = synthetic_vectors(args.count, args.full_dims)
+    dims_list = [dims for dims in args.dims if dims <= vectors.shape[1]]
+    compressions = [None if name == "none" else name for name in args.compression]
+    if None not in compressions:
+        compressions.insert(0, None)
+
+    print(f"{len(vectors):,} vectors x {vectors.shape[1]} dims, {args.queries} queries")
+    results = run(
+        vectors,
+        dims_list,
+        compressions,
+        queries=args.queries,
+        k=args.k,
+        rescore=args.rescore,
+        pq_ratio=args.pq_ratio,
+        max_connections=args.max_connections,
+        synthetic=not args.vectors,
+    )
+    _print(results, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Offline stand-ins for the services the seed script talks to.
+
+- :func:`synthetic_samples` builds translated samples from synthetic records.
+- :class:`FakeEmbeddingsServer` serves the OpenAI ``/v1/embeddings`` endpoint
+  from a separate process, with configurable latency and per-minute request
+  and token limits (answered with HTTP 429, like the real API).
+- :class:`FakeCollection` accepts ``collection.data.insert_many`` calls in
+  memory, with optional per-request latency, and can hand the objects back
+  through ``collection.iterator`` like a cursor over a real collection.
+
+None of these touch the network beyond localhost, so throughput can be
+measured without an OpenAI key or a Weaviate cluster.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import threading
+import time
+import urllib.request
+import zlib
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+import orjson
+
+from benchmarks.translate import build_table
+from src.config import DatasetConfig
+
+SampleRecord = Dict[str, str]
+
+# Upper bound on the retry-after spread, in multiples of the minimum wait.
+_RETRY_SPREAD = 4
+
+
+def synthetic_samples(config: DatasetConfig, count: int, seed: int = 0) -> List[SampleRecord]:
+    """``count`` translated samples shaped like the configured dataset."""
+    samples: List[SampleRecord] = []
+    rows = count
+    while len(samples) < count:
+        # About 2% of synthetic records are unusable; build a few extra.
+        table = config.translate_batch(build_table(rows + rows // 20 + 10, seed=seed))
+        samples = table.to_pylist()
+        rows *= 2
+    return samples[:count]
+
+
+@dataclass
+class FakeEmbeddingsLimits:
+    """Behaviour of the fake embeddings endpoint.
+
+    A request takes ``latency + latency_per_input * len(input)`` seconds.
+    ``requests_per_minute`` and ``tokens_per_minute`` are enforced with token
+    buckets holding one second's worth of budget; tokens are estimated as
+    four characters each. ``None`` disables a limit.
+    """
+
+    latency: float = 0.05
+    latency_per_input: float = 0.0
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    dimensions: int = 1536
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: int) -> None:
+        self._rate = per_minute / 60.0
+        self._capacity = max(1.0, self._rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Spend ``amount``; returns 0 or the seconds to wait before retrying."""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        amount = min(amount, self._capacity)
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self._rate
+
+
+class _EmbeddingsState:
+    def __init__(self, limits: FakeEmbeddingsLimits) -> None:
+        self.limits = limits
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.rate_limited = 0
+        self.inputs = 0
+        self.bytes_sent = 0
+        self.requests_bucket = (
+            _TokenBucket(self.limits.requests_per_minute) if self.limits.requests_per_minute else None
+        )
+        self.tokens_bucket = (
+            _TokenBucket(self.limits.tokens_per_minute) if self.limits.tokens_per_minute else None
+        )
+
+    def admit(self, tokens: int) -> float:
+        with self.lock:
+            self.requests += 1
+            wait = 0.0
+            if self.requests_bucket is not None:
+                wait = max(wait, self.requests_bucket.take(1))
+            if self.tokens_bucket is not None and not wait:
+                wait = max(wait, self.tokens_bucket.take(tokens))
+            if wait:
+                self.rate_limited += 1
+            return wait
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "inputs": self.inputs,
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+def _handler(state: _EmbeddingsState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") == "/stats":
+                self._send(200, json.dumps(state.stats()).encode())
+            else:
+                self._send(404, b"{}")
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.rstrip("/") == "/reset":
+                state.reset()
+                self._send(200, b"{}")
+                return
+            if not self.path.endswith("/embeddings"):
+                self._send(404, b"{}")
+                return
+            request = orjson.loads(body)
+            texts = request["input"]
+            texts = [texts] if isinstance(texts, str) else texts
+            wait = state.admit(sum(len(text) for text in texts) // 4 + 1)
+            if wait:
+                error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+                # Spread the advised waits so rejected clients do not retry in lockstep.
+                retry_after = wait * (1.0 + random.random() * _RETRY_SPREAD)
+                self._send(429, orjson.dumps(error), {"retry-after-ms": str(int(retry_after * 1000) + 1)})
+                return
+            limits = state.limits
+            time.sleep(limits.latency + limits.latency_per_input * len(texts))
+            dimensions = request.get("dimensions") or limits.dimensions
+            vectors = _vectors(texts, dimensions)
+            if request.get("encoding_format") == "base64":
+                embeddings: List[Any] = [base64.b64encode(row.tobytes()).decode() for row in vectors]
+            else:
+                embeddings = list(vectors)
+            payload = orjson.dumps(
+                {
+                    "object": "list",
+                    "model": request["model"],
+                    "data": [
+                        {"object": "embedding", "index": index, "embedding": embedding}
+                        for index, embedding in enumerate(embeddings)
+                    ],
+                    "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)},
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+            with state.lock:
+                state.inputs += len(texts)
+                state.bytes_sent += len(payload)
+            self._send(200, payload)
+
+        def _send(self, status: int, payload: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args: object) -> None:
+            return None
+
+    return Handler
+
+
+def _vectors(texts: List[str], dimensions: int) -> np.ndarray:
+    # Seeded from the inputs so repeated runs return identical vectors.
+    seed = [zlib.crc32(text.encode("utf-8")) for text in texts]
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((len(texts), dimensions), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients hang up mid-response when a benchmark run is torn down.
+        pass
+
+
+def _serve(limits: FakeEmbeddingsLimits, port_sender: Any) -> None:
+    server = _Server(("127.0.0.1", 0), _handler(_EmbeddingsState(limits)))
+    port_sender.send(server.server_address[1])
+    server.serve_forever()
+
+
+class FakeEmbeddingsServer:
+    """OpenAI-compatible embeddings endpoint running in its own process.
+
+    Use as a context manager; :attr:`base_url` goes to the OpenAI client.
+    Running outside the benchmarked process keeps the server's CPU time and
+    memory out of the measurements.
+    """
+
+    def __init__(self, limits: Optional[FakeEmbeddingsLimits] = None) -> None:
+        self.limits = limits or FakeEmbeddingsLimits()
+        self._process: Optional[Any] = None
+        self._port: Optional[int] = None
+
+    def __enter__(self) -> "FakeEmbeddingsServer":
+        context = get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(target=_serve, args=(self.limits, sender), daemon=True)
+        self._process.start()
+        if not receiver.poll(30):
+            raise RuntimeError("Fake embeddings server did not start.")
+        self._port = receiver.recv()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._port}/v1"
+
+    def reset(self) -> None:
+        self._call("POST", "/reset")
+
+    def stats(self) -> Dict[str, int]:
+        return self._call("GET", "/stats")
+
+    def _call(self, method: str, path: str) -> Dict[str, int]:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self._port}{path}", data=b"{}" if method == "POST" else None, method=method
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+
+
+@dataclass
+class _ErrorObject:
+    message: str
+
+
+@dataclass
+class _InsertResult:
+    errors: Dict[int, _ErrorObject] = field(default_factory=dict)
+
+
+class _FakeData:
+    def __init__(self, collection: "FakeCollection") -> None:
+        self._collection = collection
+
+    def insert_many(self, objects: List[Any]) -> _InsertResult:
+        return self._collection._insert_many(objects)
+
+
+class FakeCollection:
+    """In-memory replacement for a Weaviate collection's ``data.insert_many``.
+
+    Each request sleeps ``latency + latency_per_object * len(objects)`` and
+    packs every vector into float32 bytes, as the gRPC client does. With
+    ``keep_objects`` the properties and packed vectors are stored by UUID;
+    otherwise only the UUIDs are kept, so the benchmarked process's memory
+    reflects the pipeline rather than the fake database. Kept objects can be
+    read back with ``iterator`` and described by ``config.get()``.
+    """
+
+    def __init__(
+        self,
+        name: str = "BenchmarkSample",
+        *,
+        latency: float = 0.0,
+        latency_per_object: float = 0.0,
+        keep_objects: bool = False,
+    ) -> None:
+        self.name = name
+        self.data = _FakeData(self)
+        self.config = SimpleNamespace(get=self._config)
+        self._latency = latency
+        self._latency_per_object = latency_per_object
+        self._keep_objects = keep_objects
+        self._lock = threading.Lock()
+        self.objects: Dict[UUID, Tuple[Dict[str, Any], bytes]] = {}
+        self.uuids: Set[UUID] = set()
+        self.requests = 0
+        self.vector_bytes = 0
+
+    def _insert_many(self, objects: List[Any]) -> _InsertResult:
+        time.sleep(self._latency + self._latency_per_object * len(objects))
+        packed = [np.asarray(obj.vector, dtype=np.float32).tobytes() for obj in objects]
+        with self._lock:
+            self.requests += 1
+            self.vector_bytes += sum(len(vector) for vector in packed)
+            for obj, vector in zip(objects, packed):
+                self.uuids.add(obj.uuid)
+                if self._keep_objects:
+                    self.objects[obj.uuid] = (obj.properties, vector)
+        return _InsertResult()
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    def iterator(
+        self, include_vector: bool = False, return_properties: Optional[List[str]] = None
+    ) -> Iterator[Any]:
+        for uuid, (properties, vector) in list(self.objects.items()):
+            if return_properties is not None:
+                properties = {name: properties.get(name) for name in return_properties}
+            yield SimpleNamespace(
+                uuid=uuid,
+                properties=properties,
+                vector={"default": np.frombuffer(vector, dtype=np.float32).tolist()}
+                if include_vector
+                else {},
+            )
+
+    def _config(self) -> SimpleNamespace:
+        names = sorted({name for properties, _ in self.objects.values() for name in properties})
+        return SimpleNamespace(
+            name=self.name,
+            description=f"Fake collection {self.name}.",
+            properties=[SimpleNamespace(name=name) for name in names],
+            multi_tenancy_config=SimpleNamespace(enabled=False),
+        )
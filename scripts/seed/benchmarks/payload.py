@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""Storage and transfer savings of compressed ``output_reference`` values.
+
+Encodes each sample's ``output_reference`` with ``PayloadCompressor`` at
+every ``--levels`` zstd level and reports the bytes stored per object, the
+bytes a semantic split query of ``--limit`` hits pulls over the wire for that
+property, and compression and decompression speed. Samples are synthetic by
+default; ``--from-dataset`` streams the configured Hugging Face dataset
+instead, which gives realistic ratios for long chain-of-thought responses.
+
+Run from the seed directory:
+
+    python -m benchmarks.payload --samples 20000 --levels 1 3 9 19
+    python -m benchmarks.payload --from-dataset --samples 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from itertools import islice
+from typing import Any, Dict, List
+
+from benchmarks.fakes import synthetic_samples
+from src.config import parse_dataset_config
+from src.payload import PayloadCompressor, decompress_text
+from src.utils import load_samples
+
+SampleRecord = Dict[str, str]
+
+
+def measure(values: List[str], level: int, limit: int) -> Dict[str, Any]:
+    compressor = PayloadCompressor(["value"], level=level)
+    started = time.perf_counter()
+    encoded = [compressor.encode({"value": value})["value"] for value in values]
+    compress_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for value in encoded:
+        decompress_text(value)
+    decompress_seconds = time.perf_counter() - started
+
+    raw_mb = compressor.raw_bytes / 2**20
+    count = max(1, len(values))
+    return {
+        "level": level,
+        "raw_mb": round(raw_mb, 2),
+        "stored_mb": round(compressor.stored_bytes / 2**20, 2),
+        "ratio": round(compressor.ratio, 2),
+        "compressed_share": round(sum(value.startswith("zstd:") for value in encoded) / count, 3),
+        "raw_bytes_per_object": compressor.raw_bytes // count,
+        "stored_bytes_per_object": compressor.stored_bytes // count,
+        "query_raw_kb": round(compressor.raw_bytes / count * limit / 1024, 1),
+        "query_stored_kb": round(compressor.stored_bytes / count * limit / 1024, 1),
+        "compress_mb_per_second": round(raw_mb / compress_seconds, 1) if compress_seconds else 0.0,
+        "decompress_mb_per_second": (
+            round(raw_mb / decompress_seconds, 1) if decompress_seconds else 0.0
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 9, 19])
+    parser.add_argument("--limit", type=int, default=200, help="Hits per semantic split query.")
+    parser.add_argument("--from-dataset", action="store_true", help="Use the configured dataset.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    config = parse_dataset_config()
+    if args.from_dataset:
+        samples: List[SampleRecord] = list(islice(load_samples(config), args.samples))
+    else:
+        samples = synthetic_samples(config, args.samples)
+    values = [sample[config.expected_output_property] for sample in samples]
+    print(f"{len(values):,} output_reference values, {args.limit} hits per query")
+
+    results = [measure(values, level, args.limit) for level in args.levels]
+    print(
+        f"{'level':>5} {'raw MB':>8} {'stored':>8} {'ratio':>6} {'zstd %':>7} {'B/obj':>8} "
+        f"{'query KB':>14} {'comp MB/s':>10} {'dec MB/s':>9}"
+    )
+    for row in results:
+        print(
+            f"{row['level']:>5} {row['raw_mb']:>8.1f} {row['stored_mb']:>8.1f} {row['ratio']:>5.2f}x "
+            f"{row['compressed_share']:>7.1%} {row['stored_bytes_per_object']:>8,} "
+            f"{row['query_raw_kb']:>6.0f} -> {row['query_stored_kb']:<5.0f} "
+            f"{row['compress_mb_per_second']:>10.1f} {row['decompress_mb_per_second']:>9.1f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"arguments": vars(args), "results": results}, handle, indent=2)
+        print(f"Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""Inverted-index cost of the collection schema, before and after tuning.
+
+Compares a baseline schema, in which every property is searchable and
+filterable, with the configured ``DEFAULT_PROPERTY_INDEXING``. By default the
+comparison is offline: synthetic samples are tokenised the way Weaviate's
+``word`` tokenisation does, and the postings and approximate bytes each
+property adds to the BM25 (searchable) and roaring-set (filterable) indexes
+are counted.
+
+With ``--weaviate-url`` the same samples, with random vectors, are also
+ingested into a scratch collection per schema on a local Weaviate through
+``upsert_samples``, reporting ingest time and, with ``--metrics-url`` (the
+Prometheus endpoint, ``PROMETHEUS_MONITORING_ENABLED=true``), the growth of
+Weaviate's Go heap:
+
+    python -m benchmarks.schema --samples 50000
+    python -m benchmarks.schema --samples 20000 --weaviate-url http://localhost:8080 \\
+        --metrics-url http://localhost:2112/metrics
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import weaviate
+
+from benchmarks.fakes import synthetic_samples
+from src.config import (
+    DEFAULT_BATCH_SIZE,
+    PropertyIndexConfig,
+    SchemaConfig,
+    parse_dataset_config,
+    parse_schema_config,
+)
+from src.ingest import ensure_collection, tenant_collection, upsert_samples
+
+SampleRecord = Dict[str, str]
+
+# Weaviate's "word" tokenisation: lower-cased runs of letters and digits.
+_WORD = re.compile(r"[^\W_]+")
+# Rough per-posting sizes: BM25 postings hold a doc id, term frequency and
+# property length; roaring-set postings average a few bytes per doc id.
+_SEARCHABLE_POSTING_BYTES = 16
+_FILTERABLE_POSTING_BYTES = 4
+_HEAP_METRIC = "go_memstats_heap_inuse_bytes"
+
+
+def index_cost(
+    samples: List[SampleRecord], schema: SchemaConfig
+) -> Dict[str, Dict[str, int]]:
+    """Postings and approximate index bytes per property under ``schema``."""
+    costs: Dict[str, Dict[str, int]] = {}
+    for name in samples[0]:
+        terms: Counter = Counter()
+        postings = 0
+        for sample in samples:
+            unique = set(_WORD.findall(sample[name].lower()))
+            postings += len(unique)
+            terms.update(unique)
+        dictionary = sum(len(term.encode("utf-8")) for term in terms)
+        index = schema.property_index(name)
+        searchable = postings * _SEARCHABLE_POSTING_BYTES + dictionary if index.searchable else 0
+        filterable = postings * _FILTERABLE_POSTING_BYTES + dictionary if index.filterable else 0
+        costs[name] = {
+            "postings": postings if index.searchable or index.filterable else 0,
+            "terms": len(terms),
+            "searchable_bytes": searchable,
+            "filterable_bytes": filterable,
+        }
+    return costs
+
+
+def _baseline(schema: SchemaConfig) -> SchemaConfig:
+    return SchemaConfig(
+        property_indexing={name: PropertyIndexConfig() for name in schema.property_indexing},
+        multi_tenancy=schema.multi_tenancy,
+    )
+
+
+def _with_vectors(
+    samples: List[SampleRecord], dims: int, seed: int = 0
+) -> Iterator[Tuple[SampleRecord, List[float]]]:
+    rng = np.random.default_rng(seed)
+    for start in range(0, len(samples), 1000):
+        chunk = samples[start : start + 1000]
+        vectors = rng.standard_normal((len(chunk), dims), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        yield from zip(chunk, vectors.tolist())
+
+
+def _heap_bytes(metrics_url: Optional[str]) -> Optional[float]:
+    if not metrics_url:
+        return None
+    with urllib.request.urlopen(metrics_url, timeout=10) as response:
+        for line in response.read().decode("utf-8").splitlines():
+            if line.startswith(_HEAP_METRIC + " "):
+                return float(line.split()[1])
+    return None
+
+
+def ingest(
+    client: Any,
+    name: str,
+    samples: List[SampleRecord],
+    schema: SchemaConfig,
+    *,
+    dims: int,
+    metrics_url: Optional[str],
+) -> Dict[str, Any]:
+    """Ingest ``samples`` into a fresh collection ``name``; the collection is deleted afterwards."""
+    config = parse_dataset_config()
+    client.collections.delete(name)
+    collection = ensure_collection(
+        client,
+        collection_name=name,
+        text_property=config.text_property,
+        metadata_properties=[config.task_property, config.expected_output_property],
+        schema_config=schema,
+    )
+    if schema.multi_tenancy:
+        collection = tenant_collection(collection, config.dataset_name)
+    heap_before = _heap_bytes(metrics_url)
+    started = time.perf_counter()
+    try:
+        report = upsert_samples(collection, _with_vectors(samples, dims), DEFAULT_BATCH_SIZE)
+        elapsed = time.perf_counter() - started
+        heap_after = _heap_bytes(metrics_url)
+    finally:
+        client.collections.delete(name)
+    result: Dict[str, Any] = {
+        "uploaded": report.uploaded,
+        "failed": report.failed,
+        "seconds": round(elapsed, 3),
+        "objects_per_second": round(report.uploaded / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    if heap_before is not None and heap_after is not None:
+        result["heap_growth_mb"] = round((heap_after - heap_before) / 2**20, 1)
+    return result
+
+
+def _print_costs(label: str, costs: Dict[str, Dict[str, int]]) -> None:
+    total = sum(cost["searchable_bytes"] + cost["filterable_bytes"] for cost in costs.values())
+    print(f"{label}: ~{total / 2**20:.1f} MB of inverted index")
+    for name, cost in costs.items():
+        print(
+            f"  {name:<18} {cost['postings']:>10,} postings {cost['terms']:>9,} terms "
+            f"{cost['searchable_bytes'] / 2**20:>8.1f} MB searchable "
+            f"{cost['filterable_bytes'] / 2**20:>8.1f} MB filterable"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--dims", type=int, default=256, help="Vector size for live ingests.")
+    parser.add_argument("--weaviate-url", help="Local Weaviate to ingest into, e.g. http://localhost:8080.")
+    parser.add_argument("--grpc-port", type=int, default=50051)
+    parser.add_argument("--metrics-url", help="Weaviate Prometheus endpoint for heap measurements.")
+    parser.add_argument("--multi-tenancy", action="store_true", help="Ingest into a dataset tenant.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    samples = synthetic_samples(parse_dataset_config(), args.samples)
+    tuned = parse_schema_config().model_copy(update={"multi_tenancy": args.multi_tenancy})
+    schemas = {"baseline": _baseline(tuned), "tuned": tuned}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for label, schema in schemas.items():
+        costs = index_cost(samples, schema)
+        _print_costs(label, costs)
+        results[label] = {"index": costs}
+
+    if args.weaviate_url:
+        url = urllib.parse.urlparse(args.weaviate_url)
+        with weaviate.connect_to_local(
+            host=url.hostname or "localhost", port=url.port or 8080, grpc_port=args.grpc_port
+        ) as client:
+            for label, schema in schemas.items():
+                result = ingest(
+                    client,
+                    f"SeedSchemaBenchmark_{label}",
+                    samples,
+                    schema,
+                    dims=args.dims,
+                    metrics_url=args.metrics_url,
+                )
+                results[label]["ingest"] = result
+                heap = f", heap +{result['heap_growth_mb']} MB" if "heap_growth_mb" in result else ""
+                print(
+                    f"{label}: {result['uploaded']:,} objects in {result['seconds']:.1f}s "
+                    f"({result['objects_per_second']:.0f}/s){heap}"
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"arguments": vars(args), "results": results}, handle, indent=2)
+        print(f"Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
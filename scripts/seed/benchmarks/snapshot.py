@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""Vector snapshot export, scan and import speed.
+
+Synthetic samples with random vectors are loaded into an in-memory fake
+collection, exported to an Arrow snapshot with ``export_snapshot``, scanned
+through the memory map, and imported into a second fake collection with
+``import_snapshot``, which feeds ``upsert_samples`` directly. ``--upload-latency``
+models Weaviate's response time, so the import rate shows how far the snapshot
+path is from the upload limit; no embeddings are requested.
+
+Run from the seed directory:
+
+    python -m benchmarks.snapshot --samples 100000 --dims 1536
+    python -m benchmarks.snapshot --samples 100000 --upload-latency 0.05 --upload-concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from benchmarks.fakes import FakeCollection, synthetic_samples
+from src.config import DEFAULT_UPLOAD_MAX_BATCH_SIZE, parse_dataset_config
+from src.ingest import upsert_samples
+from src.snapshot import Snapshot, export_snapshot, import_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=50_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="Seconds per insert_many.")
+    parser.add_argument("--upload-latency-per-object", type=float, default=0.0)
+    parser.add_argument("--upload-concurrency", type=int, default=4)
+    parser.add_argument("--directory", help="Where to write the snapshot (default: a temporary directory).")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    samples = synthetic_samples(parse_dataset_config(), args.samples)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((len(samples), args.dims), dtype=np.float32)
+    source = FakeCollection("SnapshotSource", keep_objects=True)
+    upsert_samples(source, zip(samples, vectors), DEFAULT_UPLOAD_MAX_BATCH_SIZE)
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        path = Path(directory) / "snapshot.arrow"
+        stats = export_snapshot(source, path)
+        print(stats.summary("Exported"))
+        results["export"] = {"seconds": round(stats.elapsed, 3), "megabytes": round(stats.bytes / 2**20, 1)}
+
+        with Snapshot(path) as snapshot:
+            started = time.perf_counter()
+            checksum = 0.0
+            for batch in snapshot.vectors():
+                checksum += float(batch.sum(dtype=np.float64))
+            scan = time.perf_counter() - started
+            vector_mb = snapshot.num_rows * snapshot.dimensions * 4 / 2**20
+            print(
+                f"Scanned {vector_mb:.1f} MB of vectors through the memory map in {scan:.3f}s "
+                f"({vector_mb / scan if scan > 0 else 0.0:.0f} MB/s)."
+            )
+            results["scan"] = {"seconds": round(scan, 4), "vector_megabytes": round(vector_mb, 1)}
+
+            target = FakeCollection(
+                "SnapshotTarget",
+                latency=args.upload_latency,
+                latency_per_object=args.upload_latency_per_object,
+            )
+            report = import_snapshot(target, snapshot, concurrency=args.upload_concurrency)
+            print(report.summary())
+            if len(target) != len(source):
+                raise SystemExit(f"Imported {len(target)} of {len(source)} objects.")
+            results["import"] = {
+                "seconds": round(report.elapsed, 3),
+                "objects_per_second": round(report.objects_per_second, 1),
+                "megabytes_per_second": round(stats.bytes / 2**20 / report.elapsed, 1)
+                if report.elapsed > 0
+                else 0.0,
+                "requests": report.requests,
+            }
+            print(f"Import read the snapshot at {results['import']['megabytes_per_second']} MB/s.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"arguments": vars(args), "results": results}, handle, indent=2)
+        print(f"Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
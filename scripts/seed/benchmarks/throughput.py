@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""Seed throughput against a fake embeddings API and an in-memory collection.
+
+Synthetic samples go through ``embed_samples`` (talking to a local fake of
+the OpenAI embeddings endpoint) and ``upsert_samples`` (writing to a fake
+Weaviate collection) for every combination of embedding batch size,
+embedding processes, upload concurrency and embeddings wire format. Each
+combination runs in a fresh process so its peak RSS is its own.
+
+Run from the seed directory:
+
+    python -m benchmarks.throughput --samples 20000 --batch-sizes 32 128 512
+    python -m benchmarks.throughput --latency 0.3 --rpm 3000 --processes 4 8 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, Iterator, List, Literal, Tuple
+
+from openai import OpenAIError
+
+from benchmarks.fakes import (
+    FakeCollection,
+    FakeEmbeddingsLimits,
+    FakeEmbeddingsServer,
+    synthetic_samples,
+)
+from src.config import DEFAULT_BATCH_SIZE, parse_dataset_config
+from src.embed import embed_samples
+from src.ingest import upsert_samples
+from src.telemetry import StageTelemetry
+
+_MODEL_NAME = "text-embedding-3-large"
+
+SampleRecord = Dict[str, str]
+
+
+def run_configuration(
+    *,
+    base_url: str,
+    samples: int,
+    dimensions: int,
+    batch_size: int,
+    processes: int,
+    upload_concurrency: int,
+    encoding_format: Literal["base64", "float"],
+    upload_latency: float,
+    upload_latency_per_object: float,
+) -> Dict[str, Any]:
+    """Embed and upload ``samples`` synthetic samples once; runs in a child process."""
+    config = parse_dataset_config()
+    records = synthetic_samples(config, samples)
+    collection = FakeCollection(
+        latency=upload_latency, latency_per_object=upload_latency_per_object
+    )
+    embed_stage = StageTelemetry("embed")
+    upload_stage = StageTelemetry("upload")
+
+    started = time.perf_counter()
+    first_vector: List[float] = []
+
+    def timed(items: Iterator[Tuple[SampleRecord, List[float]]]) -> Iterator[Tuple[SampleRecord, List[float]]]:
+        for item in items:
+            if not first_vector:
+                first_vector.append(time.perf_counter() - started)
+            yield item
+
+    vectors = embed_samples(
+        records,
+        config.text_property,
+        api_key="benchmark",
+        base_url=base_url,
+        model_name=_MODEL_NAME,
+        batch_size=batch_size,
+        dimensions=dimensions,
+        stage=embed_stage,
+        processes=processes,
+        encoding_format=encoding_format,
+    )
+    report = upsert_samples(
+        collection,
+        timed(vectors),
+        DEFAULT_BATCH_SIZE,
+        concurrency=upload_concurrency,
+        stage=upload_stage,
+    )
+    elapsed = time.perf_counter() - started
+    # Spawning the embedding processes and importing the client dominates
+    # small runs; steady-state throughput leaves that start-up out.
+    startup = first_vector[0] if first_vector else elapsed
+    steady = elapsed - startup
+
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN covers the embedding
+    # workers, which have exited by now, and reports the largest of them.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {
+        "uploaded": report.uploaded,
+        "failed": report.failed,
+        "stored": len(collection),
+        "seconds": round(elapsed, 3),
+        "samples_per_second": round(report.uploaded / elapsed, 1) if elapsed > 0 else 0.0,
+        "startup_seconds": round(startup, 3),
+        "steady_samples_per_second": round(report.uploaded / steady, 1) if steady > 0 else 0.0,
+        "peak_rss_mb": round(own, 1),
+        "worker_peak_rss_mb": round(workers, 1),
+        "embed_p95_seconds": embed_stage.snapshot()["latency"]["p95_seconds"],
+        "upload_requests": report.requests,
+        "upload_p95_seconds": upload_stage.snapshot()["latency"]["p95_seconds"],
+    }
+
+
+def _print(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'batch':>6} {'procs':>5} {'upl c':>5} {'format':>7} {'samples/s':>10} {'steady/s':>9} "
+        f"{'start':>6} {'rss MB':>7} "
+        f"{'wrk MB':>7} {'emb req':>8} {'429s':>6} {'MB recv':>8} {'upl req':>8} {'emb p95':>8}"
+    )
+    for row in results:
+        print(
+            f"{row['batch_size']:>6} {row['processes']:>5} {row['upload_concurrency']:>5} "
+            f"{row['encoding_format']:>7} {row['samples_per_second']:>10.1f} "
+            f"{row['steady_samples_per_second']:>9.1f} {row['startup_seconds']:>5.1f}s "
+            f"{row['peak_rss_mb']:>7.0f} {row['worker_peak_rss_mb']:>7.0f} "
+            f"{row['embed_requests']:>8} {row['rate_limited']:>6} "
+            f"{row['embed_bytes'] / 2**20:>8.1f} {row['upload_requests']:>8} "
+            f"{row['embed_p95_seconds']:>7g}s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--processes", type=int, nargs="+", default=[4])
+    parser.add_argument("--upload-concurrency", type=int, nargs="+", default=[4])
+    parser.add_argument("--encodings", nargs="+", choices=["base64", "float"], default=["base64", "float"])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per embeddings request.")
+    parser.add_argument("--latency-per-input", type=float, default=0.0005)
+    parser.add_argument("--rpm", type=int, default=None, help="Embeddings requests per minute.")
+    parser.add_argument("--tpm", type=int, default=None, help="Embeddings tokens per minute.")
+    parser.add_argument("--upload-latency", type=float, default=0.01, help="Seconds per insert_many.")
+    parser.add_argument("--upload-latency-per-object", type=float, default=0.00005)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    limits = FakeEmbeddingsLimits(
+        latency=args.latency,
+        latency_per_input=args.latency_per_input,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        dimensions=args.dims,
+    )
+    grid = list(
+        itertools.product(args.batch_sizes, args.processes, args.upload_concurrency, args.encodings)
+    )
+    print(f"{args.samples:,} samples x {args.dims} dims, {len(grid)} configurations")
+    results: List[Dict[str, Any]] = []
+    with FakeEmbeddingsServer(limits) as server:
+        for batch_size, processes, upload_concurrency, encoding_format in grid:
+            server.reset()
+            settings = {
+                "batch_size": batch_size,
+                "processes": processes,
+                "upload_concurrency": upload_concurrency,
+                "encoding_format": encoding_format,
+            }
+            # A fresh process per configuration keeps peak RSS comparable.
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                future = executor.submit(
+                    run_configuration,
+                    base_url=server.base_url,
+                    samples=args.samples,
+                    dimensions=args.dims,
+                    upload_latency=args.upload_latency,
+                    upload_latency_per_object=args.upload_latency_per_object,
+                    **settings,
+                )
+                try:
+                    result = future.result()
+                except OpenAIError as e:
+                    # Typically rate limits the client's retries could not absorb.
+                    print(f"Configuration {settings} failed: {e}")
+                    continue
+            stats = server.stats()
+            if result["stored"] != args.samples:
+                raise SystemExit(
+                    f"Configuration {settings} stored {result['stored']} of {args.samples} samples."
+                )
+            results.append(
+                {
+                    **settings,
+                    **result,
+                    "embed_requests": stats["requests"],
+                    "rate_limited": stats["rate_limited"],
+                    "embed_bytes": stats["bytes_sent"],
+                }
+            )
+    _print(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"arguments": vars(args), "results": results}, handle, indent=2)
+        print(f"Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
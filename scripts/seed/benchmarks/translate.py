@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""Compare per-record and batched translation of dataset records.
+
+Run from the seed directory:
+
+    python -m benchmarks.translate --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+from datasets import Dataset
+
+from src.config import DatasetConfig, parse_dataset_config
+from src.utils import _translate_sharded
+
+
+def build_table(rows: int, seed: int = 0) -> pa.Table:
+    rng = random.Random(seed)
+    words = ["patient", "presents", "with", "acute", "pain", "fever", "history", "of", "the"]
+    questions: List[Optional[str]] = []
+    responses: List[Optional[str]] = []
+    for index in range(rows):
+        # Roughly 1% empty inputs and 1% missing outputs, like real SFT dumps.
+        if index % 100 == 0:
+            questions.append("   ")
+        else:
+            questions.append(" ".join(rng.choices(words, k=rng.randint(8, 40))))
+        if index % 100 == 1:
+            responses.append(None)
+        else:
+            responses.append("\n".join(rng.choices(words, k=rng.randint(40, 200))))
+    return pa.table({"Question": questions, "Response": responses})
+
+
+def per_record(config: DatasetConfig, table: pa.Table) -> int:
+    kept = 0
+    for batch in table.to_batches(max_chunksize=config.translate_batch_size):
+        for record in batch.to_pylist():
+            if config.translate_record(record) is not None:
+                kept += 1
+    return kept
+
+
+def per_record_stdlib_json(config: DatasetConfig, table: pa.Table) -> int:
+    """Per-record path with the stdlib ``json.dumps`` encoder, for reference."""
+    kept = 0
+    for batch in table.to_batches(max_chunksize=config.translate_batch_size):
+        for record in batch.to_pylist():
+            input_raw = record.get(config.text_field)
+            if input_raw is None or not str(input_raw).strip():
+                continue
+            payload = [record.get(field) for field in config.expected_output_fields]
+            if any(value is None for value in payload):
+                continue
+            json.dumps(payload)
+            kept += 1
+    return kept
+
+
+def batched(config: DatasetConfig, table: pa.Table) -> int:
+    kept = 0
+    for batch in table.to_batches(max_chunksize=config.translate_batch_size):
+        kept += config.translate_batch(pa.Table.from_batches([batch])).num_rows
+    return kept
+
+
+def sharded(config: DatasetConfig, table: pa.Table) -> int:
+    dataset = Dataset(table)
+    return sum(batch.num_rows for batch in _translate_sharded(config, dataset, 0))
+
+
+def _time(label: str, fn: Callable[[], int], rows: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    kept = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s {rows / elapsed:12,.0f} rows/s  kept={kept}")
+    return {"label": label, "seconds": elapsed, "kept": kept}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=0,
+        help="Also time the sharded Dataset.map path with this many processes.",
+    )
+    args = parser.parse_args()
+
+    config = parse_dataset_config()
+    if args.batch_size:
+        config = config.model_copy(update={"translate_batch_size": args.batch_size})
+
+    print(f"Building {args.rows:,} synthetic records...")
+    table = build_table(args.rows)
+
+    results = [
+        _time("per-record (stdlib json)", lambda: per_record_stdlib_json(config, table), args.rows),
+        _time("per-record (orjson)", lambda: per_record(config, table), args.rows),
+        _time("batched (arrow + orjson)", lambda: batched(config, table), args.rows),
+    ]
+    if args.num_proc:
+        sharded_config = config.model_copy(update={"translate_num_proc": args.num_proc})
+        results.append(
+            _time(
+                f"sharded map (num_proc={args.num_proc})",
+                lambda: sharded(sharded_config, table),
+                args.rows,
+            )
+        )
+    if len({result["kept"] for result in results}) != 1:
+        raise SystemExit("Translators disagree on the number of kept rows.")
+    sample = table.slice(0, config.translate_batch_size)
+    expected = [config.translate_record(record) for record in sample.to_pylist()]
+    if config.translate_batch(sample).to_pylist() != [row for row in expected if row is not None]:
+        raise SystemExit("Batched translation output differs from the per-record path.")
+
+    baseline = results[0]["seconds"]
+    for result in results[1:]:
+        print(f"{result['label']:<28} {baseline / result['seconds']:.1f}x vs stdlib per-record")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,60 @@
 #!/usr/bin/env python3
 
-"""Fetch a Hugging Face dataset, embed with OpenAI, and upsert into Weaviate."""
+"""Fetch Hugging Face datasets, embed them, and upsert into Weaviate."""
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
-from itertools import chain
-from typing import Iterable
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import traceback
 
 from openai import OpenAIError
 
+from src.checkpoint import CheckpointStore, CheckpointTracker
 from src.config import (
     DEFAULT_BATCH_SIZE,
+    DEFAULT_CHECKPOINT_PATH,
     DEFAULT_CLASS_NAME,
-    DEFAULT_MODEL_NAME,
+    DEFAULT_PAYLOAD_COMPRESSION,
+    DEFAULT_PAYLOAD_COMPRESSION_LEVEL,
+    DEFAULT_SHARD_REPORT_PATH,
+    DEFAULT_TELEMETRY_INTERVAL,
+    DEFAULT_TELEMETRY_PATH,
+    DatasetConfig,
+    EmbeddingConfig,
     parse_dataset_config,
+    parse_embedding_config,
+    parse_schema_config,
+    parse_vector_index_config,
 )
-from src.embed import embed_samples
-from src.ingest import connect_weaviate, ensure_collection, upsert_samples
-from src.utils import load_samples
+from src.dedup import NearDuplicateFilter
+from src.embed import EmbeddingEngine, check_embedding_backend
+from src.ingest import (
+    UploadReport,
+    connect_weaviate,
+    count_objects,
+    ensure_collection,
+    tenant_collection,
+    tenant_name,
+    upsert_samples,
+)
+from src.manifest import load_manifest
+from src.payload import PayloadCompressor
+from src.pipeline import PipelineCancelled, run_seed_pipeline
+from src.shards import ShardDatasetResult, ShardMerge, ShardReport, shard_path
+from src.snapshot import Snapshot, export_snapshot, import_snapshot
+from src.telemetry import Telemetry
+from src.utils import sanitize_property_name
+
+SampleRecord = Dict[str, str]
+# A dataset with its upload report (None when nothing was left) or error message.
+DatasetOutcome = Tuple[DatasetConfig, Optional[UploadReport], Optional[str]]
 
 
 def _require_env(var_name: str) -> str:
@@ -30,66 +64,123 @@ def _require_env(var_name: str) -> str:
     raise SystemExit(f"Missing required environment variable: {var_name}")
 
 
-def main() -> None:
-    dataset_config = parse_dataset_config()
-    openai_api_key = _require_env("OPENAI_API_KEY")
-    openai_base_url = os.getenv("OPENAI_BASE_URL")
-    weaviate_url = _require_env("WEAVIATE_URL")
-    weaviate_api_key = _require_env("WEAVIATE_API_KEY")
+def _dataset_label(dataset_config: DatasetConfig) -> str:
+    return f"{dataset_config.dataset_name}:{dataset_config.dataset_split}"
 
-    try:
-        raw_samples = load_samples(dataset_config)
-        samples_iter = iter(raw_samples)
-        first_sample = next(samples_iter)
-        samples: Iterable[dict[str, str]] = chain([first_sample], samples_iter)
-    except RuntimeError as e:
-        traceback.print_exc()
-        raise SystemExit(f"Failed to load dataset: {e}") from e
-    except StopIteration:
-        traceback.print_exc()
-        raise SystemExit(
-            f"No usable samples found in {dataset_config.dataset_name}:{dataset_config.dataset_split}. "
-            "Verify that the configured dataset references are correct."
+
+def _dataset_checkpoint_path(base_path: Path, dataset_config: DatasetConfig) -> Path:
+    slug = sanitize_property_name(
+        "-".join(
+            part
+            for part in (
+                dataset_config.dataset_name,
+                dataset_config.dataset_config,
+                dataset_config.dataset_split,
+            )
+            if part
         )
-    except Exception as e:
-        traceback.print_exc()
-        raise SystemExit(f"Failed to load dataset: {e}") from e
+    )
+    return base_path.with_name(f"{base_path.stem}.{slug}{base_path.suffix}")
 
-    weaviate_client = None
+
+def _ingest_dataset(
+    dataset_config: DatasetConfig,
+    *,
+    engine: EmbeddingEngine,
+    collection,
+    checkpoint_path: Path,
+    telemetry: Telemetry,
+    request_slots: Optional[threading.Semaphore] = None,
+    label_prefix: str = "",
+    stage_prefix: str = "",
+    cancel: Optional[threading.Event] = None,
+    multi_tenancy: bool = False,
+) -> Optional[UploadReport]:
+    """Ingest one dataset through the staged pipeline, resuming from its checkpoint.
+
+    Stage telemetry is recorded under ``{stage_prefix}load``, ``...translate``,
+    ``...dedup`` (with a ``dedup_threshold``), ``...embed`` and ``...upload``.
+    Setting ``cancel`` stops the pipeline. With ``multi_tenancy`` the samples
+    go to the dataset's own tenant of ``collection``.
+    Returns ``None`` when the checkpoint shows nothing is left to ingest.
+    """
+    checkpoint_store = CheckpointStore(checkpoint_path)
     try:
-        weaviate_client = connect_weaviate(
-            url=weaviate_url,
-            api_key=weaviate_api_key,
+        checkpoint = checkpoint_store.load(dataset_config)
+    except RuntimeError as e:
+        raise SystemExit(str(e)) from e
+
+    if checkpoint.dataset_offset:
+        print(
+            f"{label_prefix}Resuming from checkpoint '{checkpoint_store.path}': "
+            f"{checkpoint.samples_ingested} samples already ingested, "
+            f"continuing at dataset offset {checkpoint.dataset_offset}."
         )
-    except Exception as e:
-        traceback.print_exc()
-        raise SystemExit(f"Could not initialize Weaviate client: {e}") from e
+        if dataset_config.max_samples is not None:
+            remaining = dataset_config.max_samples - checkpoint.samples_ingested
+            if remaining <= 0:
+                print(f"{label_prefix}Configured max_samples already reached; nothing to ingest.")
+                return None
+            dataset_config = dataset_config.model_copy(update={"max_samples": remaining})
 
-    embedded_samples = embed_samples(
-        samples,
-        text_property=dataset_config.text_property,
-        api_key=openai_api_key,
-        base_url=openai_base_url,
-        model_name=DEFAULT_MODEL_NAME,
-        batch_size=DEFAULT_BATCH_SIZE,
-    )
+    if multi_tenancy:
+        try:
+            collection = tenant_collection(collection, dataset_config.dataset_name)
+        except Exception as e:
+            traceback.print_exc()
+            raise SystemExit(f"Weaviate API error: {e}") from e
 
-    total_ingested = 0
-    try:
-        collection = ensure_collection(
-            weaviate_client,
-            collection_name=DEFAULT_CLASS_NAME,
-            text_property=dataset_config.text_property,
-            metadata_properties=[
-                dataset_config.task_property,
-                dataset_config.expected_output_property,
-            ],
+    dedup = (
+        NearDuplicateFilter(dataset_config.dedup_threshold)
+        if dataset_config.dedup_threshold is not None
+        else None
+    )
+    if dedup is not None and checkpoint.dataset_offset:
+        try:
+            restored = checkpoint_store.load_dedup(checkpoint, dedup)
+        except RuntimeError as e:
+            raise SystemExit(str(e)) from e
+        if restored:
+            print(f"{label_prefix}Restored near-duplicate filter from '{checkpoint_store.dedup_path(checkpoint)}'.")
+        else:
+            print(
+                f"{label_prefix}Warning: no near-duplicate filter saved with the checkpoint; "
+                "samples are not checked against those ingested before it."
+            )
+    tracker = CheckpointTracker(checkpoint_store, checkpoint, dedup=dedup)
+    compressor = (
+        PayloadCompressor(
+            [dataset_config.expected_output_property], level=DEFAULT_PAYLOAD_COMPRESSION_LEVEL
         )
-        total_ingested = upsert_samples(
+        if DEFAULT_PAYLOAD_COMPRESSION == "zstd"
+        else None
+    )
+
+    def upload(samples_with_vectors: Iterable[Tuple[SampleRecord, List[float]]]) -> UploadReport:
+        return upsert_samples(
             collection=collection,
-            samples_with_vectors=embedded_samples,
+            samples_with_vectors=samples_with_vectors,
             batch_size=DEFAULT_BATCH_SIZE,
+            on_batch_confirmed=tracker.confirm,
+            request_slots=request_slots,
+            stage=telemetry.stage(f"{stage_prefix}upload"),
+            compressor=compressor,
+        )
+
+    try:
+        upload_report = run_seed_pipeline(
+            dataset_config,
+            start_offset=checkpoint.dataset_offset,
+            tracker=tracker,
+            engine=engine,
+            upload=upload,
+            telemetry=telemetry,
+            stage_prefix=stage_prefix,
+            cancel=cancel,
+            dedup=dedup,
         )
+    except PipelineCancelled as e:
+        raise SystemExit("Ingestion cancelled.") from e
     except OpenAIError as e:
         traceback.print_exc()
         raise SystemExit(f"Failed to embed samples: {e}") from e
@@ -100,14 +191,481 @@ def main() -> None:
         traceback.print_exc()
         raise SystemExit(f"Weaviate API error: {e}") from e
     finally:
-        if weaviate_client is not None:
-            weaviate_client.close()
+        # Confirmed uploads stand whether or not the run finished.
+        tracker.flush()
+
+    if dedup is not None:
+        print(f"{label_prefix}{dedup.summary()}")
+    if compressor is not None and compressor.raw_bytes:
+        print(f"{label_prefix}{compressor.summary()}")
+    if checkpoint.dataset_offset and not upload_report.uploaded and not upload_report.failed:
+        print(
+            f"{label_prefix}Checkpoint '{checkpoint_store.path}' covers the whole dataset; "
+            "nothing left to ingest."
+        )
+        return None
+    return upload_report
 
+
+def _report_single(dataset_config: DatasetConfig, upload_report: Optional[UploadReport]) -> None:
+    if upload_report is None:
+        return
+    print(upload_report.summary())
     print(
-        f"Ingested {total_ingested} samples from "
+        f"Ingested {upload_report.uploaded} samples from "
         f"{dataset_config.dataset_name}:{dataset_config.dataset_split} "
         f"into class '{DEFAULT_CLASS_NAME}'."
     )
+    if upload_report.failed:
+        raise SystemExit(
+            f"{upload_report.failed} samples could not be uploaded after retries; "
+            "see the error breakdown above. The checkpoint stops before them, so "
+            "rerunning the same command sends them again."
+        )
+
+
+def _ingest_manifest(
+    dataset_configs: List[DatasetConfig],
+    *,
+    engine: EmbeddingEngine,
+    collection,
+    checkpoint_base: Path,
+    telemetry: Telemetry,
+    max_concurrent_datasets: int,
+    max_inflight_uploads: int,
+    multi_tenancy: bool = False,
+) -> List[DatasetOutcome]:
+    """Ingest several datasets concurrently; one failing dataset does not stop the others."""
+    request_slots = threading.BoundedSemaphore(max_inflight_uploads)
+    cancel = threading.Event()
+
+    def run(dataset_config: DatasetConfig) -> Optional[UploadReport]:
+        return _ingest_dataset(
+            dataset_config,
+            engine=engine,
+            collection=collection,
+            checkpoint_path=_dataset_checkpoint_path(checkpoint_base, dataset_config),
+            telemetry=telemetry,
+            request_slots=request_slots,
+            label_prefix=f"[{_dataset_label(dataset_config)}] ",
+            stage_prefix=f"{_dataset_label(dataset_config)}/",
+            cancel=cancel,
+            multi_tenancy=multi_tenancy,
+        )
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrent_datasets, thread_name_prefix="seed-dataset"
+    )
+    try:
+        futures = [executor.submit(run, dataset_config) for dataset_config in dataset_configs]
+        outcomes = []
+        for dataset_config, future in zip(dataset_configs, futures):
+            try:
+                outcomes.append((dataset_config, future.result(), None))
+            except (SystemExit, Exception) as e:
+                outcomes.append((dataset_config, None, str(e)))
+    except KeyboardInterrupt:
+        # Stop the running pipelines and drop datasets that have not started.
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return outcomes
+
+
+def _report_manifest(outcomes: List[DatasetOutcome]) -> None:
+    print("Dataset results:")
+    failed = 0
+    total = 0
+    for dataset_config, upload_report, error in outcomes:
+        label = _dataset_label(dataset_config)
+        if error is not None:
+            failed += 1
+            print(f"  FAILED {label}: {error}")
+        elif upload_report is None:
+            print(f"  done   {label}: nothing left to ingest")
+        else:
+            total += upload_report.uploaded
+            if upload_report.failed:
+                failed += 1
+            print(
+                f"  {'FAILED' if upload_report.failed else 'ok    '} {label}: "
+                f"{upload_report.uploaded} uploaded "
+                f"({upload_report.objects_per_second:.1f} objects/s), "
+                f"{upload_report.failed} failed"
+            )
+            for message, count in upload_report.errors.most_common(3):
+                print(f"           {count} x {message}")
+    print(f"Ingested {total} samples from {len(outcomes)} datasets into class '{DEFAULT_CLASS_NAME}'.")
+    if failed:
+        raise SystemExit(f"{failed} of {len(outcomes)} datasets did not finish cleanly.")
+
+
+def _write_shard_report(
+    path: Path,
+    *,
+    shard_index: int,
+    shard_count: int,
+    started_at: datetime,
+    outcomes: List[DatasetOutcome],
+    checkpoint_path_for: Callable[[DatasetConfig], Path],
+) -> None:
+    results = []
+    for dataset_config, upload_report, error in outcomes:
+        try:
+            checkpoint = CheckpointStore(checkpoint_path_for(dataset_config)).load(dataset_config)
+        except RuntimeError as e:
+            error = error or str(e)
+            ingested = 0
+        else:
+            ingested = checkpoint.samples_ingested
+        report = upload_report or UploadReport()
+        results.append(
+            ShardDatasetResult(
+                dataset_name=dataset_config.dataset_name,
+                dataset_config=dataset_config.dataset_config,
+                dataset_split=dataset_config.dataset_split,
+                status="failed" if error is not None else "completed",
+                uploaded=report.uploaded,
+                failed=report.failed,
+                seconds=round(report.elapsed, 3),
+                samples_ingested=ingested,
+                error=error,
+            )
+        )
+    ShardReport(
+        shard_index=shard_index,
+        shard_count=shard_count,
+        collection=DEFAULT_CLASS_NAME,
+        started_at=started_at,
+        finished_at=datetime.now(timezone.utc),
+        datasets=results,
+    ).save(path)
+    print(f"Shard report written to '{path}'.")
+
+
+def _merge_shards(paths: List[str], verify_weaviate: bool) -> None:
+    """Check the reports of a sharded run and print per-shard throughput."""
+    try:
+        reports = [ShardReport.load(Path(path)) for path in paths]
+    except RuntimeError as e:
+        raise SystemExit(str(e)) from e
+
+    object_counts = None
+    if verify_weaviate:
+        labels = sorted(
+            {(result.dataset_name, result.dataset_split) for report in reports for result in report.datasets}
+        )
+        client = _connect_weaviate()
+        try:
+            collection = client.collections.get(reports[0].collection)
+            multi_tenancy = parse_schema_config().multi_tenancy
+            object_counts = {
+                f"{name}:{split}": count_objects(
+                    collection.with_tenant(tenant_name(name)) if multi_tenancy else collection,
+                    name,
+                    split,
+                )
+                for name, split in labels
+            }
+        except Exception as e:
+            traceback.print_exc()
+            raise SystemExit(f"Weaviate API error: {e}") from e
+        finally:
+            client.close()
+
+    merge = ShardMerge(reports, object_counts)
+    print(merge.summary())
+    if not merge.ok:
+        raise SystemExit(f"Sharded run is incomplete: {len(merge.problems)} problem(s) found.")
+    print(f"All {len(reports)} shards completed.")
+
+
+def _export_snapshot(path: Path) -> None:
+    """Write every object of the collection, with its vector, to a snapshot file."""
+    client = _connect_weaviate()
+    try:
+        collection = client.collections.get(DEFAULT_CLASS_NAME)
+        stats = export_snapshot(collection, path)
+    except Exception as e:
+        traceback.print_exc()
+        raise SystemExit(f"Weaviate API error: {e}") from e
+    finally:
+        client.close()
+    print(stats.summary("Exported"))
+    print(f"Snapshot of '{DEFAULT_CLASS_NAME}' written to '{path}'.")
+
+
+def _import_snapshot(path: Path) -> None:
+    """Upload a snapshot's objects and stored vectors without calling the embedding API.
+
+    The collection is created with the current vector index and schema
+    settings, but with the embedding settings recorded in the snapshot, which
+    are the ones its vectors were produced with.
+    """
+    try:
+        snapshot = Snapshot(path)
+    except RuntimeError as e:
+        raise SystemExit(str(e)) from e
+    with snapshot:
+        try:
+            embedding_config = EmbeddingConfig.from_description(snapshot.description)
+        except ValueError as e:
+            raise SystemExit(f"Invalid embedding marker in snapshot '{path}': {e}") from e
+        schema_config = parse_schema_config()
+        dataset_config = parse_dataset_config()
+        compressor = (
+            PayloadCompressor(
+                [dataset_config.expected_output_property], level=DEFAULT_PAYLOAD_COMPRESSION_LEVEL
+            )
+            if DEFAULT_PAYLOAD_COMPRESSION == "zstd"
+            else None
+        )
+        print(
+            f"Importing {snapshot.num_rows} objects ({snapshot.dimensions} dimensions) "
+            f"from '{path}' into class '{DEFAULT_CLASS_NAME}'."
+        )
+        client = _connect_weaviate()
+        try:
+            collection = ensure_collection(
+                client,
+                collection_name=DEFAULT_CLASS_NAME,
+                text_property=dataset_config.text_property,
+                metadata_properties=[
+                    name for name in snapshot.properties if name != dataset_config.text_property
+                ],
+                embedding_config=embedding_config,
+                vector_index_config=parse_vector_index_config(),
+                schema_config=schema_config,
+            )
+            upload_report = import_snapshot(
+                collection,
+                snapshot,
+                multi_tenancy=schema_config.multi_tenancy,
+                compressor=compressor,
+            )
+        except Exception as e:
+            traceback.print_exc()
+            raise SystemExit(f"Weaviate API error: {e}") from e
+        finally:
+            client.close()
+    print(upload_report.summary())
+    if compressor is not None and compressor.raw_bytes:
+        print(compressor.summary())
+    if upload_report.failed:
+        raise SystemExit(
+            f"{upload_report.failed} objects could not be uploaded after retries; "
+            "see the error breakdown above."
+        )
+
+
+def _connect_weaviate():
+    try:
+        return connect_weaviate(
+            url=_require_env("WEAVIATE_URL"), api_key=_require_env("WEAVIATE_API_KEY")
+        )
+    except Exception as e:
+        traceback.print_exc()
+        raise SystemExit(f"Could not initialize Weaviate client: {e}") from e
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=int(os.getenv("SEED_SHARD_INDEX") or 0),
+        help="Slice of the datasets to ingest, from 0 to --shard-count - 1.",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=int(os.getenv("SEED_SHARD_COUNT") or 1),
+        help="Number of independent runs sharing the datasets.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        nargs="+",
+        metavar="REPORT",
+        help="Verify the shard reports of a finished sharded run instead of seeding.",
+    )
+    parser.add_argument(
+        "--verify-weaviate",
+        action="store_true",
+        help="With --merge-shards, also compare the objects stored per dataset.",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        type=Path,
+        metavar="PATH",
+        help="Write the collection's objects and vectors to an Arrow snapshot instead of seeding.",
+    )
+    parser.add_argument(
+        "--import-snapshot",
+        type=Path,
+        metavar="PATH",
+        help="Upload a snapshot's objects with their stored vectors instead of seeding.",
+    )
+    args = parser.parse_args()
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1.")
+    return args
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.merge_shards:
+        _merge_shards(args.merge_shards, args.verify_weaviate)
+        return
+    if args.export_snapshot:
+        _export_snapshot(args.export_snapshot)
+        return
+    if args.import_snapshot:
+        _import_snapshot(args.import_snapshot)
+        return
+    shard_index, shard_count = args.shard_index, args.shard_count
+
+    manifest = None
+    manifest_path = os.getenv("SEED_MANIFEST_PATH")
+    try:
+        if manifest_path:
+            manifest = load_manifest(Path(manifest_path))
+            dataset_configs = manifest.dataset_configs()
+        else:
+            dataset_configs = [parse_dataset_config()]
+        if shard_count > 1:
+            dataset_configs = [
+                dataset_config.for_shard(shard_index, shard_count)
+                for dataset_config in dataset_configs
+            ]
+    except (RuntimeError, ValueError) as e:
+        raise SystemExit(str(e)) from e
+    try:
+        embedding_config = parse_embedding_config()
+    except ValueError as e:
+        raise SystemExit(f"Invalid embedding configuration: {e}") from e
+    vector_index_config = parse_vector_index_config()
+    schema_config = parse_schema_config()
+    openai_api_key = (
+        _require_env("OPENAI_API_KEY") if embedding_config.backend == "openai" else None
+    )
+    openai_base_url = os.getenv("OPENAI_BASE_URL")
+    try:
+        check_embedding_backend(embedding_config, openai_api_key)
+    except RuntimeError as e:
+        raise SystemExit(f"Invalid embedding configuration: {e}") from e
+    weaviate_url = _require_env("WEAVIATE_URL")
+    weaviate_api_key = _require_env("WEAVIATE_API_KEY")
+    # Shards sharing a working directory keep separate checkpoints and reports.
+    checkpoint_path = shard_path(
+        Path(os.getenv("SEED_CHECKPOINT_PATH") or DEFAULT_CHECKPOINT_PATH), shard_index, shard_count
+    )
+    telemetry_path = shard_path(
+        Path(os.getenv("SEED_TELEMETRY_PATH") or DEFAULT_TELEMETRY_PATH), shard_index, shard_count
+    )
+    shard_report_path = shard_path(
+        Path(os.getenv("SEED_SHARD_REPORT_PATH") or DEFAULT_SHARD_REPORT_PATH),
+        shard_index,
+        shard_count,
+    )
+    started_at = datetime.now(timezone.utc)
+
+    weaviate_client = None
+    try:
+        weaviate_client = connect_weaviate(
+            url=weaviate_url,
+            api_key=weaviate_api_key,
+        )
+    except Exception as e:
+        traceback.print_exc()
+        raise SystemExit(f"Could not initialize Weaviate client: {e}") from e
+
+    try:
+        # All datasets share one schema, so any config describes the properties.
+        first_config = dataset_configs[0]
+        try:
+            collection = ensure_collection(
+                weaviate_client,
+                collection_name=DEFAULT_CLASS_NAME,
+                text_property=first_config.text_property,
+                metadata_properties=[
+                    first_config.task_property,
+                    first_config.expected_output_property,
+                ],
+                embedding_config=embedding_config,
+                vector_index_config=vector_index_config,
+                schema_config=schema_config,
+            )
+        except Exception as e:
+            traceback.print_exc()
+            raise SystemExit(f"Weaviate API error: {e}") from e
+
+        run_info = {
+            "datasets": [_dataset_label(dataset_config) for dataset_config in dataset_configs],
+            "embedding": embedding_config.describe(),
+            "vector_index": vector_index_config.model_dump(exclude_none=True),
+            "schema": schema_config.model_dump(),
+            "payload_compression": DEFAULT_PAYLOAD_COMPRESSION,
+            "batch_size": DEFAULT_BATCH_SIZE,
+            "manifest": manifest_path,
+            "shard": {"index": shard_index, "count": shard_count},
+        }
+        with (
+            Telemetry(telemetry_path, DEFAULT_TELEMETRY_INTERVAL, run_info) as telemetry,
+            EmbeddingEngine(
+                embedding_config,
+                api_key=openai_api_key,
+                base_url=openai_base_url,
+                batch_size=DEFAULT_BATCH_SIZE,
+            ) as engine,
+        ):
+            telemetry.run_info["embedding_processes"] = engine.pool_size
+            outcomes: List[DatasetOutcome] = []
+            try:
+                if manifest is None:
+                    try:
+                        upload_report = _ingest_dataset(
+                            first_config,
+                            engine=engine,
+                            collection=collection,
+                            checkpoint_path=checkpoint_path,
+                            telemetry=telemetry,
+                            multi_tenancy=schema_config.multi_tenancy,
+                        )
+                    except SystemExit as e:
+                        outcomes.append((first_config, None, str(e)))
+                        raise
+                    outcomes.append((first_config, upload_report, None))
+                    _report_single(first_config, upload_report)
+                else:
+                    outcomes = _ingest_manifest(
+                        dataset_configs,
+                        engine=engine,
+                        collection=collection,
+                        checkpoint_base=checkpoint_path,
+                        telemetry=telemetry,
+                        max_concurrent_datasets=manifest.max_concurrent_datasets,
+                        max_inflight_uploads=manifest.max_inflight_uploads,
+                        multi_tenancy=schema_config.multi_tenancy,
+                    )
+                    _report_manifest(outcomes)
+            finally:
+                if shard_count > 1 and outcomes:
+                    _write_shard_report(
+                        shard_report_path,
+                        shard_index=shard_index,
+                        shard_count=shard_count,
+                        started_at=started_at,
+                        outcomes=outcomes,
+                        checkpoint_path_for=lambda dataset_config: (
+                            checkpoint_path
+                            if manifest is None
+                            else _dataset_checkpoint_path(checkpoint_path, dataset_config)
+                        ),
+                    )
+    finally:
+        if weaviate_client is not None:
+            weaviate_client.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
+
+from .config import DEFAULT_DEDUP_CHECKPOINT_SECONDS, DatasetConfig
+
+if TYPE_CHECKING:
+    from .dedup import NearDuplicateFilter
+
+SampleRecord = Dict[str, str]
+
+
+class Checkpoint(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    dataset_name: str
+    dataset_config: Optional[str]
+    dataset_split: str
+    # Index of the next raw dataset record to read; everything before it has
+    # been translated, embedded and confirmed by Weaviate.
+    dataset_offset: NonNegativeInt = 0
+    samples_ingested: NonNegativeInt = 0
+    last_batch: int = -1
+    shard_index: NonNegativeInt = 0
+    shard_count: PositiveInt = 1
+
+    @classmethod
+    def fresh(cls, config: DatasetConfig) -> "Checkpoint":
+        return cls(
+            dataset_name=config.dataset_name,
+            dataset_config=config.dataset_config,
+            dataset_split=config.dataset_split,
+            shard_index=config.shard_index,
+            shard_count=config.shard_count,
+        )
+
+    def matches(self, config: DatasetConfig) -> bool:
+        return (
+            self.dataset_name == config.dataset_name
+            and self.dataset_config == config.dataset_config
+            and self.dataset_split == config.dataset_split
+            and self.shard_index == config.shard_index
+            and self.shard_count == config.shard_count
+        )
+
+    def describe(self) -> str:
+        label = f"{self.dataset_name}:{self.dataset_split}"
+        if self.shard_count > 1:
+            label = f"{label} (shard {self.shard_index} of {self.shard_count})"
+        return label
+
+
+class CheckpointStore:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self, config: DatasetConfig) -> Checkpoint:
+        if not self._path.exists():
+            return Checkpoint.fresh(config)
+        try:
+            payload = json.loads(self._path.read_text(encoding="utf-8"))
+            checkpoint = Checkpoint.model_validate(payload)
+        except ValueError as e:
+            raise RuntimeError(
+                f"Checkpoint file '{self._path}' is corrupt; delete it to start over."
+            ) from e
+        if not checkpoint.matches(config):
+            raise RuntimeError(
+                f"Checkpoint file '{self._path}' belongs to {checkpoint.describe()}, not "
+                f"{Checkpoint.fresh(config).describe()}; delete it to start over."
+            )
+        return checkpoint
+
+    def dedup_path(self, checkpoint: Checkpoint) -> Path:
+        # Named by offset so the checkpoint always points at the filter state
+        # written with it, even if a crash lands between the two writes.
+        return self._path.with_name(f"{self._path.name}.dedup-{checkpoint.dataset_offset}.npz")
+
+    def load_dedup(self, checkpoint: Checkpoint, dedup: "NearDuplicateFilter") -> bool:
+        """Restore the near-duplicate filter saved with ``checkpoint``, if any."""
+        path = self.dedup_path(checkpoint)
+        if not path.exists():
+            return False
+        dedup.load(path)
+        return True
+
+    def save(self, checkpoint: Checkpoint, dedup: Optional["NearDuplicateFilter"] = None) -> None:
+        if dedup is not None:
+            dedup_path = self.dedup_path(checkpoint)
+            dedup.save(dedup_path)
+        # Write to a sibling file and rename so a crash never leaves a
+        # half-written checkpoint behind.
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        tmp_path.write_text(checkpoint.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
+        if dedup is not None:
+            for stale in self._path.parent.glob(f"{self._path.name}.dedup-*.npz"):
+                if stale != dedup_path:
+                    stale.unlink(missing_ok=True)
+
+
+class CheckpointTracker:
+    """Maps confirmed uploads back to dataset offsets and persists progress.
+
+    Samples flow through embedding and upload in load order, so the n-th
+    confirmed object always corresponds to the n-th tracked dataset offset.
+
+    With a near-duplicate filter, its state is saved alongside the
+    checkpoint. Writing it costs a full copy of the Bloom filter, so those
+    saves happen at most every ``dedup_interval`` seconds and on
+    :meth:`flush`; in between, the last saved pair stays consistent.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        checkpoint: Checkpoint,
+        dedup: Optional["NearDuplicateFilter"] = None,
+        dedup_interval: float = DEFAULT_DEDUP_CHECKPOINT_SECONDS,
+    ) -> None:
+        self._store = store
+        self._checkpoint = checkpoint
+        self._pending: Deque[int] = deque()
+        self._dedup = dedup
+        self._dedup_interval = dedup_interval
+        self._last_save = time.monotonic()
+        self._unsaved = False
+
+    @property
+    def checkpoint(self) -> Checkpoint:
+        return self._checkpoint
+
+    def track(
+        self, indexed_samples: Iterable[Tuple[int, SampleRecord]]
+    ) -> Iterator[SampleRecord]:
+        for offset, sample in indexed_samples:
+            self._pending.append(offset)
+            yield sample
+
+    def confirm(self, count: int) -> None:
+        if count <= 0:
+            return
+        if count > len(self._pending):
+            raise RuntimeError("Confirmed more samples than were loaded.")
+        last_offset = self._checkpoint.dataset_offset - 1
+        for _ in range(count):
+            last_offset = self._pending.popleft()
+        self._checkpoint = self._checkpoint.model_copy(
+            update={
+                "dataset_offset": last_offset + 1,
+                "samples_ingested": self._checkpoint.samples_ingested + count,
+                "last_batch": self._checkpoint.last_batch + 1,
+            }
+        )
+        if self._dedup is None:
+            self._store.save(self._checkpoint)
+            return
+        self._dedup.confirm(last_offset + 1)
+        self._unsaved = True
+        if time.monotonic() - self._last_save >= self._dedup_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Save progress held back by the near-duplicate save interval."""
+        if not self._unsaved:
+            return
+        self._store.save(self._checkpoint, self._dedup)
+        self._last_save = time.monotonic()
+        self._unsaved = False
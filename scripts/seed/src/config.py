@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Mapping, Optional, Tuple
+import re
+from typing import Any, Dict, List, Literal, Mapping, Optional, Sequence, Tuple
 
-from pydantic import BaseModel, ConfigDict, PositiveInt
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    NonNegativeInt,
+    PositiveInt,
+    model_validator,
+)
 
 from .utils import sanitize_property_name
 
@@ -19,9 +29,184 @@ DATASET_OUTPUT_REFERENCE: list[str] = [
 ]  # Use company name and website as output
 
 DEFAULT_BATCH_SIZE = 32
+# "openai" calls the embeddings API; "local" runs a sentence-transformers
+# model on the CPU, in which case DEFAULT_MODEL_NAME is a Hub model id such
+# as "sentence-transformers/all-MiniLM-L6-v2".
+DEFAULT_EMBEDDING_BACKEND: Literal["openai", "local"] = "openai"
 DEFAULT_MODEL_NAME = "text-embedding-3-large"
 DEFAULT_CLASS_NAME = "LLMTrainingSample"
 DEFAULT_MAX_SAMPLES: Optional[int] = None
+DEFAULT_CHECKPOINT_PATH = ".seed-checkpoint.json"
+# Written by sharded runs (--shard-count > 1) for `main.py --merge-shards`.
+DEFAULT_SHARD_REPORT_PATH = ".seed-shard-report.json"
+# Rows per record batch in vector snapshots (--export-snapshot).
+DEFAULT_SNAPSHOT_BATCH_ROWS = 10_000
+# Stream records from the Hub instead of downloading the full split first.
+DEFAULT_STREAMING = True
+# Worker processes for the sharded translation path (only used when not
+# streaming); None translates records in the main process.
+DEFAULT_TRANSLATE_NUM_PROC: Optional[int] = None
+DEFAULT_TRANSLATE_BATCH_SIZE = 1000
+# Weaviate upload tuning: request size adapts between the bounds to keep each
+# insert_many call near the target latency (seconds).
+DEFAULT_UPLOAD_CONCURRENCY = 4
+DEFAULT_UPLOAD_MIN_BATCH_SIZE = 16
+DEFAULT_UPLOAD_MAX_BATCH_SIZE = 1000
+DEFAULT_UPLOAD_TARGET_LATENCY = 2.0
+DEFAULT_UPLOAD_MAX_RETRIES = 3
+# Manifest runs: datasets ingested at once, and the cap on insert_many
+# requests in flight across all of them.
+DEFAULT_MAX_CONCURRENT_DATASETS = 4
+DEFAULT_MAX_INFLIGHT_UPLOADS = 8
+# Staged pipeline: bounded queues between load, translate, embed and upload.
+# The loaded and translated queues hold record batches of
+# translate_batch_size rows; the embedded queue holds single samples with
+# their vectors. Translation runs on its own pool of threads.
+DEFAULT_LOADED_QUEUE_SIZE = 4
+DEFAULT_TRANSLATED_QUEUE_SIZE = 4
+DEFAULT_EMBEDDED_QUEUE_SIZE = 1000
+DEFAULT_TRANSLATE_WORKERS = 1
+# Near-duplicate filter between translation and embedding: samples whose
+# input text has an estimated Jaccard similarity (over byte shingles) of at
+# least the threshold with an earlier sample are dropped. None disables it.
+# LSH band keys are kept in a Bloom filter of DEFAULT_DEDUP_MEMORY_MB, so
+# memory does not grow with the dataset.
+DEFAULT_DEDUP_THRESHOLD: Optional[float] = None
+DEFAULT_DEDUP_NUM_PERM = 128
+DEFAULT_DEDUP_SHINGLE_SIZE = 5
+DEFAULT_DEDUP_MEMORY_MB = 64
+# With dedup enabled, its filter is saved next to the checkpoint; both are
+# written at most every interval (seconds), since each save copies the filter.
+DEFAULT_DEDUP_CHECKPOINT_SECONDS = 60.0
+# Stage telemetry: JSON summary rewritten every interval (seconds) and once
+# more with the final run report.
+DEFAULT_TELEMETRY_PATH = ".seed-telemetry.json"
+DEFAULT_TELEMETRY_INTERVAL = 10.0
+
+# Matryoshka truncation for text-embedding-3-* models (e.g. 1024 or 256);
+# None stores the model's native dimensionality.
+DEFAULT_EMBEDDING_DIMENSIONS: Optional[int] = None
+# Wire format of OpenAI embeddings responses: "base64" carries packed float32
+# values decoded with NumPy, "float" a JSON array of numbers.
+DEFAULT_EMBEDDING_ENCODING_FORMAT: Literal["base64", "float"] = "base64"
+# Retries per embeddings request (rate limits, 5xx); the client backs off
+# exponentially and honours the API's retry-after hints.
+DEFAULT_EMBEDDING_MAX_RETRIES = 6
+# Vector index tuning for newly created collections. None keeps Weaviate's
+# defaults; compression is one of "pq", "bq" or "sq".
+DEFAULT_VECTOR_COMPRESSION: Optional[Literal["pq", "bq", "sq"]] = None
+DEFAULT_PQ_SEGMENTS: Optional[int] = None
+DEFAULT_HNSW_EF: Optional[int] = None
+DEFAULT_HNSW_EF_CONSTRUCTION: Optional[int] = None
+DEFAULT_HNSW_MAX_CONNECTIONS: Optional[int] = None
+# Inverted-index settings for properties of newly created collections.
+# Unlisted properties are searchable (BM25) and filterable. output_reference
+# holds whole JSON-encoded responses that are returned but never queried, so
+# indexing it only costs ingest time, memory and disk.
+DEFAULT_PROPERTY_INDEXING: Dict[str, Dict[str, bool]] = {
+    "output_reference": {"searchable": False, "filterable": False},
+}
+# Store each dataset as its own tenant (a separate shard keyed by datasetName)
+# of a multi-tenant collection instead of one flat collection.
+DEFAULT_MULTI_TENANCY = False
+# Compress output_reference values before upload: "zstd" stores them as
+# "zstd:" + base64 of a zstd frame when that is shorter than the JSON text.
+# Object UUIDs are derived from the uncompressed sample either way, and the
+# semantic split service decodes both forms.
+DEFAULT_PAYLOAD_COMPRESSION: Optional[Literal["zstd"]] = None
+DEFAULT_PAYLOAD_COMPRESSION_LEVEL = 9
+
+# Local backend execution: "torch" or "onnx" (needs the onnx extra), intra-op
+# threads per process (None uses every core) and embedding processes, each
+# holding its own copy of the model.
+DEFAULT_LOCAL_EMBEDDING_RUNTIME: Literal["torch", "onnx"] = "torch"
+DEFAULT_LOCAL_EMBEDDING_THREADS: Optional[int] = None
+DEFAULT_LOCAL_EMBEDDING_PROCESSES = 1
+
+NATIVE_EMBEDDING_DIMENSIONS: Dict[str, int] = {
+    "text-embedding-3-large": 3072,
+    "text-embedding-3-small": 1536,
+    "text-embedding-ada-002": 1536,
+}
+
+# Recorded in the collection description so query-time code embeds with the
+# same backend, model and dimensionality as the stored vectors.
+_EMBEDDING_MARKER = re.compile(r"\[embedding(?P<fields>(?: \w+=[^\s\]]+)*)\]")
+
+
+class EmbeddingConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    backend: Literal["openai", "local"] = "openai"
+    model_name: str
+    dimensions: Optional[PositiveInt] = None
+
+    @model_validator(mode="after")
+    def _check_dimensions(self) -> "EmbeddingConfig":
+        # Local models are truncated client-side, so any size up to the
+        # model's own is accepted; the backend checks it once loaded.
+        if self.dimensions is None or self.backend == "local":
+            return self
+        if not self.model_name.startswith("text-embedding-3"):
+            raise ValueError(
+                f"Model '{self.model_name}' does not support reduced dimensions."
+            )
+        native = NATIVE_EMBEDDING_DIMENSIONS.get(self.model_name)
+        if native is not None and self.dimensions > native:
+            raise ValueError(
+                f"Model '{self.model_name}' produces at most {native} dimensions."
+            )
+        return self
+
+    @property
+    def output_dimensions(self) -> Optional[int]:
+        return self.dimensions or NATIVE_EMBEDDING_DIMENSIONS.get(self.model_name)
+
+    def describe(self) -> str:
+        fields = f" backend={self.backend} model={self.model_name}"
+        if self.dimensions is not None:
+            fields += f" dimensions={self.dimensions}"
+        return f"[embedding{fields}]"
+
+    @classmethod
+    def from_description(cls, description: Optional[str]) -> Optional["EmbeddingConfig"]:
+        match = _EMBEDDING_MARKER.search(description or "")
+        if match is None:
+            return None
+        fields = dict(item.split("=", 1) for item in match.group("fields").split())
+        # Collections seeded before backends existed were always OpenAI.
+        return cls(
+            backend=fields.get("backend", "openai"),
+            model_name=fields["model"],
+            dimensions=fields.get("dimensions"),
+        )
+
+
+class VectorIndexConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    compression: Optional[Literal["pq", "bq", "sq"]] = None
+    pq_segments: Optional[PositiveInt] = None
+    ef: Optional[int] = None
+    ef_construction: Optional[PositiveInt] = None
+    max_connections: Optional[PositiveInt] = None
+
+
+class PropertyIndexConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    searchable: bool = True
+    filterable: bool = True
+
+
+class SchemaConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    property_indexing: Dict[str, PropertyIndexConfig] = {}
+    multi_tenancy: bool = False
+
+    def property_index(self, name: str) -> PropertyIndexConfig:
+        return self.property_indexing.get(name, PropertyIndexConfig())
 
 
 class DatasetConfig(BaseModel):
@@ -38,6 +223,53 @@ class DatasetConfig(BaseModel):
     expected_output_property: str
     static_metadata: Dict[str, str]
     max_samples: Optional[PositiveInt] = None
+    streaming: bool = True
+    translate_num_proc: Optional[PositiveInt] = None
+    translate_batch_size: PositiveInt = 1000
+    dedup_threshold: Optional[float] = Field(default=None, gt=0.0, le=1.0)
+    # Only records whose dataset offset is shard_index modulo shard_count.
+    shard_index: NonNegativeInt = 0
+    shard_count: PositiveInt = 1
+
+    @model_validator(mode="after")
+    def _check_shard(self) -> "DatasetConfig":
+        if self.shard_index >= self.shard_count:
+            raise ValueError("shard_index must be smaller than shard_count.")
+        return self
+
+    def for_shard(self, shard_index: int, shard_count: int) -> "DatasetConfig":
+        """This dataset restricted to one of ``shard_count`` disjoint slices.
+
+        Record ``i`` belongs to shard ``i % shard_count``, so every shard
+        derives its slice from the dataset alone. ``max_samples`` is split
+        across the shards, which together still produce that many samples.
+        """
+        max_samples = self.max_samples
+        if max_samples is not None:
+            remainder = 1 if shard_index < max_samples % shard_count else 0
+            max_samples = max_samples // shard_count + remainder
+            if not max_samples:
+                raise ValueError(
+                    f"max_samples ({self.max_samples}) for {self.dataset_name} is smaller "
+                    f"than the shard count ({shard_count})."
+                )
+        return DatasetConfig.model_validate(
+            {
+                **self.model_dump(),
+                "shard_index": shard_index,
+                "shard_count": shard_count,
+                "max_samples": max_samples,
+            }
+        )
+
+    @property
+    def sample_properties(self) -> Tuple[str, ...]:
+        return (
+            self.text_property,
+            self.task_property,
+            self.expected_output_property,
+            *self.static_metadata,
+        )
 
     def translate_record(self, record: Mapping[str, Any]) -> Optional[Dict[str, str]]:
         input_raw = record.get(self.text_field)
@@ -62,9 +294,8 @@ class DatasetConfig(BaseModel):
                 return None
             expected_payload.append(value)
 
-        try:
-            expected_output_json = json.dumps(expected_payload)
-        except (TypeError, ValueError):
+        expected_output_json = _encode_expected_output(expected_payload)
+        if expected_output_json is None:
             return None
 
         return {
@@ -74,19 +305,123 @@ class DatasetConfig(BaseModel):
             **self.static_metadata,
         }
 
+    def translate_batch(
+        self,
+        batch: pa.Table,
+        keep_columns: Sequence[str] = (),
+    ) -> pa.Table:
+        """Columnar equivalent of :meth:`translate_record` for a whole record batch.
+
+        Rows are dropped under the same rules (empty input, missing expected
+        output, unserialisable payload). ``keep_columns`` are carried over from
+        ``batch`` unchanged for the surviving rows.
+        """
+        schema = pa.schema(
+            [(name, pa.string()) for name in self.sample_properties]
+            + [(name, batch.schema.field(name).type) for name in keep_columns]
+        )
+        if self.text_field not in batch.column_names or any(
+            field not in batch.column_names for field in self.expected_output_fields
+        ):
+            return schema.empty_table()
+
+        input_text = _stripped_text(batch.column(self.text_field))
+        keep = pc.fill_null(pc.greater(pc.utf8_length(input_text), 0), False)
+        for field in self.expected_output_fields:
+            keep = pc.and_(keep, pc.is_valid(batch.column(field)))
+
+        batch = batch.filter(keep)
+        input_text = input_text.filter(keep)
+
+        expected_output = _encode_expected_outputs(
+            [batch.column(field) for field in self.expected_output_fields]
+        )
+        encoded = pc.is_valid(expected_output)
+        if not pc.all(encoded).as_py():
+            batch = batch.filter(encoded)
+            input_text = input_text.filter(encoded)
+            expected_output = expected_output.filter(encoded)
+
+        num_rows = batch.num_rows
+        if self.task_field and self.task_field in batch.column_names:
+            task_value = pc.fill_null(_stripped_text(batch.column(self.task_field)), "")
+        else:
+            task_value = pa.repeat("", num_rows).cast(pa.string())
+
+        columns: List[Any] = [
+            input_text.cast(pa.string()),
+            task_value.cast(pa.string()),
+            expected_output,
+        ]
+        columns.extend(
+            pa.repeat(value, num_rows).cast(pa.string())
+            for value in self.static_metadata.values()
+        )
+        columns.extend(batch.column(name) for name in keep_columns)
+        return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _encode_expected_output(payload: Sequence[Any]) -> Optional[str]:
+    try:
+        return orjson.dumps(payload).decode("utf-8")
+    except TypeError:
+        return None
+
+
+def _encode_expected_outputs(columns: List[pa.ChunkedArray]) -> pa.Array:
+    """:func:`_encode_expected_output` for every row of aligned output columns.
+
+    JSON text is still produced per row: Arrow's string kernels, one
+    ``replace_substring`` pass per escape, measured slower than orjson on
+    multi-line outputs. The batch saves the per-record dict handling around
+    it instead. Rows that cannot be encoded come back as null.
+    """
+    rows = zip(*(column.to_pylist() for column in columns))
+    dumps = orjson.dumps
+    try:
+        encoded = [dumps(values).decode("utf-8") for values in rows]
+    except TypeError:
+        # Only pay for per-row error handling when some payload is unserialisable.
+        rows = zip(*(column.to_pylist() for column in columns))
+        encoded = [_encode_expected_output(values) for values in rows]
+    return pa.array(encoded, type=pa.string())
+
+
+def _stripped_text(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+        # Arrow's casts format numbers and booleans differently from str();
+        # non-string columns are rare enough to convert in Python.
+        values = [None if value is None else str(value) for value in column.to_pylist()]
+        column = pa.chunked_array([pa.array(values, type=pa.string())])
+    return pc.utf8_trim_whitespace(column)
+
 
 def parse_dataset_config() -> DatasetConfig:
-    dataset_name = DATASET_NAME
-    dataset_config = DATASET_CONFIG
-    dataset_split = DATASET_SPLIT
+    return build_dataset_config(
+        dataset_name=DATASET_NAME,
+        dataset_config=DATASET_CONFIG,
+        dataset_split=DATASET_SPLIT,
+        text_field=DATASET_INPUT_REFERENCE,
+        task_field=DATASET_TASK_REFERENCE,
+        expected_output_fields=DATASET_OUTPUT_REFERENCE,
+        max_samples=DEFAULT_MAX_SAMPLES,
+    )
 
-    text_field = DATASET_INPUT_REFERENCE
-    task_field = DATASET_TASK_REFERENCE
 
-    expected_output_fields = tuple(DATASET_OUTPUT_REFERENCE)
+def build_dataset_config(
+    dataset_name: str,
+    dataset_config: Optional[str],
+    dataset_split: str,
+    text_field: str,
+    task_field: Optional[str],
+    expected_output_fields: Sequence[str],
+    max_samples: Optional[int] = None,
+    dedup_threshold: Optional[float] = DEFAULT_DEDUP_THRESHOLD,
+) -> DatasetConfig:
+    expected_output_fields = tuple(expected_output_fields)
     if not expected_output_fields:
         raise RuntimeError(
-            f"DATASET_OUTPUT_REFERENCE for dataset '{dataset_name}' must contain at least one field."
+            f"Expected output fields for dataset '{dataset_name}' must contain at least one field."
         )
 
     text_property = sanitize_property_name("input")
@@ -98,8 +433,6 @@ def parse_dataset_config() -> DatasetConfig:
         "datasetSplit": dataset_split,
     }
 
-    max_samples = DEFAULT_MAX_SAMPLES
-
     return DatasetConfig(
         dataset_name=dataset_name,
         dataset_config=dataset_config,
@@ -112,4 +445,36 @@ def parse_dataset_config() -> DatasetConfig:
         expected_output_property=expected_output_property,
         static_metadata=static_metadata,
         max_samples=max_samples,
+        streaming=DEFAULT_STREAMING,
+        translate_num_proc=DEFAULT_TRANSLATE_NUM_PROC,
+        translate_batch_size=DEFAULT_TRANSLATE_BATCH_SIZE,
+        dedup_threshold=dedup_threshold,
+    )
+
+
+def parse_embedding_config() -> EmbeddingConfig:
+    return EmbeddingConfig(
+        backend=DEFAULT_EMBEDDING_BACKEND,
+        model_name=DEFAULT_MODEL_NAME,
+        dimensions=DEFAULT_EMBEDDING_DIMENSIONS,
+    )
+
+
+def parse_schema_config() -> SchemaConfig:
+    return SchemaConfig(
+        property_indexing={
+            sanitize_property_name(name): PropertyIndexConfig(**settings)
+            for name, settings in DEFAULT_PROPERTY_INDEXING.items()
+        },
+        multi_tenancy=DEFAULT_MULTI_TENANCY,
+    )
+
+
+def parse_vector_index_config() -> VectorIndexConfig:
+    return VectorIndexConfig(
+        compression=DEFAULT_VECTOR_COMPRESSION,
+        pq_segments=DEFAULT_PQ_SEGMENTS,
+        ef=DEFAULT_HNSW_EF,
+        ef_construction=DEFAULT_HNSW_EF_CONSTRUCTION,
+        max_connections=DEFAULT_HNSW_MAX_CONNECTIONS,
     )
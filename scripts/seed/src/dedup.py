@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    DEFAULT_DEDUP_MEMORY_MB,
+    DEFAULT_DEDUP_NUM_PERM,
+    DEFAULT_DEDUP_SHINGLE_SIZE,
+)
+
+SampleRecord = Dict[str, str]
+
+# Bloom filter hash functions per LSH band key.
+_BLOOM_HASHES = 3
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Choose ``(bands, rows)`` whose S-curve ``1 - (1 - s^r)^b`` crosses ``threshold``.
+
+    Minimises the probability mass of false positives below the threshold
+    plus false negatives above it, the usual MinHash LSH tuning.
+    """
+    similarities = np.linspace(0.0, 1.0, 201)
+    best: Tuple[float, int, int] = (math.inf, 1, num_perm)
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1.0 - (1.0 - similarities**rows) ** bands
+        below = similarities < threshold
+        error = candidate[below].sum() + (1.0 - candidate[~below]).sum()
+        if error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateFilter:
+    """Streaming MinHash/LSH filter for near-identical texts.
+
+    Each text is reduced to ``num_perm`` MinHash values over byte shingles of
+    its normalised form, split into LSH bands. A text whose band keys were
+    already seen is dropped as a near-duplicate of an earlier one. Band keys
+    live in a fixed-size Bloom filter of ``memory_mb`` megabytes, so memory
+    stays constant however many rows pass through; the cost is a small,
+    reported rate of false removals as the filter fills up.
+
+    Texts passed with their dataset offset are journalled until
+    :meth:`confirm` covers them, so :meth:`save` can write the filter as it
+    stood after the last confirmed sample. A resumed run that loads it
+    checks new samples against everything ingested before, and does not
+    mistake the unconfirmed samples it reads again for duplicates.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        *,
+        num_perm: int = DEFAULT_DEDUP_NUM_PERM,
+        shingle_size: int = DEFAULT_DEDUP_SHINGLE_SIZE,
+        memory_mb: int = DEFAULT_DEDUP_MEMORY_MB,
+        seed: int = 0,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("shingle_size must be between 1 and 8 bytes.")
+        self.threshold = threshold
+        self._parameters: Dict[str, Any] = {
+            "threshold": threshold,
+            "num_perm": num_perm,
+            "shingle_size": shingle_size,
+            "memory_mb": memory_mb,
+            "seed": seed,
+        }
+        self._shingle_size = shingle_size
+        self._bands, self._rows = lsh_parameters(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd multipliers, results taken from the high bits.
+        self._multipliers = rng.integers(1, 2**63, size=(self._bands * self._rows, 1), dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 2**63, size=(self._bands * self._rows, 1), dtype=np.uint64)
+        self._band_mixers = rng.integers(1, 2**63, size=self._rows, dtype=np.uint64) | np.uint64(1)
+        self._band_salts = rng.integers(0, 2**63, size=self._bands, dtype=np.uint64)
+        self._bits = np.zeros(max(1, memory_mb) * 2**20, dtype=np.uint8)
+        self._bit_count = np.uint64(self._bits.size * 8)
+        self._bits_set = 0
+        # Bits first set by each kept, not yet confirmed sample, by offset.
+        self._journal: Deque[Tuple[int, np.ndarray]] = deque()
+        # The dedup stage checks texts while the upload thread confirms them.
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.removed = 0
+
+    @property
+    def bands(self) -> int:
+        return self._bands
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (``bands * rows`` values) of the normalised text."""
+        shingles = self._shingles(text)
+        hashed = (self._multipliers * shingles[None, :] + self._offsets) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+    def is_duplicate(self, text: str, offset: Optional[int] = None) -> bool:
+        """Check ``text`` against everything seen so far and remember it if new.
+
+        With the text's dataset ``offset``, the bits it sets are journalled
+        until :meth:`confirm` passes that offset.
+        """
+        positions = self._bloom_positions(self.signature(text))
+        byte_index, bit_mask = positions >> np.uint64(3), (1 << (positions & np.uint64(7))).astype(np.uint8)
+        with self._lock:
+            self.seen += 1
+            present = (self._bits[byte_index] & bit_mask) != 0
+            # A band matches when all of its Bloom bits are set; one matching
+            # band makes the text an LSH candidate.
+            if present.all(axis=1).any():
+                self.removed += 1
+                return True
+            newly_set = np.unique(positions[~present])
+            np.bitwise_or.at(self._bits, byte_index.ravel(), bit_mask.ravel())
+            self._bits_set += len(newly_set)
+            if offset is not None:
+                self._journal.append((offset, newly_set))
+        return False
+
+    def filter(
+        self, samples: Iterable[Tuple[int, SampleRecord]], text_property: str
+    ) -> Iterator[Tuple[int, SampleRecord]]:
+        for offset, sample in samples:
+            if not self.is_duplicate(sample[text_property], offset):
+                yield offset, sample
+
+    def filter_batch(
+        self, samples: List[Tuple[int, SampleRecord]], text_property: str
+    ) -> List[Tuple[int, SampleRecord]]:
+        return list(self.filter(samples, text_property))
+
+    def confirm(self, end_offset: int) -> None:
+        """Mark every sample before dataset offset ``end_offset`` as ingested."""
+        with self._lock:
+            while self._journal and self._journal[0][0] < end_offset:
+                self._journal.popleft()
+
+    def save(self, path: Path) -> None:
+        """Write the filter as of the last :meth:`confirm`, atomically."""
+        with self._lock:
+            bits = self._bits.copy()
+            bits_set = self._bits_set
+            # Confirmation follows dataset order, so bits first set by
+            # unconfirmed samples were all clear after the confirmed ones.
+            for _, positions in self._journal:
+                bits[positions >> np.uint64(3)] &= ~(1 << (positions & np.uint64(7))).astype(np.uint8)
+                bits_set -= len(positions)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                bits=bits,
+                bits_set=np.int64(bits_set),
+                parameters=np.array(json.dumps(self._parameters, sort_keys=True)),
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path) -> None:
+        """Restore a filter written by :meth:`save` with the same parameters."""
+        try:
+            with np.load(path) as data:
+                parameters = json.loads(str(data["parameters"]))
+                if parameters != self._parameters:
+                    raise RuntimeError(
+                        f"Near-duplicate state '{path}' was written with {parameters}, not "
+                        f"{self._parameters}; delete it and the checkpoint to start over."
+                    )
+                bits, bits_set = data["bits"], int(data["bits_set"])
+        except (OSError, ValueError, KeyError) as e:
+            raise RuntimeError(
+                f"Near-duplicate state '{path}' is corrupt; delete it and the checkpoint to start over."
+            ) from e
+        with self._lock:
+            self._bits[:] = bits
+            self._bits_set = bits_set
+            self._journal.clear()
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated chance that a genuinely new text is removed, at the current fill."""
+        fill = self._bits_set / float(self._bit_count)
+        per_band = fill**_BLOOM_HASHES
+        return 1.0 - (1.0 - per_band) ** self._bands
+
+    def summary(self) -> str:
+        return (
+            f"Removed {self.removed} of {self.seen} samples as near-duplicates "
+            f"(threshold {self.threshold:g}, {self._bands} bands x {self._rows} rows, "
+            f"estimated false removals {self.false_positive_rate:.3%})."
+        )
+
+    def _shingles(self, text: str) -> np.ndarray:
+        data = " ".join(text.lower().split()).encode("utf-8")
+        if len(data) < self._shingle_size:
+            data = data.ljust(self._shingle_size, b"\0")
+        raw = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+        windows = np.lib.stride_tricks.sliding_window_view(raw, self._shingle_size)
+        weights = np.uint64(256) ** np.arange(self._shingle_size, dtype=np.uint64)
+        return np.unique((windows * weights).sum(axis=1, dtype=np.uint64))
+
+    def _bloom_positions(self, signature: np.ndarray) -> np.ndarray:
+        bands = signature.reshape(self._bands, self._rows)
+        keys = (bands * self._band_mixers).sum(axis=1, dtype=np.uint64) ^ self._band_salts
+        first = keys & _MASK_32
+        second = (keys >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(_BLOOM_HASHES, dtype=np.uint64)
+        return (first[:, None] + steps[None, :] * second[:, None]) % self._bit_count
@@ -1,78 +1,354 @@
 from __future__ import annotations
 
 import atexit
-from multiprocessing import get_context
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import base64
+import importlib.util
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from multiprocessing import TimeoutError as PoolTimeoutError, get_context
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
 
-from openai import OpenAI
+import numpy as np
+from openai import OpenAI, OpenAIError
 
-from .utils import ProgressPrinter
+from .config import (
+    DEFAULT_EMBEDDING_ENCODING_FORMAT,
+    DEFAULT_EMBEDDING_MAX_RETRIES,
+    DEFAULT_LOCAL_EMBEDDING_PROCESSES,
+    DEFAULT_LOCAL_EMBEDDING_RUNTIME,
+    DEFAULT_LOCAL_EMBEDDING_THREADS,
+    EmbeddingConfig,
+)
+from .telemetry import StageTelemetry
 
-_WORKER_CLIENT: Optional[OpenAI] = None
+_WORKER_BACKEND: Optional["EmbeddingBackend"] = None
+_WORKER_BACKEND_ARGS: Optional[
+    Tuple[EmbeddingConfig, Optional[str], Optional[str], Literal["base64", "float"]]
+] = None
+_RESULT_POLL_SECONDS = 1.0
 
 # A dataset sample expressed as a simple string map; all values have already been
 # normalised upstream (input text, task/system prompt, expected output JSON).
 SampleRecord = Dict[str, str]
 BatchResult = List[Tuple[SampleRecord, List[float]]]
 
+
+class EmbeddingRequestError(OpenAIError):
+    """An embeddings request failed inside a worker process.
+
+    OpenAI's API errors cannot be unpickled, and a pool result that fails to
+    unpickle is never delivered, so workers re-raise them as this error.
+    """
+
+
 def create_openai_client(
     api_key: str,
     base_url: Optional[str] = None,
+    max_retries: int = DEFAULT_EMBEDDING_MAX_RETRIES,
 ) -> OpenAI:
-    kwargs = {"api_key": api_key}
+    kwargs: Dict[str, Any] = {"api_key": api_key, "max_retries": max_retries}
     if base_url:
         kwargs["base_url"] = base_url
     return OpenAI(**kwargs)
 
 
+class EmbeddingBackend(ABC):
+    """Turns a batch of texts into a ``(len(texts), dims)`` float32 matrix."""
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: Optional[str],
+        model_name: str,
+        dimensions: Optional[int] = None,
+        encoding_format: Literal["base64", "float"] = DEFAULT_EMBEDDING_ENCODING_FORMAT,
+    ) -> None:
+        self._client = create_openai_client(api_key=api_key, base_url=base_url)
+        self._request_kwargs: Dict[str, Any] = {
+            "model": model_name,
+            "encoding_format": encoding_format,
+        }
+        if dimensions is not None:
+            self._request_kwargs["dimensions"] = dimensions
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        response = self._client.embeddings.create(input=texts, **self._request_kwargs)
+        if len(response.data) != len(texts):
+            raise RuntimeError(
+                "OpenAI embeddings response size did not match the input batch."
+            )
+        if self._request_kwargs["encoding_format"] == "base64":
+            # Requested explicitly, the client hands back the packed float32
+            # strings untouched; decode them straight into one matrix.
+            return np.stack(
+                [
+                    np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                    for item in response.data
+                ]
+            )
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """A sentence-transformers model running on the CPU.
+
+    The model's own batching and intra-op threads do the heavy lifting;
+    truncation to ``dimensions`` and L2 normalisation happen in NumPy so the
+    vectors match what cosine search in Weaviate expects.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        dimensions: Optional[int] = None,
+        runtime: Literal["torch", "onnx"] = DEFAULT_LOCAL_EMBEDDING_RUNTIME,
+        threads: Optional[int] = DEFAULT_LOCAL_EMBEDDING_THREADS,
+    ) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "The local embedding backend needs sentence-transformers; "
+                "install it with `uv sync --extra local` (or `--extra onnx`)."
+            ) from e
+        model_kwargs: Optional[Dict[str, Any]] = None
+        if runtime == "onnx":
+            model_kwargs = {"provider": "CPUExecutionProvider"}
+            if threads:
+                import onnxruntime
+
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = threads
+                model_kwargs["session_options"] = session_options
+        elif threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self._model = SentenceTransformer(
+            model_name, device="cpu", backend=runtime, model_kwargs=model_kwargs
+        )
+        native = self._model.get_sentence_embedding_dimension()
+        if dimensions is not None and native is not None and dimensions > native:
+            raise ValueError(f"Model '{model_name}' produces at most {native} dimensions.")
+        self._dimensions = dimensions
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self._model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+        if self._dimensions is not None:
+            vectors = vectors[:, : self._dimensions]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def create_embedding_backend(
+    config: EmbeddingConfig,
+    *,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    encoding_format: Literal["base64", "float"] = DEFAULT_EMBEDDING_ENCODING_FORMAT,
+) -> EmbeddingBackend:
+    if config.backend == "local":
+        return LocalEmbeddingBackend(model_name=config.model_name, dimensions=config.dimensions)
+    if not api_key:
+        raise ValueError("The OpenAI embedding backend requires an API key.")
+    return OpenAIEmbeddingBackend(
+        api_key=api_key,
+        base_url=base_url,
+        model_name=config.model_name,
+        dimensions=config.dimensions,
+        encoding_format=encoding_format,
+    )
+
+
+def check_embedding_backend(config: EmbeddingConfig, api_key: Optional[str]) -> None:
+    """Fail fast, in the parent process, when the backend cannot be built."""
+    if config.backend == "openai":
+        if not api_key:
+            raise RuntimeError("The OpenAI embedding backend requires OPENAI_API_KEY.")
+        return
+    required = ["sentence_transformers"]
+    if DEFAULT_LOCAL_EMBEDDING_RUNTIME == "onnx":
+        required += ["onnxruntime", "optimum"]
+    missing = [name for name in required if importlib.util.find_spec(name) is None]
+    if missing:
+        raise RuntimeError(
+            f"The local embedding backend needs {', '.join(missing)}; install it with "
+            "`uv sync --extra local` (or `--extra onnx`)."
+        )
+
+
+class EmbeddingEngine:
+    """A pool of embedding workers shared by any number of sample streams.
+
+    Every worker process builds its own backend from ``embedding_config``.
+    Each call to :meth:`embed` keeps at most ``max_inflight_batches`` batches
+    queued in the pool, so a stream is only read as fast as it is embedded
+    and several streams can share the pool from different threads.
+    """
+
+    def __init__(
+        self,
+        embedding_config: EmbeddingConfig,
+        *,
+        api_key: Optional[str],
+        base_url: Optional[str],
+        batch_size: int,
+        processes: Optional[int] = None,
+        encoding_format: Literal["base64", "float"] = DEFAULT_EMBEDDING_ENCODING_FORMAT,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        if processes is None and embedding_config.backend == "local":
+            processes = DEFAULT_LOCAL_EMBEDDING_PROCESSES
+        self._embedding_config = embedding_config
+        self._api_key = api_key
+        self._base_url = base_url
+        self._batch_size = batch_size
+        self._processes = processes
+        self._encoding_format = encoding_format
+        self._pool: Optional[Pool] = None
+
+    def __enter__(self) -> "EmbeddingEngine":
+        self._pool = get_context("spawn").Pool(
+            processes=self._processes,
+            initializer=_init_worker_backend,
+            initargs=(
+                self._embedding_config,
+                self._api_key,
+                self._base_url,
+                self._encoding_format,
+            ),
+        )
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    @property
+    def pool_size(self) -> int:
+        return self._processes or os.cpu_count() or 1
+
+    @property
+    def max_inflight_batches(self) -> int:
+        return 2 * self.pool_size
+
+    def embed(
+        self,
+        samples: Iterable[SampleRecord],
+        text_property: str,
+        stage: Optional[StageTelemetry] = None,
+    ) -> Iterator[Tuple[SampleRecord, List[float]]]:
+        if self._pool is None:
+            raise RuntimeError("EmbeddingEngine must be used as a context manager.")
+        stage = stage or StageTelemetry("embed")
+        inflight: Deque[AsyncResult] = deque()
+        try:
+            for batch in _batched(samples, self._batch_size):
+                inflight.append(
+                    self._pool.apply_async(_embed_batch_worker, ((batch, text_property),))
+                )
+                self._update_gauges(inflight, stage)
+                if len(inflight) >= self.max_inflight_batches:
+                    yield from self._drain_one(inflight, stage)
+            while inflight:
+                yield from self._drain_one(inflight, stage)
+        finally:
+            stage.set_in_flight(0)
+            stage.set_queue_depth(0)
+
+    def _update_gauges(self, inflight: Deque[AsyncResult], stage: StageTelemetry) -> None:
+        # Requests run inside the pool, so in-flight is estimated from the
+        # submitted batches that have not finished, capped at the pool size.
+        waiting = sum(1 for result in inflight if not result.ready())
+        stage.set_in_flight(min(waiting, self.pool_size))
+        stage.set_queue_depth(len(inflight))
+
+    def _drain_one(
+        self,
+        inflight: Deque[AsyncResult],
+        stage: StageTelemetry,
+    ) -> Iterator[Tuple[SampleRecord, List[float]]]:
+        pending = inflight.popleft()
+        while True:
+            try:
+                batch_result, request_seconds = pending.get(timeout=_RESULT_POLL_SECONDS)
+                break
+            except PoolTimeoutError:
+                # A terminated pool never completes its results; stop waiting.
+                if self._pool is None:
+                    raise RuntimeError("Embedding engine was closed.") from None
+        stage.observe(request_seconds)
+        stage.add(len(batch_result), batches=1)
+        self._update_gauges(inflight, stage)
+        yield from batch_result
+
+
 def embed_samples(
     samples: Iterable[SampleRecord],
     text_property: str,
     *,
-    api_key: str,
+    api_key: Optional[str],
     base_url: Optional[str],
     model_name: str,
     batch_size: int,
+    dimensions: Optional[int] = None,
+    backend: Literal["openai", "local"] = "openai",
+    stage: Optional[StageTelemetry] = None,
+    processes: Optional[int] = None,
+    encoding_format: Literal["base64", "float"] = DEFAULT_EMBEDDING_ENCODING_FORMAT,
 ) -> Iterator[Tuple[SampleRecord, List[float]]]:
-    if batch_size <= 0:
-        raise ValueError("batch_size must be positive.")
-
-    progress = ProgressPrinter("Generating embeddings with OpenAI")
-    ctx = get_context("spawn")
-
-    def task_iter() -> Iterator[Tuple[List[SampleRecord], str, str]]:
-        for batch in _batched(samples, batch_size):
-            yield batch, text_property, model_name
-
-    with ctx.Pool(
-        initializer=_init_worker_client,
-        initargs=(api_key, base_url),
-    ) as pool:
-        try:
-            for batch_result in pool.imap(_embed_batch_worker, task_iter()):
-                for sample, embedding in batch_result:
-                    progress.update()
-                    yield sample, embedding
-        finally:
-            progress.close()
+    embedding_config = EmbeddingConfig(
+        backend=backend, model_name=model_name, dimensions=dimensions
+    )
+    with EmbeddingEngine(
+        embedding_config,
+        api_key=api_key,
+        base_url=base_url,
+        batch_size=batch_size,
+        processes=processes,
+        encoding_format=encoding_format,
+    ) as engine:
+        yield from engine.embed(samples, text_property, stage=stage)
 
 
 def _embed_batch_worker(
-    args: Tuple[List[SampleRecord], str, str],
-) -> BatchResult:
-    batch, text_property, model_name = args
-    client = _get_worker_client()
+    args: Tuple[List[SampleRecord], str],
+) -> Tuple[BatchResult, float]:
+    batch, text_property = args
+    backend = _get_worker_backend()
     inputs = [sample[text_property] for sample in batch]
-    response = client.embeddings.create(model=model_name, input=inputs)
-    if len(response.data) != len(batch):
-        raise RuntimeError(
-            "OpenAI embeddings response size did not match the input batch."
-        )
-    result: BatchResult = []
-    for sample, item in zip(batch, response.data, strict=False):
-        embedding = [float(value) for value in item.embedding]
-        result.append((sample, embedding))
-    return result
+    started = time.perf_counter()
+    try:
+        vectors = backend.embed(inputs)
+    except OpenAIError as e:
+        raise EmbeddingRequestError(f"{type(e).__name__}: {e}") from None
+    request_seconds = time.perf_counter() - started
+    return list(zip(batch, vectors.tolist())), request_seconds
 
 
 def _batched(
@@ -88,23 +364,37 @@ def _batched(
         yield batch
 
 
-def _init_worker_client(api_key: str, base_url: Optional[str]) -> None:
-    global _WORKER_CLIENT
-    _WORKER_CLIENT = create_openai_client(
-        api_key=api_key,
-        base_url=base_url,
-    )
-    atexit.register(_close_worker_client)
+def _init_worker_backend(
+    embedding_config: EmbeddingConfig,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    encoding_format: Literal["base64", "float"],
+) -> None:
+    # The backend is built on first use: an exception raised by a pool
+    # initializer makes the pool respawn the worker forever instead of
+    # surfacing the error.
+    global _WORKER_BACKEND_ARGS
+    _WORKER_BACKEND_ARGS = (embedding_config, api_key, base_url, encoding_format)
+    atexit.register(_close_worker_backend)
 
 
-def _get_worker_client() -> OpenAI:
-    if _WORKER_CLIENT is None:
-        raise RuntimeError("OpenAI client not initialised in worker process.")
-    return _WORKER_CLIENT
+def _get_worker_backend() -> EmbeddingBackend:
+    global _WORKER_BACKEND
+    if _WORKER_BACKEND is None:
+        if _WORKER_BACKEND_ARGS is None:
+            raise RuntimeError("Embedding backend not initialised in worker process.")
+        embedding_config, api_key, base_url, encoding_format = _WORKER_BACKEND_ARGS
+        _WORKER_BACKEND = create_embedding_backend(
+            embedding_config,
+            api_key=api_key,
+            base_url=base_url,
+            encoding_format=encoding_format,
+        )
+    return _WORKER_BACKEND
 
 
-def _close_worker_client() -> None:
-    global _WORKER_CLIENT
-    if _WORKER_CLIENT is not None:
-        _WORKER_CLIENT.close()
-        _WORKER_CLIENT = None
+def _close_worker_backend() -> None:
+    global _WORKER_BACKEND
+    if _WORKER_BACKEND is not None:
+        _WORKER_BACKEND.close()
+        _WORKER_BACKEND = None
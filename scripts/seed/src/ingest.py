@@ -1,18 +1,53 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING
-from uuid import uuid4
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import weaviate
 from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.data import DataObject
+from weaviate.classes.tenants import Tenant
 from weaviate.classes.init import Auth
+from weaviate.classes.query import Filter
+from weaviate.exceptions import WeaviateBaseError
+from weaviate.util import generate_uuid5
 
-from .utils import ProgressPrinter
+from .config import (
+    DEFAULT_UPLOAD_CONCURRENCY,
+    DEFAULT_UPLOAD_MAX_BATCH_SIZE,
+    DEFAULT_UPLOAD_MAX_RETRIES,
+    DEFAULT_UPLOAD_MIN_BATCH_SIZE,
+    DEFAULT_UPLOAD_TARGET_LATENCY,
+    EmbeddingConfig,
+    SchemaConfig,
+    VectorIndexConfig,
+)
+from .payload import PayloadCompressor
+from .telemetry import StageTelemetry
 
 # Shared sample representation used across the ingest pipeline.
 SampleRecord = Dict[str, str]
 
+# Base delay (seconds) for the exponential backoff between retries of failed objects.
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Weaviate tenant names allow letters, digits, '-' and '_' (at most 64).
+_TENANT_INVALID_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+_TENANT_MAX_LENGTH = 64
+# Serialises tenant creation between datasets ingested concurrently.
+_TENANT_LOCK = threading.Lock()
+
 if TYPE_CHECKING:
+    from weaviate.collections.classes.config_vector_index import _VectorIndexConfigCreate
     from weaviate.collections.collection import Collection
     from weaviate.client import WeaviateClient
 
@@ -29,78 +64,390 @@ def connect_weaviate(
     return client
 
 
+def sample_uuid(sample: SampleRecord) -> str:
+    """Derive a stable object UUID from the sample's dataset, split and content.
+
+    Re-ingesting the same record therefore overwrites the existing object
+    instead of creating a duplicate.
+    """
+    content = json.dumps(sample, sort_keys=True, ensure_ascii=False)
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    namespace = f"{sample.get('datasetName', '')}/{sample.get('datasetSplit', '')}/"
+    return generate_uuid5(content_hash, namespace)
+
+
 def ensure_collection(
     client: WeaviateClient,
     collection_name: str,
     text_property: str,
     metadata_properties: Iterable[str],
+    embedding_config: Optional[EmbeddingConfig] = None,
+    vector_index_config: Optional[VectorIndexConfig] = None,
+    schema_config: Optional[SchemaConfig] = None,
 ) -> "Collection":
+    schema_config = schema_config or SchemaConfig()
     existing_raw = client.collections.list_all()
     existing_collections = {getattr(item, "name", item) for item in existing_raw}
     if collection_name not in existing_collections:
         unique_props = {text_property, *metadata_properties, "datasetName", "datasetSplit"}
         properties = [
-            Property(
-                name=text_property,
-                data_type=DataType.TEXT,
-                description="Primary text content for fine-tuning.",
-            )
+            _text_property(text_property, "Primary text content for fine-tuning.", schema_config)
         ]
         for prop in sorted(unique_props):
             if prop == text_property:
                 continue
-            properties.append(
-                Property(
-                    name=prop,
-                    data_type=DataType.TEXT,
-                    description=f"Metadata field '{prop}'.",
-                )
-            )
+            properties.append(_text_property(prop, f"Metadata field '{prop}'.", schema_config))
 
+        description = "Synthetic dataset for language model fine-tuning."
+        if embedding_config is not None:
+            description = f"{description} {embedding_config.describe()}"
         client.collections.create(
             name=collection_name,
-            description="Synthetic dataset for language model fine-tuning.",
-            vector_config=Configure.Vectors.self_provided(),
+            description=description,
+            vector_config=Configure.Vectors.self_provided(
+                vector_index_config=_vector_index_config(vector_index_config),
+            ),
             properties=properties,
+            multi_tenancy_config=(
+                Configure.multi_tenancy(enabled=True) if schema_config.multi_tenancy else None
+            ),
         )
+    else:
+        existing = client.collections.get(collection_name).config.get()
+        if embedding_config is not None:
+            _check_embedding_config(collection_name, existing.description, embedding_config)
+        _check_multi_tenancy(collection_name, existing.multi_tenancy_config.enabled, schema_config)
 
     return client.collections.get(collection_name)
 
 
+def tenant_name(dataset_name: str) -> str:
+    """Weaviate tenant holding one dataset, e.g. ``FreedomIntelligence-medical-o1-reasoning-SFT``."""
+    name = _TENANT_INVALID_CHARS.sub("-", dataset_name).strip("-") or "dataset"
+    if len(name) > _TENANT_MAX_LENGTH:
+        # Keep long names unique: truncate and append a hash of the full name.
+        digest = hashlib.sha256(dataset_name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[: _TENANT_MAX_LENGTH - 9]}-{digest}"
+    return name
+
+
+def tenant_collection(collection: Collection, dataset_name: str) -> Collection:
+    """Return ``collection`` scoped to the dataset's tenant, creating the tenant if needed."""
+    name = tenant_name(dataset_name)
+    with _TENANT_LOCK:
+        if name not in collection.tenants.get():
+            collection.tenants.create(Tenant(name=name))
+    return collection.with_tenant(name)
+
+
+def count_objects(collection: Collection, dataset_name: str, dataset_split: str) -> int:
+    """Number of objects stored for one dataset split."""
+    result = collection.aggregate.over_all(
+        total_count=True,
+        filters=Filter.by_property("datasetName").equal(dataset_name)
+        & Filter.by_property("datasetSplit").equal(dataset_split),
+    )
+    return result.total_count or 0
+
+
+def _text_property(name: str, description: str, schema_config: SchemaConfig) -> Property:
+    index = schema_config.property_index(name)
+    return Property(
+        name=name,
+        data_type=DataType.TEXT,
+        description=description,
+        index_searchable=index.searchable,
+        index_filterable=index.filterable,
+    )
+
+
+def _check_embedding_config(
+    collection_name: str, description: Optional[str], embedding_config: EmbeddingConfig
+) -> None:
+    recorded = EmbeddingConfig.from_description(description)
+    if recorded is not None and recorded != embedding_config:
+        raise RuntimeError(
+            f"Collection '{collection_name}' stores {recorded.describe()} vectors but the seed "
+            f"is configured for {embedding_config.describe()}; use a new collection or "
+            "match the embedding settings."
+        )
+
+
+def _check_multi_tenancy(collection_name: str, enabled: bool, schema_config: SchemaConfig) -> None:
+    if enabled != schema_config.multi_tenancy:
+        state = "is" if enabled else "is not"
+        raise RuntimeError(
+            f"Collection '{collection_name}' {state} multi-tenant but DEFAULT_MULTI_TENANCY is "
+            f"{schema_config.multi_tenancy}; use a new collection or match the setting."
+        )
+
+
+def _vector_index_config(
+    config: Optional[VectorIndexConfig],
+) -> Optional[_VectorIndexConfigCreate]:
+    if config is None:
+        return None
+    quantizer = None
+    if config.compression == "pq":
+        quantizer = Configure.VectorIndex.Quantizer.pq(segments=config.pq_segments)
+    elif config.compression == "bq":
+        quantizer = Configure.VectorIndex.Quantizer.bq()
+    elif config.compression == "sq":
+        quantizer = Configure.VectorIndex.Quantizer.sq()
+    return Configure.VectorIndex.hnsw(
+        ef=config.ef,
+        ef_construction=config.ef_construction,
+        max_connections=config.max_connections,
+        quantizer=quantizer,
+    )
+
+
+@dataclass
+class UploadReport:
+    uploaded: int = 0
+    failed: int = 0
+    retried: int = 0
+    requests: int = 0
+    elapsed: float = 0.0
+    errors: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.uploaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"Uploaded {self.uploaded} objects in {self.elapsed:.1f}s "
+            f"({self.objects_per_second:.1f} objects/s, {self.requests} requests, "
+            f"{self.retried} retried, {self.failed} failed)."
+        ]
+        for message, count in self.errors.most_common(10):
+            lines.append(f"  {count} x {message}")
+        return "\n".join(lines)
+
+
+class AdaptiveBatchSizer:
+    """Additive-increase / multiplicative-decrease batch sizing.
+
+    Batches that come back well under ``target_latency`` grow the next batch,
+    slower ones halve it, so request size settles where Weaviate answers
+    within the target.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        target_latency: float,
+    ) -> None:
+        if not 0 < minimum <= maximum:
+            raise ValueError("Batch size bounds must satisfy 0 < minimum <= maximum.")
+        self._minimum = minimum
+        self._maximum = maximum
+        self._target_latency = target_latency
+        self._size = min(max(initial, minimum), maximum)
+        self._step = max(1, minimum)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def observe(self, batch_size: int, latency: float) -> None:
+        with self._lock:
+            if latency > self._target_latency:
+                self._size = max(self._minimum, self._size // 2)
+            elif latency < self._target_latency / 2 and batch_size >= self._size:
+                self._size = min(self._maximum, self._size + self._step)
+
+
+class BatchUploader:
+    """Upload objects with concurrent ``insert_many`` requests.
+
+    Objects rejected by Weaviate are retried with exponential backoff; those
+    still failing after ``max_retries`` attempts are counted in the report.
+    Completed batches are confirmed through ``on_batch_confirmed`` strictly in
+    submission order, even though requests finish out of order. Confirmation
+    stops at the first batch with failed objects, so a checkpoint never moves
+    past records Weaviate did not accept and a resumed run sends them again. A
+    ``compressor`` rewrites the stored properties after the object UUID has
+    been derived from the original sample.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        sizer: AdaptiveBatchSizer,
+        *,
+        concurrency: int,
+        max_retries: int,
+        on_batch_confirmed: Optional[Callable[[int], None]] = None,
+        request_slots: Optional[threading.Semaphore] = None,
+        stage: Optional[StageTelemetry] = None,
+        compressor: Optional[PayloadCompressor] = None,
+    ) -> None:
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive.")
+        self._collection = collection
+        self._sizer = sizer
+        self._concurrency = concurrency
+        self._max_retries = max_retries
+        self._on_batch_confirmed = on_batch_confirmed
+        self._request_slots = request_slots
+        self._compressor = compressor
+        self._report = UploadReport()
+        self._lock = threading.Lock()
+        self._stage = stage or StageTelemetry("upload")
+        # Sizes and failed-object counts of finished batches keyed by sequence
+        # number, awaiting confirmation.
+        self._finished: Dict[int, Tuple[int, int]] = {}
+        self._next_to_confirm = 0
+        # Set once a batch lost objects; nothing after it is confirmed.
+        self._confirmation_stopped = False
+
+    def run(self, samples_with_vectors: Iterable[Tuple[SampleRecord, List[float]]]) -> UploadReport:
+        start = time.perf_counter()
+        iterator = iter(samples_with_vectors)
+        pending: Dict[Future[int], Tuple[int, int]] = {}
+        sequence = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+                while True:
+                    batch = list(islice(iterator, self._sizer.size))
+                    if not batch:
+                        break
+                    future = executor.submit(self._send, batch)
+                    pending[future] = (sequence, len(batch))
+                    self._stage.set_queue_depth(len(pending))
+                    sequence += 1
+                    # Keep at most `concurrency` requests in flight so a slow
+                    # cluster pushes back on the embedding stage.
+                    if len(pending) >= self._concurrency:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        self._complete(done, pending)
+                if pending:
+                    done, _ = wait(pending)
+                    self._complete(done, pending)
+        finally:
+            self._stage.set_queue_depth(0)
+            self._report.elapsed = time.perf_counter() - start
+        return self._report
+
+    def _complete(
+        self,
+        done: Set[Future[int]],
+        pending: Dict[Future[int], Tuple[int, int]],
+    ) -> None:
+        for future in done:
+            sequence, size = pending.pop(future)
+            self._finished[sequence] = (size, future.result())
+        self._stage.set_queue_depth(len(pending))
+        while not self._confirmation_stopped and self._next_to_confirm in self._finished:
+            size, failed = self._finished.pop(self._next_to_confirm)
+            if failed:
+                # Later batches may be stored, but confirming them would skip
+                # this one's lost objects on resume; uuid5 upserts make
+                # re-sending them harmless.
+                self._confirmation_stopped = True
+                break
+            self._next_to_confirm += 1
+            if self._on_batch_confirmed is not None:
+                self._on_batch_confirmed(size)
+
+    def _send(self, batch: List[Tuple[SampleRecord, List[float]]]) -> int:
+        """Insert ``batch`` and return how many objects still failed after all retries."""
+        encode = self._compressor.encode if self._compressor is not None else None
+        objects = [
+            DataObject(
+                properties=encode(properties) if encode else properties,
+                uuid=sample_uuid(properties),
+                vector=vector,
+            )
+            for properties, vector in batch
+        ]
+        attempt = 0
+        while True:
+            if self._request_slots is not None:
+                self._request_slots.acquire()
+            started = time.perf_counter()
+            try:
+                with self._stage.request():
+                    result = self._collection.data.insert_many(objects)
+                errors = {index: error.message for index, error in result.errors.items()}
+            except WeaviateBaseError as e:
+                errors = {index: f"{type(e).__name__}: {e}" for index in range(len(objects))}
+            finally:
+                if self._request_slots is not None:
+                    self._request_slots.release()
+            self._sizer.observe(len(objects), time.perf_counter() - started)
+
+            with self._lock:
+                self._report.requests += 1
+                self._report.uploaded += len(objects) - len(errors)
+                if errors and attempt >= self._max_retries:
+                    self._report.failed += len(errors)
+                    self._report.errors.update(_error_key(message) for message in errors.values())
+                elif errors:
+                    self._report.retried += len(errors)
+            self._stage.add(len(objects) - len(errors), batches=1)
+            if errors:
+                self._stage.error(len(errors))
+
+            if not errors or attempt >= self._max_retries:
+                return len(errors)
+            objects = [objects[index] for index in sorted(errors)]
+            delay = RETRY_BACKOFF_SECONDS * (2**attempt)
+            time.sleep(delay + random.uniform(0, delay))
+            attempt += 1
+
+
+def _error_key(message: str) -> str:
+    # Collapse per-object details (ids, offsets) so identical failures group together.
+    first_line = message.strip().splitlines()[0] if message.strip() else "unknown error"
+    return first_line[:160]
+
+
 def upsert_samples(
     collection: Collection,
     samples_with_vectors: Iterable[Tuple[SampleRecord, List[float]]],
     batch_size: int,
-) -> int:
-    progress = ProgressPrinter("Uploading to Weaviate")
-    total = 0
-    if hasattr(collection, "batch"):
-        batch_interface = collection.batch
-        if hasattr(batch_interface, "fixed_size"):
-            try:
-                with batch_interface.fixed_size(batch_size=batch_size) as batch:
-                    for properties, vector in samples_with_vectors:
-                        batch.add_object(
-                            properties=properties,
-                            uuid=str(uuid4()),
-                            vector=vector,
-                        )
-                        total += 1
-                        progress.update()
-            finally:
-                progress.close()
-            return total
-
-    data_interface = collection.data
-    try:
-        for properties, vector in samples_with_vectors:
-            data_interface.insert(
-                properties=properties,
-                uuid=str(uuid4()),
-                vector=vector,
-            )
-            total += 1
-            progress.update()
-    finally:
-        progress.close()
-    return total
+    on_batch_confirmed: Optional[Callable[[int], None]] = None,
+    *,
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+    min_batch_size: int = DEFAULT_UPLOAD_MIN_BATCH_SIZE,
+    max_batch_size: int = DEFAULT_UPLOAD_MAX_BATCH_SIZE,
+    target_latency: float = DEFAULT_UPLOAD_TARGET_LATENCY,
+    max_retries: int = DEFAULT_UPLOAD_MAX_RETRIES,
+    request_slots: Optional[threading.Semaphore] = None,
+    stage: Optional[StageTelemetry] = None,
+    compressor: Optional[PayloadCompressor] = None,
+) -> UploadReport:
+    """Upload samples and report confirmed progress through ``on_batch_confirmed``.
+
+    ``batch_size`` is the initial request size; it then adapts to observed
+    latency between ``min_batch_size`` and ``max_batch_size``. The callback
+    receives the number of objects Weaviate accepted since the previous call,
+    always in the order they were yielded, and is not called again once a
+    batch has objects that failed every retry. ``request_slots`` caps requests in flight
+    across several concurrent uploads sharing one Weaviate connection, and
+    ``stage`` receives request latencies, in-flight requests and queue depth.
+    ``compressor`` compresses large properties before they are sent.
+    """
+    sizer = AdaptiveBatchSizer(
+        initial=batch_size,
+        minimum=min(min_batch_size, batch_size),
+        maximum=max(max_batch_size, batch_size),
+        target_latency=target_latency,
+    )
+    uploader = BatchUploader(
+        collection,
+        sizer,
+        concurrency=concurrency,
+        max_retries=max_retries,
+        on_batch_confirmed=on_batch_confirmed,
+        request_slots=request_slots,
+        stage=stage,
+        compressor=compressor,
+    )
+    return uploader.run(samples_with_vectors)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import tomllib
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt, ValidationError
+
+from .config import (
+    DEFAULT_DEDUP_THRESHOLD,
+    DEFAULT_MAX_CONCURRENT_DATASETS,
+    DEFAULT_MAX_INFLIGHT_UPLOADS,
+    DatasetConfig,
+    build_dataset_config,
+)
+
+
+class ManifestDataset(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    name: str
+    config: Optional[str] = None
+    split: str = "train"
+    input: str
+    outputs: List[str] = Field(min_length=1)
+    task: Optional[str] = None
+    max_samples: Optional[PositiveInt] = None
+    dedup_threshold: Optional[float] = Field(default=DEFAULT_DEDUP_THRESHOLD, gt=0.0, le=1.0)
+
+    def to_dataset_config(self) -> DatasetConfig:
+        return build_dataset_config(
+            dataset_name=self.name,
+            dataset_config=self.config,
+            dataset_split=self.split,
+            text_field=self.input,
+            task_field=self.task,
+            expected_output_fields=self.outputs,
+            max_samples=self.max_samples,
+            dedup_threshold=self.dedup_threshold,
+        )
+
+
+class SeedManifest(BaseModel):
+    """A list of datasets to ingest in one run, read from a TOML file.
+
+    Example::
+
+        max_concurrent_datasets = 4
+
+        [[datasets]]
+        name = "FreedomIntelligence/medical-o1-reasoning-SFT"
+        config = "en"
+        input = "Question"
+        outputs = ["Response"]
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    max_concurrent_datasets: PositiveInt = DEFAULT_MAX_CONCURRENT_DATASETS
+    max_inflight_uploads: PositiveInt = DEFAULT_MAX_INFLIGHT_UPLOADS
+    datasets: List[ManifestDataset] = Field(min_length=1)
+
+    def dataset_configs(self) -> List[DatasetConfig]:
+        return [dataset.to_dataset_config() for dataset in self.datasets]
+
+
+def load_manifest(path: Path) -> SeedManifest:
+    try:
+        with path.open("rb") as handle:
+            payload = tomllib.load(handle)
+        return SeedManifest.model_validate(payload)
+    except OSError as e:
+        raise RuntimeError(f"Could not read manifest '{path}': {e}") from e
+    except (tomllib.TOMLDecodeError, ValidationError) as e:
+        raise RuntimeError(f"Invalid manifest '{path}': {e}") from e
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import base64
+import threading
+from typing import Dict, Iterable
+
+import pyarrow as pa
+
+from .config import DEFAULT_PAYLOAD_COMPRESSION_LEVEL
+
+SampleRecord = Dict[str, str]
+
+# Marks a compressed value; JSON-encoded outputs always start with "[".
+ZSTD_PREFIX = "zstd:"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress_text(text: str, codec: pa.Codec) -> str:
+    """``text`` as ``zstd:<base64 zstd frame>``."""
+    frame = codec.compress(text.encode("utf-8"), asbytes=True)
+    return ZSTD_PREFIX + base64.b64encode(frame).decode("ascii")
+
+
+def decompress_text(value: str) -> str:
+    """Inverse of :func:`compress_text`; other values are returned unchanged."""
+    if not value.startswith(ZSTD_PREFIX):
+        return value
+    frame = base64.b64decode(value[len(ZSTD_PREFIX) :])
+    data = pa.decompress(
+        frame, decompressed_size=_frame_content_size(frame), codec="zstd", asbytes=True
+    )
+    return data.decode("utf-8")
+
+
+def _frame_content_size(frame: bytes) -> int:
+    # Arrow's decompressor needs the output size up front; one-shot zstd
+    # frames record it in the frame header (RFC 8878, section 3.1.1.1).
+    if frame[:4] != _ZSTD_MAGIC or len(frame) < 6:
+        raise ValueError("Not a zstd frame.")
+    descriptor = frame[4]
+    single_segment = descriptor >> 5 & 1
+    size_bytes = (1 if single_segment else 0, 2, 4, 8)[descriptor >> 6]
+    if not size_bytes:
+        raise ValueError("zstd frame does not record its content size.")
+    offset = 5 + (0 if single_segment else 1) + (0, 1, 2, 4)[descriptor & 3]
+    size = int.from_bytes(frame[offset : offset + size_bytes], "little")
+    return size + 256 if size_bytes == 2 else size
+
+
+class PayloadCompressor:
+    """Compresses large text properties of each sample right before upload.
+
+    A value is only replaced when its compressed, base64-encoded form is
+    shorter, so short outputs stay readable. Counts the bytes before and
+    after across every sample, from any number of upload threads.
+    """
+
+    def __init__(
+        self, properties: Iterable[str], level: int = DEFAULT_PAYLOAD_COMPRESSION_LEVEL
+    ) -> None:
+        self._properties = tuple(properties)
+        self._codec = pa.Codec("zstd", compression_level=level)
+        self._lock = threading.Lock()
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def encode(self, sample: SampleRecord) -> SampleRecord:
+        encoded = dict(sample)
+        raw = stored = 0
+        for name in self._properties:
+            value = sample.get(name)
+            if not value:
+                continue
+            compressed = compress_text(value, self._codec)
+            size = len(value.encode("utf-8"))
+            raw += size
+            if len(compressed) < size:
+                encoded[name] = compressed
+                stored += len(compressed)
+            else:
+                stored += size
+        with self._lock:
+            self.raw_bytes += raw
+            self.stored_bytes += stored
+        return encoded
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    def summary(self) -> str:
+        return (
+            f"Compressed {', '.join(self._properties)}: {self.raw_bytes / 2**20:.1f} MB -> "
+            f"{self.stored_bytes / 2**20:.1f} MB ({self.ratio:.2f}x)."
+        )
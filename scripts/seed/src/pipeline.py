@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import pyarrow as pa
+
+from .checkpoint import CheckpointTracker
+from .config import (
+    DEFAULT_EMBEDDED_QUEUE_SIZE,
+    DEFAULT_LOADED_QUEUE_SIZE,
+    DEFAULT_TRANSLATE_WORKERS,
+    DEFAULT_TRANSLATED_QUEUE_SIZE,
+    DatasetConfig,
+)
+from .dedup import NearDuplicateFilter
+from .embed import EmbeddingEngine
+from .ingest import UploadReport
+from .telemetry import StageTelemetry, Telemetry
+from .utils import limit_samples, open_record_tables, table_samples, translate_record_table
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+SampleRecord = Dict[str, str]
+EmbeddedSample = Tuple[SampleRecord, List[float]]
+
+# How often blocked queue operations wake up to check for cancellation.
+_POLL_SECONDS = 0.1
+# How long to wait for stage threads after the pipeline stops; a thread stuck
+# in a network call is a daemon and is abandoned after this.
+_JOIN_TIMEOUT_SECONDS = 5.0
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised inside a stage when the pipeline is stopped underneath it."""
+
+
+class Channel(Generic[T]):
+    """Bounded queue between two stages.
+
+    ``put`` blocks while the queue is full, which is what pushes back on the
+    producer; both sides give up as soon as the pipeline is stopped.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        stopped: Callable[[], bool],
+        consumer: Optional[StageTelemetry] = None,
+    ) -> None:
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=maxsize)
+        self._stopped = stopped
+        self._consumer = consumer
+        self._abandoned = threading.Event()
+
+    def put(self, item: T) -> bool:
+        """Queue ``item``; returns ``False`` once the consumer stopped reading."""
+        while not self._abandoned.is_set():
+            if self._stopped():
+                raise PipelineCancelled()
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+            except queue.Full:
+                continue
+            self._update_gauge()
+            return True
+        return False
+
+    def close(self) -> None:
+        self.put(_END)  # type: ignore[arg-type]
+
+    def abandon(self) -> None:
+        """Tell the producer that nothing more will be read."""
+        self._abandoned.set()
+
+    def __iter__(self) -> Iterator[T]:
+        while True:
+            if self._stopped():
+                raise PipelineCancelled()
+            try:
+                item = self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            self._update_gauge()
+            if item is _END:
+                return
+            yield item  # type: ignore[misc]
+
+    def _update_gauge(self) -> None:
+        if self._consumer is not None:
+            self._consumer.set_input_queue(self._queue.qsize())
+
+
+class StagedPipeline:
+    """Runs pipeline stages on their own threads and tracks their failures.
+
+    The first stage to fail stops the whole pipeline; :meth:`join` then
+    re-raises that error in the calling thread. Setting the optional
+    ``cancel`` event (e.g. on Ctrl-C) stops the pipeline as well.
+    """
+
+    def __init__(self, cancel: Optional[threading.Event] = None) -> None:
+        self._cancel = cancel
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+
+    def stopped(self) -> bool:
+        return self._stop.is_set() or (self._cancel is not None and self._cancel.is_set())
+
+    def channel(self, maxsize: int, consumer: Optional[StageTelemetry] = None) -> Channel:
+        return Channel(maxsize, self.stopped, consumer)
+
+    def start(self, name: str, target: Callable[[], None]) -> None:
+        thread = threading.Thread(target=self._run, args=(target,), name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def stop(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if error is not None and self._error is None and not self.stopped():
+                self._error = error
+        self._stop.set()
+
+    def join(self) -> None:
+        deadline = time.monotonic() + _JOIN_TIMEOUT_SECONDS
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if self._error is not None:
+            raise self._error
+
+    def _run(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except PipelineCancelled:
+            pass
+        except BaseException as e:
+            self.stop(e)
+
+
+def ordered_map(
+    fn: Callable[[T], R], items: Iterable[T], workers: int
+) -> Iterator[R]:
+    """Apply ``fn`` on ``workers`` threads, yielding results in input order."""
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    pending: Deque[Future[R]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed-translate") as executor:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_seed_pipeline(
+    config: DatasetConfig,
+    *,
+    start_offset: int,
+    tracker: CheckpointTracker,
+    engine: EmbeddingEngine,
+    upload: Callable[[Iterable[EmbeddedSample]], UploadReport],
+    telemetry: Telemetry,
+    stage_prefix: str = "",
+    cancel: Optional[threading.Event] = None,
+    translate_workers: int = DEFAULT_TRANSLATE_WORKERS,
+    loaded_queue_size: int = DEFAULT_LOADED_QUEUE_SIZE,
+    translated_queue_size: int = DEFAULT_TRANSLATED_QUEUE_SIZE,
+    embedded_queue_size: int = DEFAULT_EMBEDDED_QUEUE_SIZE,
+    dedup: Optional[NearDuplicateFilter] = None,
+) -> UploadReport:
+    """Load, translate, embed and upload one dataset with overlapping stages.
+
+    Load, translate and embed each run on their own thread (translation on
+    ``translate_workers`` threads, embedding on the engine's process pool)
+    and hand work downstream through bounded queues; ``upload`` runs in the
+    calling thread with its own request concurrency. A full queue blocks the
+    stage in front of it, so the slowest stage sets the pace while the others
+    keep their queues topped up. Samples stay in dataset order end to end, as
+    checkpoint confirmation requires.
+
+    With a ``dedup`` filter, a ``dedup`` stage between translate and embed
+    drops near-duplicate samples before they cost an embedding request;
+    ``max_samples`` then counts the samples that survive it.
+    """
+    load_stage = telemetry.stage(f"{stage_prefix}load")
+    translate_stage = telemetry.stage(f"{stage_prefix}translate")
+    dedup_stage = telemetry.stage(f"{stage_prefix}dedup") if dedup is not None else None
+    embed_stage = telemetry.stage(f"{stage_prefix}embed")
+    upload_stage = telemetry.stage(f"{stage_prefix}upload")
+
+    pipeline = StagedPipeline(cancel)
+    loaded: Channel[pa.Table] = pipeline.channel(loaded_queue_size, translate_stage)
+    translated: Channel[List[Tuple[int, SampleRecord]]] = pipeline.channel(
+        translated_queue_size, dedup_stage or embed_stage
+    )
+    deduplicated: Channel[List[Tuple[int, SampleRecord]]] = pipeline.channel(
+        translated_queue_size, embed_stage
+    )
+    to_embed = translated if dedup is None else deduplicated
+    embedded: Channel[EmbeddedSample] = pipeline.channel(embedded_queue_size, upload_stage)
+
+    # Open the dataset before any thread starts so configuration errors
+    # surface immediately. Dataset errors are reported as RuntimeError, like
+    # every other loading failure in the seed script.
+    source = f"{config.dataset_name}:{config.dataset_split}"
+    try:
+        tables, already_translated = open_record_tables(config, start_offset)
+    except Exception as e:
+        raise RuntimeError(f"Could not open {source}: {e}") from e
+
+    def load() -> None:
+        iterator = iter(tables)
+        while True:
+            started = time.perf_counter()
+            try:
+                table = next(iterator, None)
+            except Exception as e:
+                raise RuntimeError(f"Reading {source} failed: {e}") from e
+            if table is None:
+                break
+            load_stage.observe(time.perf_counter() - started)
+            load_stage.add(table.num_rows, batches=1)
+            if not loaded.put(table):
+                return
+        loaded.close()
+
+    def translate_table(table: pa.Table) -> List[Tuple[int, SampleRecord]]:
+        if already_translated:
+            return table_samples(table)
+        with translate_stage.request():
+            return table_samples(translate_record_table(config, table))
+
+    def translate() -> None:
+        batches = ordered_map(translate_table, loaded, translate_workers)
+        # max_samples counts samples that survive deduplication, so the limit
+        # moves to the dedup stage when there is one.
+        limited = batches if dedup is not None else limit_samples(config, batches, start_offset)
+        try:
+            for samples in limited:
+                translate_stage.add(len(samples), batches=1)
+                if not translated.put(samples):
+                    return
+        finally:
+            batches.close()
+        # Stop the loader early once max_samples has been reached.
+        loaded.abandon()
+        translated.close()
+
+    def deduplicate_batches() -> Iterator[List[Tuple[int, SampleRecord]]]:
+        assert dedup is not None and dedup_stage is not None
+        for samples in translated:
+            with dedup_stage.request():
+                kept = dedup.filter_batch(samples, config.text_property)
+            dedup_stage.drop(len(samples) - len(kept))
+            yield kept
+
+    def deduplicate() -> None:
+        assert dedup_stage is not None
+        for samples in limit_samples(config, deduplicate_batches(), start_offset):
+            dedup_stage.add(len(samples), batches=1)
+            if not deduplicated.put(samples):
+                return
+        translated.abandon()
+        deduplicated.close()
+
+    def embed() -> None:
+        samples = tracker.track(sample for batch in to_embed for sample in batch)
+        vectors = engine.embed(samples, config.text_property, stage=embed_stage)
+        try:
+            for item in vectors:
+                if not embedded.put(item):
+                    return
+        finally:
+            vectors.close()
+        embedded.close()
+
+    pipeline.start("seed-load", load)
+    pipeline.start("seed-translate", translate)
+    if dedup is not None:
+        pipeline.start("seed-dedup", deduplicate)
+    pipeline.start("seed-embed", embed)
+    try:
+        report = upload(embedded)
+    except PipelineCancelled:
+        # An upstream stage failed or the run was cancelled; join() re-raises
+        # the upstream error, otherwise report the cancellation.
+        pipeline.stop()
+        pipeline.join()
+        raise
+    except BaseException as e:
+        pipeline.stop(e)
+        pipeline.join()
+        raise
+    pipeline.stop()
+    pipeline.join()
+    return report
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Sequence
+
+from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
+
+
+def shard_path(path: Path, shard_index: int, shard_count: int) -> Path:
+    """``path`` with the shard in its name, e.g. ``.seed-checkpoint.shard-2-of-8.json``."""
+    if shard_count == 1:
+        return path
+    return path.with_name(f"{path.stem}.shard-{shard_index}-of-{shard_count}{path.suffix}")
+
+
+class ShardDatasetResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    dataset_name: str
+    dataset_config: Optional[str]
+    dataset_split: str
+    status: Literal["completed", "failed"]
+    # Objects uploaded and failed in this run, and the seconds it took.
+    uploaded: NonNegativeInt = 0
+    failed: NonNegativeInt = 0
+    seconds: float = 0.0
+    # Samples confirmed over every run of this shard, from its checkpoint.
+    samples_ingested: NonNegativeInt = 0
+    error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.dataset_name}:{self.dataset_split}"
+
+
+class ShardReport(BaseModel):
+    """What one shard ingested, written at the end of a sharded run."""
+
+    model_config = ConfigDict(frozen=True)
+
+    shard_index: NonNegativeInt
+    shard_count: PositiveInt
+    collection: str
+    started_at: datetime
+    finished_at: datetime
+    datasets: List[ShardDatasetResult]
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished_at - self.started_at).total_seconds()
+
+    @property
+    def uploaded(self) -> int:
+        return sum(result.uploaded for result in self.datasets)
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(self.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ShardReport":
+        try:
+            return cls.model_validate(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Could not read shard report '{path}': {e}") from e
+
+
+class ShardMerge:
+    """Cross-checks the reports of every shard of a sharded run.
+
+    The run is complete when each shard index from 0 to ``shard_count - 1``
+    reported exactly once, for the same collection and datasets, and every
+    dataset completed without failed uploads. Shards partition records by
+    dataset offset, so complete shards together cover each dataset exactly
+    once. ``object_counts`` (objects stored per ``name:split``) are compared
+    with the samples the shards confirmed.
+    """
+
+    def __init__(
+        self,
+        reports: Sequence[ShardReport],
+        object_counts: Optional[Dict[str, int]] = None,
+    ) -> None:
+        if not reports:
+            raise ValueError("No shard reports to merge.")
+        self.reports = sorted(reports, key=lambda report: report.shard_index)
+        self.object_counts = object_counts
+        self.problems: List[str] = []
+        self.notes: List[str] = []
+        self.totals: Dict[str, int] = {}
+        self._check()
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def _check(self) -> None:
+        shard_count = self.reports[0].shard_count
+        if any(report.shard_count != shard_count for report in self.reports):
+            counts = sorted({report.shard_count for report in self.reports})
+            self.problems.append(f"Reports come from runs with different shard counts: {counts}.")
+        indices = [report.shard_index for report in self.reports]
+        missing = sorted(set(range(shard_count)) - set(indices))
+        duplicated = sorted({index for index in indices if indices.count(index) > 1})
+        if missing:
+            self.problems.append(f"Missing shard reports: {missing}.")
+        if duplicated:
+            self.problems.append(f"Several reports for shards {duplicated}.")
+        if len({report.collection for report in self.reports}) > 1:
+            self.problems.append("Shards wrote to different collections.")
+
+        expected = self._dataset_keys(self.reports[0])
+        for report in self.reports:
+            if self._dataset_keys(report) != expected:
+                self.problems.append(f"Shard {report.shard_index} ingested a different dataset list.")
+            for result in report.datasets:
+                if result.status != "completed":
+                    self.problems.append(
+                        f"Shard {report.shard_index} did not complete {result.label}: {result.error}"
+                    )
+                elif result.failed:
+                    self.problems.append(
+                        f"Shard {report.shard_index} failed to upload {result.failed} samples "
+                        f"of {result.label}."
+                    )
+                self.totals[result.label] = self.totals.get(result.label, 0) + result.samples_ingested
+
+        for label, stored in sorted((self.object_counts or {}).items()):
+            ingested = self.totals.get(label, 0)
+            if stored > ingested:
+                self.problems.append(
+                    f"Weaviate holds {stored} objects for {label} but the shards confirmed "
+                    f"{ingested}; another writer or an earlier run added objects."
+                )
+            elif stored < ingested:
+                # Identical samples map to the same object UUID, on one shard or several.
+                self.notes.append(
+                    f"{label}: {ingested - stored} confirmed samples were exact duplicates "
+                    "and share an object."
+                )
+
+    @staticmethod
+    def _dataset_keys(report: ShardReport) -> List[tuple]:
+        return sorted(
+            (result.dataset_name, result.dataset_config or "", result.dataset_split)
+            for result in report.datasets
+        )
+
+    def summary(self) -> str:
+        lines = [f"{'shard':>5} {'uploaded':>10} {'failed':>7} {'seconds':>9} {'objects/s':>10}  status"]
+        for report in self.reports:
+            status = ", ".join(sorted({result.status for result in report.datasets})) or "empty"
+            failed = sum(result.failed for result in report.datasets)
+            rate = report.uploaded / report.seconds if report.seconds > 0 else 0.0
+            lines.append(
+                f"{report.shard_index:>5} {report.uploaded:>10} {failed:>7} "
+                f"{report.seconds:>9.1f} {rate:>10.1f}  {status}"
+            )
+        uploaded = sum(report.uploaded for report in self.reports)
+        wall = (
+            max(report.finished_at for report in self.reports)
+            - min(report.started_at for report in self.reports)
+        ).total_seconds()
+        rate = uploaded / wall if wall > 0 else 0.0
+        lines.append(f"Total: {uploaded} uploaded in {wall:.1f}s wall time ({rate:.1f} objects/s).")
+        for label, ingested in sorted(self.totals.items()):
+            stored = (self.object_counts or {}).get(label)
+            suffix = f", {stored} stored in Weaviate" if stored is not None else ""
+            lines.append(f"  {label}: {ingested} samples confirmed{suffix}")
+        lines.extend(f"  note: {note}" for note in self.notes)
+        lines.extend(f"  PROBLEM: {problem}" for problem in self.problems)
+        return "\n".join(lines)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+import pyarrow as pa
+
+from .config import (
+    DEFAULT_SNAPSHOT_BATCH_ROWS,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    DEFAULT_UPLOAD_MAX_BATCH_SIZE,
+)
+from .ingest import UploadReport, tenant_collection, upsert_samples
+from .payload import PayloadCompressor, decompress_text
+from .telemetry import StageTelemetry
+from .utils import sanitize_property_name
+
+if TYPE_CHECKING:
+    from weaviate.collections.collection import Collection
+
+SampleRecord = Dict[str, str]
+
+VECTOR_COLUMN = "vector"
+_FORMAT_VERSION = b"1"
+# Properties the seed script may have stored compressed.
+_COMPRESSED_PROPERTIES = (sanitize_property_name("output_reference"),)
+
+
+@dataclass
+class SnapshotStats:
+    rows: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    def summary(self, verb: str) -> str:
+        megabytes = self.bytes / 2**20
+        rate = megabytes / self.elapsed if self.elapsed > 0 else 0.0
+        return f"{verb} {self.rows} objects ({megabytes:.1f} MB) in {self.elapsed:.1f}s ({rate:.1f} MB/s)."
+
+
+def export_snapshot(
+    collection: Collection,
+    path: Path,
+    *,
+    batch_rows: int = DEFAULT_SNAPSHOT_BATCH_ROWS,
+) -> SnapshotStats:
+    """Write every object of ``collection`` (every tenant, if multi-tenant) to ``path``.
+
+    Properties are written as they were seeded: compressed values are
+    decompressed, so UUIDs derived on import match the original objects and
+    the importing run applies its own compression setting.
+    """
+    config = collection.config.get()
+    sources = (
+        [collection.with_tenant(name) for name in sorted(collection.tenants.get())]
+        if config.multi_tenancy_config.enabled
+        else [collection]
+    )
+    started = time.perf_counter()
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    writer = _SnapshotWriter(tmp_path, config, batch_rows)
+    try:
+        for source in sources:
+            for obj in source.iterator(include_vector=True, return_properties=writer.properties):
+                vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+                if vector is not None:
+                    writer.add(obj.properties, vector)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    tmp_path.replace(path)
+    stats = SnapshotStats(rows=writer.rows, bytes=path.stat().st_size)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+class _SnapshotWriter:
+    """Buffers objects and writes them as Arrow record batches of ``batch_rows``.
+
+    The file schema is created with the first vector, whose length fixes the
+    vector column's list size.
+    """
+
+    def __init__(self, path: Path, config: Any, batch_rows: int) -> None:
+        self._path = path
+        self._config = config
+        self._batch_rows = batch_rows
+        self.properties = [prop.name for prop in config.properties]
+        self._schema: Optional[pa.Schema] = None
+        self._writer: Optional[pa.RecordBatchFileWriter] = None
+        self._samples: List[SampleRecord] = []
+        self._vectors: List[Any] = []
+        self.rows = 0
+
+    def add(self, values: Dict[str, Any], vector: Any) -> None:
+        sample = {
+            name: "" if values.get(name) is None else str(values[name])
+            for name in self.properties
+        }
+        for name in _COMPRESSED_PROPERTIES:
+            if name in sample:
+                sample[name] = decompress_text(sample[name])
+        self._samples.append(sample)
+        self._vectors.append(vector)
+        if len(self._samples) >= self._batch_rows:
+            self._flush()
+
+    def close(self) -> None:
+        if self._samples or self._writer is None:
+            self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._path.unlink(missing_ok=True)
+
+    def _flush(self) -> None:
+        if self._writer is None:
+            dimensions = len(self._vectors[0]) if self._vectors else 0
+            self._schema = pa.schema(
+                [(name, pa.string()) for name in self.properties]
+                + [(VECTOR_COLUMN, pa.list_(pa.float32(), dimensions))],
+                metadata={
+                    b"seed.format": _FORMAT_VERSION,
+                    b"seed.collection": self._config.name.encode("utf-8"),
+                    b"seed.description": (self._config.description or "").encode("utf-8"),
+                    b"seed.dimensions": str(dimensions).encode("ascii"),
+                },
+            )
+            self._writer = pa.ipc.new_file(str(self._path), self._schema)
+        vector_type = self._schema.field(VECTOR_COLUMN).type
+        values = np.asarray(self._vectors, dtype=np.float32).reshape(-1)
+        columns = [
+            pa.array([sample[name] for sample in self._samples], type=pa.string())
+            for name in self.properties
+        ]
+        columns.append(pa.FixedSizeListArray.from_arrays(pa.array(values), vector_type.list_size))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=self._schema))
+        self.rows += len(self._samples)
+        self._samples, self._vectors = [], []
+
+
+class Snapshot:
+    """Memory-mapped reader for a snapshot written by :func:`export_snapshot`.
+
+    A snapshot is an uncompressed Arrow IPC file with one string column per
+    property and a ``fixed_size_list<float32>`` vector column, so each record
+    batch's vectors are one contiguous buffer, handed out as NumPy views.
+    Schema metadata keeps the source collection's description, including
+    its embedding marker.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            self._source = pa.memory_map(str(path))
+            self._reader = pa.ipc.open_file(self._source)
+        except (OSError, pa.ArrowInvalid) as e:
+            raise RuntimeError(f"Could not open snapshot '{path}': {e}") from e
+        metadata = self._reader.schema.metadata or {}
+        if metadata.get(b"seed.format") != _FORMAT_VERSION:
+            raise RuntimeError(f"'{path}' is not a seed vector snapshot.")
+        self.collection = metadata[b"seed.collection"].decode("utf-8")
+        self.description = metadata[b"seed.description"].decode("utf-8")
+        self.dimensions = int(metadata[b"seed.dimensions"])
+        self.properties = [name for name in self._reader.schema.names if name != VECTOR_COLUMN]
+
+    @property
+    def num_rows(self) -> int:
+        return sum(
+            self._reader.get_batch(index).num_rows
+            for index in range(self._reader.num_record_batches)
+        )
+
+    def vectors(self) -> Iterator[np.ndarray]:
+        """``(rows, dimensions)`` float32 views of each record batch, without copies."""
+        for index in range(self._reader.num_record_batches):
+            batch = self._reader.get_batch(index)
+            values = batch.column(VECTOR_COLUMN).flatten()
+            yield values.to_numpy(zero_copy_only=True).reshape(batch.num_rows, self.dimensions)
+
+    def samples(self) -> Iterator[Tuple[SampleRecord, np.ndarray]]:
+        """``(properties, vector)`` pairs in file order; vectors are views into the map."""
+        for index, vectors in enumerate(self.vectors()):
+            batch = self._reader.get_batch(index)
+            columns = [batch.column(name).to_pylist() for name in self.properties]
+            for row, vector in enumerate(vectors):
+                yield {name: values[row] for name, values in zip(self.properties, columns)}, vector
+
+    def close(self) -> None:
+        self._source.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def import_snapshot(
+    collection: Collection,
+    snapshot: Snapshot,
+    *,
+    multi_tenancy: bool = False,
+    # Nothing waits on embeddings, so requests start at the largest size and
+    # only shrink if Weaviate answers slower than the target latency.
+    batch_size: int = DEFAULT_UPLOAD_MAX_BATCH_SIZE,
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+    stage: Optional[StageTelemetry] = None,
+    compressor: Optional[PayloadCompressor] = None,
+) -> UploadReport:
+    """Upload a snapshot's objects with their stored vectors; nothing is re-embedded.
+
+    With ``multi_tenancy`` each run of consecutive samples from one dataset
+    goes to that dataset's tenant (snapshots list tenants one after another).
+    """
+    if not multi_tenancy:
+        return upsert_samples(
+            collection,
+            snapshot.samples(),
+            batch_size,
+            concurrency=concurrency,
+            stage=stage,
+            compressor=compressor,
+        )
+    total = UploadReport()
+    started = time.perf_counter()
+    for dataset_name, samples in groupby(
+        snapshot.samples(), key=lambda item: item[0].get("datasetName", "")
+    ):
+        report = upsert_samples(
+            tenant_collection(collection, dataset_name),
+            samples,
+            batch_size,
+            concurrency=concurrency,
+            stage=stage,
+            compressor=compressor,
+        )
+        total.uploaded += report.uploaded
+        total.failed += report.failed
+        total.retried += report.retried
+        total.requests += report.requests
+        total.errors.update(report.errors)
+    total.elapsed = time.perf_counter() - started
+    return total
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds."""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return self._bounds[index] if index < len(self._bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self._bounds, self._counts)}
+        buckets["le_inf"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean_seconds": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "max_seconds": round(self.max, 6),
+            "buckets": buckets,
+        }
+
+
+class StageTelemetry:
+    """Counters and gauges for one pipeline stage (load, embed, upload, ...).
+
+    ``items`` counts records that left the stage, ``latency`` holds one
+    observation per request (or per record for the load stage),
+    ``in_flight`` is the number of requests currently outstanding and
+    ``queue_depth`` the amount of work handed to the stage and not yet
+    finished. In the staged pipeline ``input_queue`` is the number of
+    entries waiting in the bounded queue in front of the stage, and
+    ``dropped`` counts records a filtering stage discarded. All methods are
+    thread-safe.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._items = 0
+        self._batches = 0
+        self._errors = 0
+        self._dropped = 0
+        self._latency = LatencyHistogram()
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._input_queue = 0
+        self._max_input_queue = 0
+        self._started: Optional[float] = None
+        self._last_item: Optional[float] = None
+
+    def add(self, items: int = 1, *, batches: int = 0) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+            self._items += items
+            self._batches += batches
+            self._last_item = now
+
+    def error(self, count: int = 1) -> None:
+        with self._lock:
+            self._errors += count
+
+    def drop(self, count: int = 1) -> None:
+        with self._lock:
+            self._dropped += count
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter() - seconds
+            self._latency.observe(seconds)
+
+    def set_in_flight(self, count: int) -> None:
+        with self._lock:
+            self._in_flight = count
+            self._max_in_flight = max(self._max_in_flight, count)
+
+    def set_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self._queue_depth = depth
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+
+    def set_input_queue(self, depth: int) -> None:
+        with self._lock:
+            self._input_queue = depth
+            self._max_input_queue = max(self._max_input_queue, depth)
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Time one request and count it as in flight while it runs."""
+        with self._lock:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+            self.observe(elapsed)
+
+    def track(self, iterable: Iterable[T]) -> Iterator[T]:
+        """Count items pulled from ``iterable`` and time how long each took to produce."""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(time.perf_counter() - started)
+            self.add()
+            yield item
+
+    @property
+    def items(self) -> int:
+        return self._items
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            active = (
+                self._last_item - self._started
+                if self._started is not None and self._last_item is not None
+                else 0.0
+            )
+            return {
+                "items": self._items,
+                "batches": self._batches,
+                "errors": self._errors,
+                "dropped": self._dropped,
+                "items_per_second": round(self._items / active, 3) if active > 0 else 0.0,
+                "active_seconds": round(active, 3),
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "input_queue": self._input_queue,
+                "max_input_queue": self._max_input_queue,
+                "latency": self._latency.snapshot(),
+            }
+
+
+class Telemetry:
+    """Registry of stage telemetry for one seed run.
+
+    While active, a background thread prints one status line per stage and
+    rewrites a JSON summary at ``path`` every ``interval`` seconds. Leaving
+    the context writes the final run report to the same file and prints it.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        interval: float,
+        run_info: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        self._path = path
+        self._interval = interval
+        self._run_info = dict(run_info or {})
+        self._stages: Dict[str, StageTelemetry] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._last_items: Dict[str, int] = {}
+
+    @property
+    def run_info(self) -> Dict[str, Any]:
+        """Run settings recorded in every summary; callers may add entries."""
+        return self._run_info
+
+    def stage(self, name: str) -> StageTelemetry:
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = StageTelemetry(name)
+            return stage
+
+    def __enter__(self) -> "Telemetry":
+        self._thread = threading.Thread(
+            target=self._report_periodically, name="seed-telemetry", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if exc_type is None:
+            status = "completed"
+        elif exc_type is KeyboardInterrupt:
+            status = "interrupted"
+        else:
+            status = "failed"
+        report = self.snapshot(status=status)
+        self._write(report)
+        print(format_report(report))
+        if self._path is not None:
+            print(f"Run report written to '{self._path}'.")
+
+    def snapshot(self, status: str = "running") -> Dict[str, Any]:
+        with self._lock:
+            stages = list(self._stages.values())
+        return {
+            "status": status,
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "elapsed_seconds": round(time.perf_counter() - self._start, 3),
+            "run": dict(self._run_info),
+            "stages": {stage.name: stage.snapshot() for stage in stages},
+        }
+
+    def _report_periodically(self) -> None:
+        while not self._stop.wait(self._interval):
+            snapshot = self.snapshot()
+            self._write(snapshot)
+            for line in self._status_lines(snapshot):
+                print(line)
+
+    def _status_lines(self, snapshot: Dict[str, Any]) -> List[str]:
+        lines = []
+        for name, stage in snapshot["stages"].items():
+            recent = (stage["items"] - self._last_items.get(name, 0)) / self._interval
+            self._last_items[name] = stage["items"]
+            lines.append(
+                f"{name}: {stage['items']} items ({recent:.1f}/s recent), "
+                f"p95 {stage['latency']['p95_seconds']:g}s, "
+                f"in flight {stage['in_flight']}, queued {stage['queue_depth']}, "
+                f"waiting {stage['input_queue']}"
+            )
+        return lines
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        if self._path is None:
+            return
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        tmp_path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a run report as a table, one row per stage."""
+    elapsed = report["elapsed_seconds"]
+    lines = [
+        f"Seed run {report['status']} in {elapsed:.1f}s.",
+        f"{'stage':<32} {'items':>9} {'items/s':>9} {'reqs':>7} {'p50':>7} {'p95':>7} "
+        f"{'p99':>7} {'busy':>6} {'errors':>7} {'dropped':>8} {'max q':>6} {'max in':>6}",
+    ]
+    for name, stage in report["stages"].items():
+        latency = stage["latency"]
+        # Request time over wall time; above 100% means requests overlapped.
+        busy = latency["total_seconds"] / elapsed if elapsed > 0 else 0.0
+        lines.append(
+            f"{name:<32} {stage['items']:>9} {stage['items_per_second']:>9.1f} "
+            f"{latency['count']:>7} {latency['p50_seconds']:>6g}s {latency['p95_seconds']:>6g}s "
+            f"{latency['p99_seconds']:>6g}s {busy:>6.0%} {stage['errors']:>7} "
+            f"{stage['dropped']:>8} "
+            f"{stage['max_queue_depth']:>6} {stage['max_input_queue']:>6}"
+        )
+    return "\n".join(lines)
@@ -1,29 +1,15 @@
 from __future__ import annotations
 
-import time
-from typing import Dict, Iterator, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Tuple, TYPE_CHECKING, Union
 
-from datasets import Dataset, load_dataset
+import pyarrow as pa
+from datasets import Dataset, IterableDataset, load_dataset
 
 if TYPE_CHECKING:
     from .config import DatasetConfig
 
-
-class ProgressPrinter:
-    def __init__(self, label: str) -> None:
-        self._label = label
-        self._count = 0
-        self._start = time.perf_counter()
-
-    def update(self, amount: int = 1) -> None:
-        self._count += amount
-        elapsed = time.perf_counter() - self._start
-        rate = self._count / elapsed if elapsed > 0 else 0.0
-        if self._count % 10 == 0:
-            print(f"{self._label}: iter {self._count}, rate {rate:.2f}/s")
-
-    def close(self) -> None:
-        return None
+# Column carrying the source record offset through the sharded translation map.
+_OFFSET_COLUMN = "__seed_offset"
 
 
 def sanitize_property_name(raw_name: str) -> str:
@@ -36,28 +22,143 @@ def sanitize_property_name(raw_name: str) -> str:
 
 
 def load_samples(config: "DatasetConfig") -> Iterator[Dict[str, str]]:
-    dataset: Dataset = load_dataset(
-        config.dataset_name,
-        config.dataset_config,
-        split=config.dataset_split,  # type: ignore[arg-type]
-    )
+    for _, sample in load_indexed_samples(config):
+        yield sample
 
-    emitted = False
-    produced = 0
-    for record in dataset:
-        sample = config.translate_record(record)
-        if sample is None:
-            continue
 
-        emitted = True
-        produced += 1
-        yield sample
+def load_indexed_samples(
+    config: "DatasetConfig",
+    start_offset: int = 0,
+) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield ``(dataset_offset, sample)`` pairs, skipping the first ``start_offset`` records.
+
+    In streaming mode records are pulled lazily from the Hub, so the first
+    sample is available as soon as the first shard starts downloading. When
+    streaming is disabled and ``translate_num_proc`` is set, the split is
+    translated up front with a batched Arrow map across processes.
+    """
+    tables, translated = open_record_tables(config, start_offset)
+    if not translated:
+        tables = (translate_record_table(config, table) for table in tables)
+    for samples in limit_samples(config, map(table_samples, tables), start_offset):
+        yield from samples
+
+
+def open_record_tables(
+    config: "DatasetConfig",
+    start_offset: int = 0,
+) -> Tuple[Iterator[pa.Table], bool]:
+    """Open the dataset and return its record batches with offsets attached.
+
+    The boolean is ``True`` when the batches were already translated while
+    loading (the sharded ``Dataset.map`` path); otherwise each batch still
+    has to go through :func:`translate_record_table`.
+    """
+    dataset = _open_dataset(config, start_offset)
+    if isinstance(dataset, Dataset) and config.translate_num_proc:
+        return _translate_sharded(config, dataset, start_offset), True
+    return _record_tables(config, dataset, start_offset), False
+
+
+def translate_record_table(config: "DatasetConfig", table: pa.Table) -> pa.Table:
+    return config.translate_batch(table, keep_columns=(_OFFSET_COLUMN,))
+
+
+def table_samples(table: pa.Table) -> List[Tuple[int, Dict[str, str]]]:
+    """Split a translated batch into ``(dataset_offset, sample)`` pairs."""
+    columns = table.to_pydict()
+    offsets = columns.pop(_OFFSET_COLUMN)
+    return [
+        (offset, {name: values[position] for name, values in columns.items()})
+        for position, offset in enumerate(offsets)
+    ]
 
+
+def limit_samples(
+    config: "DatasetConfig",
+    batches: Iterable[List[Tuple[int, Dict[str, str]]]],
+    start_offset: int = 0,
+) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Stop after ``max_samples`` samples and reject datasets with no usable samples."""
+    emitted = False
+    produced = 0
+    for samples in batches:
+        if config.max_samples is not None:
+            samples = samples[: config.max_samples - produced]
+        if samples:
+            emitted = True
+            produced += len(samples)
+            yield samples
         if config.max_samples is not None and produced >= config.max_samples:
-            break
+            return
 
-    if not emitted:
+    # A resumed run may legitimately find nothing left to ingest.
+    if not emitted and not start_offset:
         raise RuntimeError(
             f"No usable samples found in {config.dataset_name}:{config.dataset_split}. "
             "Verify that the configured dataset references are correct."
         )
+
+
+def _open_dataset(
+    config: "DatasetConfig", start_offset: int
+) -> Union[Dataset, IterableDataset]:
+    dataset: Union[Dataset, IterableDataset] = load_dataset(
+        config.dataset_name,
+        config.dataset_config,
+        split=config.dataset_split,  # type: ignore[arg-type]
+        streaming=config.streaming,
+    )
+    if start_offset:
+        dataset = dataset.skip(start_offset)
+    return dataset
+
+
+def _record_tables(
+    config: "DatasetConfig",
+    dataset: Union[Dataset, IterableDataset],
+    start_offset: int,
+) -> Iterator[pa.Table]:
+    next_offset = start_offset
+    for batch in dataset.with_format("arrow").iter(batch_size=config.translate_batch_size):
+        offsets = pa.array(range(next_offset, next_offset + batch.num_rows), type=pa.int64())
+        next_offset += batch.num_rows
+        yield _shard_rows(config, batch.append_column(_OFFSET_COLUMN, offsets))
+
+
+def _translate_sharded(
+    config: "DatasetConfig",
+    dataset: Dataset,
+    start_offset: int,
+) -> Iterator[pa.Table]:
+    translated = dataset.with_format("arrow").map(
+        _translate_mapped_batch,
+        fn_kwargs={"config": config, "start_offset": start_offset},
+        batched=True,
+        batch_size=config.translate_batch_size,
+        with_indices=True,
+        num_proc=config.translate_num_proc,
+        remove_columns=dataset.column_names,
+        desc="Translating records",
+    )
+    yield from translated.iter(batch_size=config.translate_batch_size)
+
+
+def _translate_mapped_batch(
+    batch: pa.Table,
+    indices: List[int],
+    *,
+    config: "DatasetConfig",
+    start_offset: int,
+) -> pa.Table:
+    offsets = pa.array([start_offset + index for index in indices], type=pa.int64())
+    batch = _shard_rows(config, batch.append_column(_OFFSET_COLUMN, offsets))
+    return translate_record_table(config, batch)
+
+
+def _shard_rows(config: "DatasetConfig", table: pa.Table) -> pa.Table:
+    """Keep the records of ``table`` that belong to the configured shard."""
+    if config.shard_count == 1:
+        return table
+    offsets = table.column(_OFFSET_COLUMN).to_numpy()
+    return table.filter(pa.array(offsets % config.shard_count == config.shard_index))
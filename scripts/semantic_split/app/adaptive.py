@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Literal, Optional
+
+import numpy as np
+
+CutoffReason = Literal["threshold", "knee", "min_rows", "max_rows", "exhausted"]
+
+# A knee is a hit after which distances rise this many times faster than they
+# did on average up to it. Sorted distances of equally relevant hits rise
+# evenly, and a smooth curve bends too gradually to pass.
+_KNEE_MIN_SLOPE_RATIO = 4.0
+# The rise after a candidate is measured over 1/_KNEE_WINDOW_FRACTION of the hits before
+# it (at least _KNEE_MIN_WINDOW of them), so single noisy gaps do not count.
+_KNEE_WINDOW_FRACTION = 16
+_KNEE_MIN_WINDOW = 4
+
+
+@dataclass
+class Cutoff:
+    rows: int
+    # Distance of the last row kept.
+    distance: Optional[float]
+    reason: CutoffReason
+    # Hits whose distance was looked at to decide.
+    scanned: int
+
+
+def find_knee(distances: List[float], start: int = 1) -> Optional[int]:
+    """Index of the last hit before relevance drops off, or ``None``.
+
+    ``distances`` ascend. For every hit from ``start`` on, the rise of the
+    distance over the next few hits is compared with the average rise up to
+    the hit; where the ratio peaks above ``_KNEE_MIN_SLOPE_RATIO``, the knee
+    is the hit before the largest single gap in that window.
+    """
+    values = np.asarray(distances, dtype=np.float64)
+    candidates = np.arange(max(start, 1), len(values))
+    windows = np.maximum(_KNEE_MIN_WINDOW, candidates // _KNEE_WINDOW_FRACTION)
+    complete = candidates + windows < len(values)
+    candidates, windows = candidates[complete], windows[complete]
+    if not len(candidates):
+        return None
+    before = (values[candidates] - values[0]) / candidates
+    after = (values[candidates + windows] - values[candidates]) / windows
+    ratios = np.divide(after, before, out=np.zeros_like(after), where=before > 0)
+    best = int(np.argmax(ratios))
+    if ratios[best] < _KNEE_MIN_SLOPE_RATIO:
+        return None
+    first, window = int(candidates[best]), int(windows[best])
+    return first + int(np.argmax(np.diff(values[first : first + window + 1])))
+
+
+def choose_cutoff(
+    distances: Iterable[float],
+    *,
+    min_rows: int,
+    max_rows: int,
+    max_distance: Optional[float],
+    knee: bool,
+) -> Cutoff:
+    """Decide how many of the nearest hits to keep from their ascending distances.
+
+    Reading stops at the first hit beyond ``max_distance`` or at
+    ``max_rows``. With ``knee`` the curve is also checked for a knee each time
+    the number of hits read doubles, and reading stops at the first one, so a
+    clear drop-off is not followed far. The result always lies within
+    ``[min_rows, max_rows]`` unless fewer hits exist.
+    """
+    seen: List[float] = []
+    reason: CutoffReason = "exhausted"
+    # Knees before min_rows would be overruled, so none are looked for there.
+    knee_start = max(min_rows - 1, 1)
+    next_check = max(min_rows, 8) * 2
+    knee_at: Optional[int] = None
+    for distance in distances:
+        if max_distance is not None and distance > max_distance and len(seen) >= min_rows:
+            reason = "threshold"
+            break
+        seen.append(float(distance))
+        if len(seen) >= max_rows:
+            reason = "max_rows"
+            break
+        if knee and len(seen) >= next_check:
+            next_check *= 2
+            knee_at = find_knee(seen, knee_start)
+            if knee_at is not None:
+                break
+
+    rows = len(seen)
+    if knee and knee_at is None:
+        knee_at = find_knee(seen, knee_start)
+    if knee_at is not None and knee_at + 1 < rows:
+        rows, reason = knee_at + 1, "knee"
+    if rows < min(min_rows, len(seen)):
+        rows, reason = min(min_rows, len(seen)), "min_rows"
+    return Cutoff(
+        rows=rows,
+        distance=seen[rows - 1] if rows else None,
+        reason=reason,
+        scanned=len(seen),
+    )
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from weaviate.client import Client as WeaviateClient
+from weaviate.exceptions import (
+    WeaviateClosedClientError,
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+    WeaviateTimeoutError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Failures a fresh connection can fix; anything else is the request's own fault.
+_CONNECTION_ERRORS = (
+    WeaviateClosedClientError,
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+    WeaviateTimeoutError,
+)
+
+Resolver = Callable[[WeaviateClient], Any]
+
+
+class WeaviateClientPool:
+    """A fixed set of Weaviate connections shared by every request thread.
+
+    Each client keeps its gRPC channel open for the life of the service, and
+    requests are spread over the clients round-robin. At most
+    ``max_concurrent_requests`` requests run at once; the rest wait. A request
+    that fails with a connection error reconnects its client and is retried
+    once, and a background thread replaces clients that stop answering
+    ``is_ready`` every ``health_check_seconds``.
+
+    ``collections`` mirrors the client API ``DatasetGenerator`` uses, so the
+    pool can stand in for a single client.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], WeaviateClient],
+        size: int,
+        max_concurrent_requests: int,
+        health_check_seconds: float,
+    ) -> None:
+        self._connect = connect
+        self._requests = threading.BoundedSemaphore(max_concurrent_requests)
+        self._lock = threading.Lock()
+        self._slot_locks = [threading.Lock() for _ in range(size)]
+        self._clients: List[Optional[WeaviateClient]] = [self._open(index) for index in range(size)]
+        self._next = 0
+        self._stats = {"requests": 0, "retried": 0, "reconnects": 0, "failed_health_checks": 0}
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_check_seconds > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                args=(health_check_seconds,),
+                name="weaviate-health",
+                daemon=True,
+            )
+            self._health_thread.start()
+        self.collections = _PooledCollections(self)
+
+    def call(self, resolve: Resolver) -> Any:
+        """Run ``resolve(client)`` on a pooled client within the concurrency bound."""
+        with self._requests:
+            with self._lock:
+                index = self._next
+                self._next = (index + 1) % len(self._clients)
+                self._stats["requests"] += 1
+            client = self._clients[index] or self._reconnect(index, None)
+            try:
+                return resolve(client)
+            except _CONNECTION_ERRORS as exc:
+                logger.warning("Weaviate connection %d failed (%s); reconnecting", index, exc)
+                with self._lock:
+                    self._stats["retried"] += 1
+                return resolve(self._reconnect(index, client))
+
+    def warm_up(self, collection_name: str) -> None:
+        """Send a first request over every connection so no user request pays for it."""
+        started = time.perf_counter()
+        for index in range(len(self._clients)):
+            try:
+                client = self._clients[index] or self._reconnect(index, None)
+                collection = client.collections.get(collection_name)
+                if not collection.config.get().multi_tenancy_config.enabled:
+                    collection.query.fetch_objects(limit=1)
+            except Exception as exc:
+                logger.warning("Warm-up of Weaviate connection %d failed: %s", index, exc)
+        logger.info(
+            "Warmed up %d Weaviate connections in %.2fs", len(self._clients), time.perf_counter() - started
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["connections"] = len(self._clients)
+        stats["connected"] = sum(client is not None for client in self._clients)
+        return stats
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        for index, client in enumerate(self._clients):
+            if client is not None:
+                self._close(client)
+            self._clients[index] = None
+
+    def _open(self, index: int) -> Optional[WeaviateClient]:
+        try:
+            return self._connect()
+        except Exception as exc:
+            # The service still starts; the slot reconnects on its next request.
+            logger.warning("Could not connect Weaviate connection %d: %s", index, exc)
+            return None
+
+    def _reconnect(self, index: int, stale: Optional[WeaviateClient]) -> WeaviateClient:
+        with self._slot_locks[index]:
+            current = self._clients[index]
+            if current is not None and current is not stale:
+                # Another thread already replaced it.
+                return current
+            if current is not None:
+                self._close(current)
+            self._clients[index] = None
+            try:
+                client = self._connect()
+            except Exception as exc:
+                raise RuntimeError(f"Weaviate is unreachable: {exc}") from exc
+            self._clients[index] = client
+            with self._lock:
+                self._stats["reconnects"] += 1
+            return client
+
+    def _health_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            for index, client in enumerate(self._clients):
+                try:
+                    healthy = client is not None and client.is_ready()
+                except Exception:
+                    healthy = False
+                if healthy:
+                    continue
+                with self._lock:
+                    self._stats["failed_health_checks"] += 1
+                try:
+                    self._reconnect(index, client)
+                except RuntimeError as exc:
+                    logger.warning("Weaviate connection %d is down: %s", index, exc)
+
+    @staticmethod
+    def _close(client: WeaviateClient) -> None:
+        try:
+            client.close()
+        except Exception:  # pragma: no cover - closing a broken connection
+            pass
+
+
+class _PooledNamespace:
+    """``collection.query``, ``.aggregate``, ... whose methods run on a pooled client."""
+
+    def __init__(self, pool: WeaviateClientPool, resolve: Resolver) -> None:
+        self._pool = pool
+        self._resolve = resolve
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._pool.call(lambda client: getattr(self._resolve(client), method)(*args, **kwargs))
+
+        return call
+
+
+class PooledCollection:
+    """A collection handle that is not tied to one client; see :class:`WeaviateClientPool`."""
+
+    def __init__(self, pool: WeaviateClientPool, resolve: Resolver, name: str) -> None:
+        self._pool = pool
+        self._resolve = resolve
+        self.name = name
+        self.query = _PooledNamespace(pool, lambda client: resolve(client).query)
+        self.aggregate = _PooledNamespace(pool, lambda client: resolve(client).aggregate)
+        self.config = _PooledNamespace(pool, lambda client: resolve(client).config)
+        self.tenants = _PooledNamespace(pool, lambda client: resolve(client).tenants)
+
+    def with_tenant(self, tenant: str) -> "PooledCollection":
+        resolve = self._resolve
+        return PooledCollection(self._pool, lambda client: resolve(client).with_tenant(tenant), self.name)
+
+
+class _PooledCollections:
+    def __init__(self, pool: WeaviateClientPool) -> None:
+        self._pool = pool
+
+    def get(self, name: str) -> PooledCollection:
+        return PooledCollection(self._pool, lambda client: client.collections.get(name), name)
+
+    def list_all(self) -> Dict[str, Any]:
+        return self._pool.call(lambda client: client.collections.list_all())
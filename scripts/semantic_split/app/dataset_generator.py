@@ -1,26 +1,58 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
 import logging
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from huggingface_hub import HfApi
+import numpy as np
+from huggingface_hub import CommitOperationAdd, CommitOperationDelete, HfApi
 from huggingface_hub.utils import HfHubHTTPError
+from openai import OpenAI
 
 import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.query import MetadataQuery
 from weaviate.client import Client as WeaviateClient
 
-from openai import OpenAI
-
+from .adaptive import choose_cutoff
+from .client_pool import WeaviateClientPool
+from .dataset_writer import ParquetShardWriter
+from .diversity import mmr_select
+from .embedding_cache import QueryEmbeddingCache, normalize_query
+from .embeddings import EmbeddingBackend, EmbeddingSpec, create_embedding_backend
+from .local_index import LocalClient
+from .payload import decode_payload
+from .query_expansion import expand_query
+from .result_cache import CachedResult, ResultCache
 from .settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Called with the current stage and the fraction of the job done so far.
+ProgressCallback = Callable[[str, float], None]
+
+# The only properties a dataset row needs; the rest stay on the server.
+_RETURN_PROPERTIES = ("input", "output_reference", "task")
+# Rank offset of reciprocal-rank fusion; 60 is the value from the original RRF paper.
+_RRF_K = 60
+# How the dataset README explains why an adaptive cut-off stopped where it did.
+_CUTOFF_REASONS = {
+    "threshold": "distance threshold",
+    "knee": "knee of the distance curve",
+    "min_rows": "minimum row count",
+    "max_rows": "maximum row count",
+    "exhausted": "end of the results",
+}
+
 
 @dataclass
 class DatasetRow:
@@ -29,15 +61,34 @@ class DatasetRow:
     task: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
-    def as_dict(self) -> Dict[str, Any]:
-        payload = {
-            "input": self.input,
-            "output_reference": self.output_reference,
-            "task": self.task,
-        }
-        if self.metadata:
-            payload["metadata"] = self.metadata
-        return payload
+
+@dataclass
+class RetrievalReport:
+    """How the rows of a dataset were selected, for logs and the dataset README."""
+
+    candidates: int = 0
+    mmr_seconds: Optional[float] = None
+    # Set by adaptive row selection: the nearest hits kept, the distance of the
+    # last one, why the cut was made there and how many hits were looked at.
+    cutoff_rows: Optional[int] = None
+    cutoff_distance: Optional[float] = None
+    cutoff_reason: Optional[str] = None
+    cutoff_scanned: int = 0
+
+
+@dataclass
+class PublishReport:
+    files: int
+    bytes: int
+    seconds: float
+
+    def summary(self, row_count: int) -> str:
+        megabytes = self.bytes / 2**20
+        rate = megabytes / self.seconds if self.seconds > 0 else 0.0
+        return (
+            f"{row_count} rows ({megabytes:.1f} MB of Parquet in {self.files} files) "
+            f"in {self.seconds:.1f}s ({rate:.1f} MB/s)"
+        )
 
 
 @dataclass
@@ -45,9 +96,17 @@ class DatasetGenerationResult:
     repo_id: str
     row_count: int
     query: str
+    # Every query searched: the requested ones plus any expansions.
+    queries: List[str]
+    retrieval: RetrievalReport
+    publish: PublishReport
+    # Dataset repo whose rows were reused instead of querying Weaviate again.
+    reused_from: Optional[str] = None
 
 
 def build_weaviate_client(settings: Settings) -> WeaviateClient:
+    if not settings.weaviate_url:
+        raise ValueError("`SEMANTIC_SPLIT_WEAVIATE_URL` is required for the Weaviate retrieval backend.")
     auth = Auth.api_key(settings.weaviate_api_key) if settings.weaviate_api_key else None
     # headers = {
     #     "X-OpenAI-Api-Key": settings.openai_api_key,
@@ -59,51 +118,522 @@ def build_weaviate_client(settings: Settings) -> WeaviateClient:
     )
 
 
+def build_retrieval_client(settings: Settings) -> Any:
+    """A pool of Weaviate clients, or the local index client when ``retrieval_backend`` is ``local``."""
+    if settings.retrieval_backend == "local":
+        if settings.local_index_path is None:
+            raise ValueError("`SEMANTIC_SPLIT_LOCAL_INDEX_PATH` is required for the local retrieval backend.")
+        return LocalClient(settings.local_index_path, nprobe=settings.local_index_nprobe)
+    return WeaviateClientPool(
+        lambda: build_weaviate_client(settings),
+        size=settings.weaviate_pool_size,
+        max_concurrent_requests=settings.weaviate_max_concurrent_requests,
+        health_check_seconds=settings.weaviate_health_check_seconds,
+    )
+
+
 class DatasetGenerator:
-    def __init__(self, client: WeaviateClient, settings: Settings):
+    def __init__(self, client: Any, settings: Settings):
         self._client = client
         self._settings = settings
         self._hf_api = HfApi(token=settings.huggingface_token)
-        self._open_ai_client = OpenAI(api_key=settings.openai_api_key)
-
-    def generate(self, query: str, model_uuid: str) -> DatasetGenerationResult:
-        rows = list(self._fetch_rows(query))
-        if not rows:
-            raise ValueError("No rows matched the provided query")
+        self._collection_configs: Dict[str, Any] = {}
+        self._embedding_backends: Dict[EmbeddingSpec, EmbeddingBackend] = {}
+        self._embedding_backends_lock = threading.Lock()
+        self._query_embeddings = QueryEmbeddingCache(
+            max_entries=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+            path=settings.query_embedding_cache_path,
+        )
+        self._upload_slots = threading.BoundedSemaphore(settings.huggingface_upload_concurrency)
+        self._query_pool = ThreadPoolExecutor(
+            max_workers=settings.weaviate_query_concurrency, thread_name_prefix="near-vector"
+        )
+        self._results = ResultCache(settings.result_cache_dir)
 
+    def generate(
+        self,
+        queries: Sequence[str],
+        model_uuid: str,
+        progress: Optional[ProgressCallback] = None,
+    ) -> DatasetGenerationResult:
+        notify = progress or (lambda stage, fraction: None)
         repo_id = self._settings.dataset_repo_id(model_uuid)
-        self._push_to_huggingface(rows, repo_id, query=query)
+        key, version = self._fingerprint(list(queries))
+        cached = self._results.lookup(key, version)
+        if cached is not None:
+            result = self._reuse(cached, repo_id, notify)
+            if result is not None:
+                return result
 
-        return DatasetGenerationResult(repo_id=repo_id, row_count=len(rows), query=query)
+        queries = self._expand_queries(queries)
+        retrieval = RetrievalReport()
+        with TemporaryDirectory() as tmp_dir:
+            # Rows are written as they arrive, so memory does not grow with
+            # the dataset size.
+            rows = self._fetch_rows(queries, notify, retrieval)
+            row_count, shards = self._write_rows(rows, Path(tmp_dir), notify, retrieval)
+            if not row_count:
+                raise ValueError("No rows matched the provided query")
 
-    def _fetch_rows(self, query: str) -> Iterable[DatasetRow]:
-        logger.info("Querying Weaviate for `%s` (limit=%d)", query, self._settings.weaviate_query_limit)
+            notify("waiting_for_upload", 0.5)
+            # Uploads are the slowest stage and Hugging Face rate-limits commits,
+            # so only a few jobs publish at once.
+            with self._upload_slots:
+                publish = self._push_to_huggingface(
+                    shards, row_count, repo_id, queries, retrieval, progress=notify
+                )
+            self._results.store(
+                CachedResult(
+                    key=key,
+                    version=version,
+                    repo_id=repo_id,
+                    row_count=row_count,
+                    queries=queries,
+                    retrieval=asdict(retrieval),
+                ),
+                shards,
+            )
+
+        return DatasetGenerationResult(
+            repo_id=repo_id,
+            row_count=row_count,
+            query=queries[0],
+            queries=queries,
+            retrieval=retrieval,
+            publish=publish,
+        )
+
+    def result_cache_stats(self) -> Dict[str, int]:
+        return self._results.stats()
+
+    def warm_up(self) -> None:
+        """Connect, load the collection config and run a first query before serving requests."""
+        self._client.warm_up(self._settings.weaviate_index_name)
+        try:
+            self._collection_config(self._get_collection())
+        except Exception as exc:
+            logger.warning("Could not load the collection config at start-up: %s", exc)
+
+    def client_stats(self) -> Dict[str, int]:
+        return self._client.stats()
+
+    def close(self) -> None:
+        self._query_pool.shutdown(wait=False, cancel_futures=True)
+        self._query_embeddings.close()
+        self._client.close()
+
+    def embedding_cache_stats(self) -> Dict[str, float]:
+        return self._query_embeddings.stats()
+
+    def _fingerprint(self, queries: List[str]) -> Tuple[str, str]:
+        """Return the request's cache key and the collection's current version.
+
+        The key covers everything that decides which rows a request gets,
+        including the retrieval backend: the local index is approximate in its
+        own way, and Weaviate's results depend on the page size, since each
+        page repeats the search. The version is the object count of every
+        searched tenant: Weaviate keeps no revision counter, and reseeding or
+        extending a collection changes it.
+        """
         collection = self._get_collection()
         try:
-            response = self._open_ai_client.embeddings.create(model="text-embedding-3-large", input=[query])
-            if not len(response.data):
-                raise RuntimeError(
-                    "OpenAI embeddings response size ."
+            spec = self._embedding_spec(collection)
+            if self._multi_tenancy(collection):
+                tenants = self._settings.weaviate_tenants or sorted(collection.tenants.get())
+                counts = {
+                    tenant: collection.with_tenant(tenant).aggregate.over_all(total_count=True).total_count
+                    for tenant in tenants
+                }
+            else:
+                counts = {"": collection.aggregate.over_all(total_count=True).total_count}
+        except Exception as exc:  # pragma: no cover - network error path
+            self._handle_query_error(exc)
+        expansion = self._settings.query_expansion_count if len(queries) == 1 else 0
+        request = {
+            "queries": [normalize_query(query) for query in queries],
+            "backend": self._backend_identity(),
+            "expansion": [expansion, self._settings.query_expansion_model] if expansion else None,
+            "limit": self._settings.weaviate_query_limit,
+            "collection": self._settings.weaviate_index_name,
+            "tenants": self._settings.weaviate_tenants,
+            "embedding": [spec.backend, spec.model, spec.dimensions],
+            "fusion": self._settings.query_fusion if len(queries) > 1 or expansion else None,
+            "mmr": [self._settings.mmr_rows, self._settings.mmr_lambda]
+            if self._settings.mmr_rows is not None
+            else None,
+            "adaptive": [
+                self._settings.adaptive_min_rows,
+                self._settings.adaptive_max_distance,
+                self._settings.adaptive_knee,
+            ]
+            if self._settings.row_selection == "adaptive"
+            else None,
+        }
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+        version = json.dumps(counts, sort_keys=True)
+        return key, version
+
+    def _backend_identity(self) -> List[Any]:
+        settings = self._settings
+        if settings.retrieval_backend != "local":
+            return ["weaviate", settings.weaviate_url, settings.weaviate_page_size]
+        # Rebuilding the index in place rewrites index.json, so its mtime tells
+        # two builds at the same path apart.
+        index_file = Path(settings.local_index_path).resolve() / "index.json"
+        return ["local", str(index_file), index_file.stat().st_mtime_ns, settings.local_index_nprobe]
+
+    def _reuse(
+        self,
+        cached: CachedResult,
+        repo_id: str,
+        progress: ProgressCallback,
+    ) -> Optional[DatasetGenerationResult]:
+        """Answer from an earlier generation, copying its files to ``repo_id`` if needed.
+
+        Returns ``None`` when the earlier files are gone, after dropping the
+        cache entry, so the caller generates the dataset again.
+        """
+        retrieval = RetrievalReport(**cached.retrieval)
+        result = DatasetGenerationResult(
+            repo_id=repo_id,
+            row_count=cached.row_count,
+            query=cached.queries[0],
+            queries=cached.queries,
+            retrieval=retrieval,
+            publish=PublishReport(files=0, bytes=0, seconds=0.0),
+            reused_from=cached.repo_id,
+        )
+        try:
+            if cached.repo_id == repo_id and self._hf_api.repo_exists(repo_id, repo_type="dataset"):
+                logger.info("%s is already up to date", repo_id)
+                return result
+        except HfHubHTTPError as exc:  # pragma: no cover - depends on network
+            raise RuntimeError(f"Failed to check dataset repo `{repo_id}`: {exc}") from exc
+
+        progress("reusing", 0.3)
+        with TemporaryDirectory() as tmp_dir:
+            shards = self._results.artifacts(cached.key) or self._download_shards(
+                cached.repo_id, Path(tmp_dir)
+            )
+            if not shards:
+                logger.info("Files of %s are gone; generating the dataset again", cached.repo_id)
+                self._results.invalidate(cached.key)
+                return None
+            progress("waiting_for_upload", 0.5)
+            with self._upload_slots:
+                result.publish = self._push_to_huggingface(
+                    shards, cached.row_count, repo_id, cached.queries, retrieval, progress=progress
                 )
-            embedding = response.data[0].embedding
+        logger.info("Copied %s to %s", cached.repo_id, repo_id)
+        return result
 
-            res = collection.query.near_vector(
-                near_vector=embedding,
-                limit=self._settings.weaviate_query_limit,
-                return_metadata=MetadataQuery(distance=True),
+    def _download_shards(self, repo_id: str, directory: Path) -> List[Path]:
+        try:
+            self._hf_api.snapshot_download(
+                repo_id=repo_id,
+                repo_type="dataset",
+                allow_patterns=["data/*.parquet"],
+                local_dir=str(directory),
             )
+        except HfHubHTTPError as exc:  # pragma: no cover - depends on network
+            logger.warning("Could not download %s: %s", repo_id, exc)
+            return []
+        return sorted((directory / "data").glob("*.parquet"))
+
+    def _write_rows(
+        self,
+        rows: Iterable[DatasetRow],
+        directory: Path,
+        progress: ProgressCallback,
+        retrieval: RetrievalReport,
+    ) -> Tuple[int, List[Path]]:
+        writer = ParquetShardWriter(
+            directory,
+            row_group_size=self._settings.dataset_row_group_size,
+            shard_rows=self._settings.dataset_shard_rows,
+            compression_level=self._settings.dataset_compression_level,
+        )
+        for row in rows:
+            writer.add(row)
+            if writer.rows % self._settings.weaviate_page_size == 0:
+                # The cut-off is known once the first row arrives.
+                limit = retrieval.cutoff_rows or self._settings.weaviate_query_limit
+                progress("fetching", 0.15 + 0.35 * min(1.0, writer.rows / limit))
+        return writer.rows, writer.close()
+
+    def _expand_queries(self, queries: Sequence[str]) -> List[str]:
+        """Add related sub-topic queries to a single query when expansion is enabled."""
+        count = self._settings.query_expansion_count
+        if len(queries) != 1 or not count or not self._settings.openai_api_key:
+            return list(queries)
+        try:
+            client = OpenAI(api_key=self._settings.openai_api_key)
+            expanded = expand_query(client, self._settings.query_expansion_model, queries[0], count)
+        except Exception as exc:  # pragma: no cover - network error path
+            logger.warning("Query expansion failed, searching `%s` alone: %s", queries[0], exc)
+            return list(queries)
+        logger.info("Expanded `%s` into %s", queries[0], expanded[1:])
+        return expanded
+
+    def _fetch_rows(
+        self,
+        queries: List[str],
+        progress: ProgressCallback,
+        retrieval: RetrievalReport,
+    ) -> Iterator[DatasetRow]:
+        logger.info(
+            "Querying Weaviate for %s (limit=%d)",
+            ", ".join(f"`{query}`" for query in queries),
+            self._settings.weaviate_query_limit,
+        )
+        collection = self._get_collection()
+        progress("embedding", 0.05)
+        try:
+            spec = self._embedding_spec(collection)
+        except Exception as exc:  # pragma: no cover - network error path
+            self._handle_query_error(exc)
+        # Outside the Weaviate error handling: a missing API key or package
+        # keeps its own error type and message.
+        backend = self._embedding_backend(spec)
+        try:
+            # All queries, cached ones aside, are embedded in one request.
+            embeddings = self._query_embeddings.get_many(queries, spec, backend.embed)
+
+            progress("fetching", 0.15)
+            limit = self._settings.weaviate_query_limit
+            if self._settings.row_selection == "adaptive":
+                limit = self._adaptive_limit(collection, embeddings, retrieval)
+                if not limit:
+                    return
+            diversify = self._settings.mmr_rows is not None
+            objects = self._search(collection, embeddings, limit, include_vector=diversify)
+            if diversify:
+                objects = iter(self._diversify(list(objects), retrieval, progress))
+            for obj in objects:
+                props: Dict[str, Any] = obj.properties or {}
+                yield DatasetRow(
+                    input=str(props.get("input", "")),
+                    output_reference=decode_payload(str(props.get("output_reference", ""))),
+                    task=props.get("task"),
+                    metadata=self._format_metadata(obj),
+                )
         except Exception as exc:  # pragma: no cover - network error path
             self._handle_query_error(exc)
 
-        for obj in res.objects:
-            props: Dict[str, Any] = obj.properties or {}
-            metadata_dict = self._format_metadata(obj)
-            yield DatasetRow(
-                input=str(props.get("input", "")),
-                output_reference=str(props.get("output_reference", "")),
-                task=props.get("task"),
-                metadata=metadata_dict,
+    def _search(
+        self,
+        collection: Any,
+        embeddings: List[List[float]],
+        limit: int,
+        include_vector: bool = False,
+    ) -> Iterator[Any]:
+        """Yield the ``limit`` nearest objects for one or several query embeddings.
+
+        Every query is paged against every source concurrently, and hits are
+        deduplicated by object UUID. With several queries they are fused: by
+        distance, which keeps results streaming, or by reciprocal rank, which
+        needs each query's full list first.
+        """
+        sources = self._sources(collection)
+        rankings = [
+            self._merge_by_distance(
+                [self._paged_near_vector(source, embedding, limit, include_vector) for source in sources]
+            )
+            for embedding in embeddings
+        ]
+        if len(rankings) == 1:
+            # Tenants seeded from overlapping data can hold the same object.
+            return islice(_unique(rankings[0]), limit)
+        if self._settings.query_fusion == "rrf":
+            return iter(_reciprocal_rank_fusion(rankings, limit))
+        return islice(_unique(self._merge_by_distance(rankings)), limit)
+
+    def _adaptive_limit(
+        self,
+        collection: Any,
+        embeddings: List[List[float]],
+        retrieval: RetrievalReport,
+    ) -> int:
+        """Decide how many of the nearest hits are relevant enough to keep.
+
+        A first pass reads only the distances of the hits, fused by distance
+        across queries and sources, in pages that start at
+        ``adaptive_min_rows`` and double, and stops as soon as
+        :func:`~app.adaptive.choose_cutoff` has decided. The rows themselves
+        are then fetched by the usual search with the chosen limit.
+        """
+        settings = self._settings
+        limit = settings.weaviate_query_limit
+        min_rows = min(settings.adaptive_min_rows, limit)
+        started = time.perf_counter()
+        sources = self._sources(collection)
+        rankings = [
+            self._merge_by_distance(
+                [
+                    self._paged_near_vector(
+                        source, embedding, limit, properties=False, first_page=min_rows
+                    )
+                    for source in sources
+                ]
             )
+            for embedding in embeddings
+        ]
+        cutoff = choose_cutoff(
+            (obj.metadata.distance for obj in _unique(self._merge_by_distance(rankings))),
+            min_rows=min_rows,
+            max_rows=limit,
+            max_distance=settings.adaptive_max_distance,
+            knee=settings.adaptive_knee,
+        )
+        retrieval.cutoff_rows = cutoff.rows
+        retrieval.cutoff_distance = cutoff.distance
+        retrieval.cutoff_reason = cutoff.reason
+        retrieval.cutoff_scanned = cutoff.scanned
+        logger.info(
+            "Adaptive cut-off keeps %d rows (distance %s, %s) after scanning %d hits in %.3fs",
+            cutoff.rows,
+            f"{cutoff.distance:.4f}" if cutoff.distance is not None else "n/a",
+            cutoff.reason,
+            cutoff.scanned,
+            time.perf_counter() - started,
+        )
+        return cutoff.rows
+
+    def _diversify(
+        self,
+        candidates: List[Any],
+        retrieval: RetrievalReport,
+        progress: ProgressCallback,
+    ) -> List[Any]:
+        """Keep ``mmr_rows`` of the candidates by maximal marginal relevance.
+
+        The whole candidate pool (``weaviate_query_limit`` objects and their
+        vectors) is held in memory for the selection. Relevance is the cosine
+        similarity to the query, ``1 - distance``.
+        """
+        progress("diversifying", 0.35)
+        started = time.perf_counter()
+        retrieval.candidates = len(candidates)
+        picks: List[int] = []
+        if candidates:
+            vectors = np.asarray([_object_vector(obj) for obj in candidates], dtype=np.float32)
+            relevance = 1.0 - np.asarray([obj.metadata.distance for obj in candidates])
+            picks = mmr_select(vectors, relevance, self._settings.mmr_rows, self._settings.mmr_lambda)
+        retrieval.mmr_seconds = time.perf_counter() - started
+        logger.info(
+            "MMR kept %d of %d candidates in %.3fs (lambda=%.2f)",
+            len(picks),
+            len(candidates),
+            retrieval.mmr_seconds,
+            self._settings.mmr_lambda,
+        )
+        return [candidates[index] for index in picks]
+
+    def _sources(self, collection: Any) -> List[Any]:
+        """The collection, or one handle per tenant of a multi-tenant collection.
+
+        The seed script can keep each dataset in its own tenant; a tenant-less
+        query is rejected there, so each tenant is searched separately.
+        """
+        if not self._multi_tenancy(collection):
+            return [collection]
+        tenants = self._settings.weaviate_tenants or sorted(collection.tenants.get())
+        return [collection.with_tenant(tenant) for tenant in tenants]
+
+    @staticmethod
+    def _merge_by_distance(streams: List[Iterator[Any]]) -> Iterator[Any]:
+        if len(streams) == 1:
+            return streams[0]
+        return heapq.merge(*streams, key=lambda obj: obj.metadata.distance)
+
+    def _paged_near_vector(
+        self,
+        source: Any,
+        embedding: List[float],
+        limit: int,
+        include_vector: bool = False,
+        properties: bool = True,
+        first_page: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Page through ``near_vector`` results with ``offset`` up to ``limit`` objects.
+
+        Weaviate has no cursor for vector search, so each page repeats the
+        search with a larger offset. The server caps offset plus limit at its
+        ``QUERY_MAXIMUM_RESULTS`` setting (10000 by default). The first page is
+        requested right away and each next page while the current one is
+        consumed, so sources and queries are searched concurrently.
+
+        The repeated search is approximate, so an object can come back on two
+        pages. Repeats are dropped, and paging goes on until ``limit`` distinct
+        objects have been yielded or a short page shows the results are done.
+
+        Pages hold ``weaviate_page_size`` hits, or start at ``first_page`` and
+        double up to it, so a reader that may stop early fetches little more
+        than it reads. Without ``properties`` only distances and UUIDs return.
+        """
+        page_size = self._settings.weaviate_page_size
+        return_properties = list(_RETURN_PROPERTIES) if properties else False
+
+        def fetch(offset: int, size: int) -> List[Any]:
+            return source.query.near_vector(
+                near_vector=embedding,
+                limit=size,
+                offset=offset,
+                return_metadata=MetadataQuery(distance=True),
+                return_properties=return_properties,
+                include_vector=include_vector,
+            ).objects
+
+        def pages(page: Future, size: int) -> Iterator[Any]:
+            offset = 0
+            seen: set = set()
+            while page is not None:
+                objects = page.result()
+                offset += size
+                fresh = [obj for obj in objects if obj.uuid not in seen]
+                seen.update(obj.uuid for obj in fresh)
+                page = None
+                if len(objects) == size and len(seen) < limit:
+                    size = min(size * 2, page_size, limit - len(seen))
+                    page = self._query_pool.submit(fetch, offset, size)
+                yield from fresh
+
+        size = min(first_page or page_size, page_size, limit)
+        return pages(self._query_pool.submit(fetch, 0, size), size)
+
+    def _collection_config(self, collection: Any) -> Any:
+        name = self._settings.weaviate_index_name
+        config = self._collection_configs.get(name)
+        if config is None:
+            config = self._collection_configs[name] = collection.config.get()
+        return config
+
+    def _multi_tenancy(self, collection: Any) -> bool:
+        tenancy = self._collection_config(collection).multi_tenancy_config
+        return bool(tenancy is not None and tenancy.enabled)
+
+    def _embedding_spec(self, collection: Any) -> EmbeddingSpec:
+        """Return the embedding settings the collection's vectors were created with.
+
+        Query vectors must match the stored model and dimensionality, so the
+        settings recorded by the seed script take precedence over `Settings`.
+        """
+        description = self._collection_config(collection).description
+        return EmbeddingSpec.from_description(description) or EmbeddingSpec.from_settings(
+            self._settings
+        )
+
+    def _embedding_backend(self, spec: EmbeddingSpec) -> EmbeddingBackend:
+        # Local models are expensive to load, so each backend is built once,
+        # even when concurrent jobs ask for it at the same time.
+        with self._embedding_backends_lock:
+            backend = self._embedding_backends.get(spec)
+            if backend is None:
+                backend = self._embedding_backends[spec] = create_embedding_backend(
+                    spec, self._settings
+                )
+            return backend
 
     def _get_collection(self):
         try:
@@ -135,6 +665,11 @@ class DatasetGenerator:
                 "The selected Weaviate collection does not have a vectorizer configured. "
                 "Enable a vectorizer module for the collection or use a collection with vectorization support."
             ) from exc
+        if "query_maximum_results" in lowered or "maximum results" in lowered:
+            raise RuntimeError(
+                f"Weaviate refused to page past its result window: {exc}. Lower "
+                "`SEMANTIC_SPLIT_WEAVIATE_QUERY_LIMIT` or raise `QUERY_MAXIMUM_RESULTS` on the server."
+            ) from exc
         raise RuntimeError(f"Weaviate query failed: {exc}") from exc
 
     def _collection_hint(self) -> str:
@@ -148,8 +683,19 @@ class DatasetGenerator:
         suffix = "..." if len(available) > 10 else ""
         return f"Available collections: {joined}{suffix}."
 
-    def _push_to_huggingface(self, rows: List[DatasetRow], repo_id: str, query: str) -> None:
-        logger.info("Pushing %d rows to %s", len(rows), repo_id)
+    def _push_to_huggingface(
+        self,
+        shards: List[Path],
+        row_count: int,
+        repo_id: str,
+        queries: List[str],
+        retrieval: RetrievalReport,
+        progress: ProgressCallback,
+    ) -> PublishReport:
+        """Publish the Parquet shards and the README in a single commit."""
+        logger.info("Pushing %d rows to %s", row_count, repo_id)
+        progress("creating_repo", 0.55)
+        started = time.perf_counter()
         try:
             self._hf_api.create_repo(
                 repo_id=repo_id,
@@ -157,44 +703,82 @@ class DatasetGenerator:
                 exist_ok=True,
                 private=self._settings.hf_private,
             )
+            existing = self._hf_api.list_repo_files(repo_id=repo_id, repo_type="dataset")
         except HfHubHTTPError as exc:  # pragma: no cover - depends on network
             raise RuntimeError(f"Failed to ensure dataset repo `{repo_id}` exists: {exc}") from exc
 
-        with TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            data_path = tmp_path / "data.jsonl"
-            readme_path = tmp_path / "README.md"
-
-            with data_path.open("w", encoding="utf-8") as handle:
-                for row in rows:
-                    handle.write(json.dumps(row.as_dict(), ensure_ascii=False))
-                    handle.write("\n")
-
-            readme_content = self._build_readme(len(rows), query)
-            readme_path.write_text(readme_content, encoding="utf-8")
+        readme = self._build_readme(row_count, queries, retrieval).encode("utf-8")
+        uploads = {f"data/{path.name}": path for path in shards}
+        operations: List[Any] = [
+            CommitOperationAdd(path_in_repo=path_in_repo, path_or_fileobj=str(path))
+            for path_in_repo, path in uploads.items()
+        ]
+        operations.append(CommitOperationAdd(path_in_repo="README.md", path_or_fileobj=readme))
+        # Data files of an earlier generation (other shard counts, JSONL) would
+        # otherwise be read as part of this dataset.
+        operations.extend(
+            CommitOperationDelete(path_in_repo=path)
+            for path in existing
+            if path.startswith("data/") and path not in uploads
+        )
 
-            self._hf_api.upload_file(
-                path_or_fileobj=str(data_path),
-                path_in_repo="data/data.jsonl",
-                repo_id=repo_id,
-                repo_type="dataset",
-            )
-            self._hf_api.upload_file(
-                path_or_fileobj=str(readme_path),
-                path_in_repo="README.md",
+        progress("uploading", 0.65)
+        try:
+            self._hf_api.create_commit(
                 repo_id=repo_id,
                 repo_type="dataset",
+                operations=operations,
+                commit_message=f"Semantic split dataset for `{queries[0]}` ({row_count} rows)",
             )
+        except HfHubHTTPError as exc:  # pragma: no cover - depends on network
+            raise RuntimeError(f"Failed to publish dataset `{repo_id}`: {exc}") from exc
 
-    def _build_readme(self, row_count: int, query: str) -> str:
+        report = PublishReport(
+            files=len(shards),
+            bytes=sum(path.stat().st_size for path in shards),
+            seconds=time.perf_counter() - started,
+        )
+        logger.info("Published %s to %s", report.summary(row_count), repo_id)
+        return report
+
+    def _build_readme(
+        self, row_count: int, queries: List[str], retrieval: RetrievalReport
+    ) -> str:
         visibility = "private" if self._settings.hf_private else "public"
+        details = f"- Query: `{queries[0]}`\n"
+        if len(queries) > 1:
+            details += f"- Related queries ({self._settings.query_fusion} fusion): " + ", ".join(
+                f"`{query}`" for query in queries[1:]
+            ) + "\n"
+        if retrieval.cutoff_rows is not None:
+            distance = (
+                f" (distance {retrieval.cutoff_distance:.4f})"
+                if retrieval.cutoff_distance is not None
+                else ""
+            )
+            threshold = self._settings.adaptive_max_distance
+            details += (
+                f"- Adaptive cut-off: kept the {retrieval.cutoff_rows} nearest hits{distance}, "
+                f"stopping at the {_CUTOFF_REASONS[retrieval.cutoff_reason]}; "
+                f"{retrieval.cutoff_scanned} hits scanned, bounds "
+                f"{self._settings.adaptive_min_rows}-{self._settings.weaviate_query_limit} rows, "
+                f"distance threshold {threshold if threshold is not None else 'none'}, "
+                f"knee detection {'on' if self._settings.adaptive_knee else 'off'}\n"
+            )
+        if retrieval.mmr_seconds is not None:
+            details += (
+                f"- Diversity: maximal marginal relevance (lambda={self._settings.mmr_lambda}) kept "
+                f"{row_count} of {retrieval.candidates} nearest candidates, "
+                f"selected in {retrieval.mmr_seconds:.3f}s\n"
+            )
         return (
             f"# Semantic Split Dataset\n\n"
-            f"- Query: `{query}`\n"
+            f"{details}"
             f"- Row count: {row_count}\n"
             f"- Visibility: {visibility}\n\n"
-            "Each row contains the input prompt, the associated `output_reference`, optional `task`, "
-            "and optional metadata returned by Weaviate."
+            "Rows are stored as zstd-compressed Parquet under `data/`. Each row contains the input "
+            "prompt, the associated `output_reference`, optional `task`, and optional metadata "
+            "returned by Weaviate."
         )
 
     @staticmethod
@@ -211,3 +795,31 @@ class DatasetGenerator:
             candidate["id"] = str(obj_uuid)
         cleaned = {key: value for key, value in candidate.items() if value is not None}
         return cleaned or None
+
+
+def _object_vector(obj: Any) -> Any:
+    vector = obj.vector
+    return vector.get("default") if isinstance(vector, dict) else vector
+
+
+def _unique(objects: Iterable[Any]) -> Iterator[Any]:
+    """Drop repeats of an object UUID, keeping the first (closest) occurrence."""
+    seen = set()
+    for obj in objects:
+        if obj.uuid not in seen:
+            seen.add(obj.uuid)
+            yield obj
+
+
+def _reciprocal_rank_fusion(rankings: List[Iterator[Any]], limit: int) -> List[Any]:
+    """Order objects by the sum of ``1 / (k + rank)`` over the rankings they appear in."""
+    scores: Dict[Any, float] = {}
+    closest: Dict[Any, Any] = {}
+    for ranking in rankings:
+        for rank, obj in enumerate(ranking, start=1):
+            scores[obj.uuid] = scores.get(obj.uuid, 0.0) + 1.0 / (_RRF_K + rank)
+            best = closest.get(obj.uuid)
+            if best is None or obj.metadata.distance < best.metadata.distance:
+                closest[obj.uuid] = obj
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+    return [closest[uuid] for uuid in fused]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:
+    from .dataset_generator import DatasetRow
+
+SCHEMA = pa.schema(
+    [
+        ("input", pa.string()),
+        ("output_reference", pa.string()),
+        ("task", pa.string()),
+        ("metadata", pa.struct([("distance", pa.float64()), ("id", pa.string())])),
+    ]
+)
+
+
+class ParquetShardWriter:
+    """Streams dataset rows into zstd-compressed Parquet shards under ``directory``.
+
+    Rows are buffered into row groups of at most ``row_group_size``; a new
+    shard file is started every ``shard_rows`` rows. Shards are named the way the
+    Hugging Face dataset viewer expects, ``train-00000-of-00003.parquet``,
+    once the total is known in :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        row_group_size: int,
+        shard_rows: int,
+        compression_level: Optional[int] = None,
+    ) -> None:
+        self._directory = directory
+        self._row_group_size = row_group_size
+        self._shard_rows = shard_rows
+        self._compression_level = compression_level
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._shard_paths: List[Path] = []
+        self._shard_count = 0
+        self._buffer: Dict[str, List[Any]] = {name: [] for name in SCHEMA.names}
+        self.rows = 0
+
+    def add(self, row: DatasetRow) -> None:
+        self._buffer["input"].append(row.input)
+        self._buffer["output_reference"].append(row.output_reference)
+        self._buffer["task"].append(None if row.task is None else str(row.task))
+        self._buffer["metadata"].append(row.metadata)
+        self.rows += 1
+        # Row groups never straddle shards, so every shard holds exactly shard_rows.
+        room = self._shard_rows - self._shard_count if self._shard_count < self._shard_rows else self._shard_rows
+        if len(self._buffer["input"]) >= min(self._row_group_size, room):
+            self._flush()
+
+    def close(self) -> List[Path]:
+        """Finish the last shard and return the shard paths in order."""
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        total = len(self._shard_paths)
+        final = []
+        for index, path in enumerate(self._shard_paths):
+            target = path.with_name(f"train-{index:05d}-of-{total:05d}.parquet")
+            path.replace(target)
+            final.append(target)
+        return final
+
+    def _flush(self) -> None:
+        pending = len(self._buffer["input"])
+        if not pending:
+            return
+        if self._writer is None or self._shard_count >= self._shard_rows:
+            if self._writer is not None:
+                self._writer.close()
+            path = self._directory / f"part-{len(self._shard_paths):05d}.parquet"
+            self._shard_paths.append(path)
+            self._writer = pq.ParquetWriter(
+                str(path),
+                SCHEMA,
+                compression="zstd",
+                compression_level=self._compression_level,
+            )
+            self._shard_count = 0
+        table = pa.table(self._buffer, schema=SCHEMA)
+        self._writer.write_table(table, row_group_size=self._row_group_size)
+        self._shard_count += pending
+        self._buffer = {name: [] for name in SCHEMA.names}
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+
+def mmr_select(vectors: np.ndarray, relevance: np.ndarray, k: int, lambda_: float) -> List[int]:
+    """Pick ``k`` row indices of ``vectors`` by maximal marginal relevance.
+
+    Each step takes the candidate maximising
+    ``lambda_ * relevance - (1 - lambda_) * max cosine similarity to the picks so far``,
+    so ``lambda_ = 1`` keeps the nearest neighbours and lower values trade
+    relevance for diversity. The similarity to the latest pick is one
+    matrix-vector product, which keeps selection at O(k * n * d).
+    """
+    count = len(vectors)
+    if k >= count:
+        return list(range(count))
+    unit = vectors.astype(np.float32, copy=True)
+    unit /= np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+    relevance = np.asarray(relevance, dtype=np.float32)
+
+    closest = np.full(count, -np.inf, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    picks: List[int] = []
+    for _ in range(k):
+        redundancy = np.where(np.isfinite(closest), closest, 0.0)
+        scores = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        picks.append(pick)
+        available[pick] = False
+        np.maximum(closest, unit @ unit[pick], out=closest)
+    return picks
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embeddings import EmbeddingSpec
+
+
+def normalize_query(query: str) -> str:
+    """Unicode NFC with whitespace collapsed; case is kept, it can change the embedding."""
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class QueryEmbeddingCache:
+    """LRU + TTL cache of query embeddings with single-flight misses.
+
+    Entries are keyed by the normalised query and the embedding spec, so a
+    collection seeded with another model never gets a foreign vector. When
+    several requests miss on the same key at once, only the first calls the
+    embedding backend; the others wait for its result (or its exception).
+    Batches embed all their misses with one backend call.
+    With ``path`` set, entries are also written to a SQLite file and survive
+    restarts, still subject to the TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        path: Optional[Path] = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM query_embeddings WHERE created < ?", (time.time() - ttl_seconds,)
+            )
+            self._db.commit()
+
+    def get(
+        self,
+        query: str,
+        spec: EmbeddingSpec,
+        embed: Callable[[str], List[float]],
+    ) -> List[float]:
+        """Return the embedding of ``query``, calling ``embed`` at most once per key."""
+        return self.get_many([query], spec, lambda texts: [embed(texts[0])])[0]
+
+    def get_many(
+        self,
+        queries: Sequence[str],
+        spec: EmbeddingSpec,
+        embed_many: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """Return the embeddings of ``queries``; all misses go to one ``embed_many`` call.
+
+        Keys another caller is already embedding are waited on, not requested again.
+        """
+        keys = [self._key(query, spec) for query in queries]
+        results: Dict[str, np.ndarray] = {}
+        waiting: Dict[str, Future] = {}
+        leading: Dict[str, Tuple[str, Future]] = {}
+        with self._lock:
+            for query, key in zip(queries, keys):
+                if key in results or key in waiting or key in leading:
+                    continue
+                vector = self._lookup(key)
+                if vector is not None:
+                    results[key] = vector
+                elif key in self._in_flight:
+                    waiting[key] = self._in_flight[key]
+                    self._stats["coalesced"] += 1
+                else:
+                    leading[key] = (normalize_query(query), self._in_flight.setdefault(key, Future()))
+                    self._stats["misses"] += 1
+
+        if leading:
+            try:
+                vectors = embed_many([text for text, _ in leading.values()])
+            except BaseException as exc:
+                with self._lock:
+                    self._stats["errors"] += 1
+                    for key in leading:
+                        del self._in_flight[key]
+                for _, future in leading.values():
+                    future.set_exception(exc)
+                raise
+            created = time.time()
+            with self._lock:
+                for key, vector in zip(leading, vectors):
+                    results[key] = np.asarray(vector, dtype=np.float32)
+                    self._store(key, created, results[key])
+                    del self._in_flight[key]
+            for key, (_, future) in leading.items():
+                future.set_result(results[key])
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return [results[key].tolist() for key in keys]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._in_flight)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+        # Coalesced requests did not call upstream either, so they count as hits.
+        saved = stats["hits"] + stats["disk_hits"] + stats["coalesced"]
+        stats["hit_rate"] = round(saved / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @staticmethod
+    def _key(query: str, spec: EmbeddingSpec) -> str:
+        raw = f"{spec.backend}\x00{spec.model}\x00{spec.dimensions}\x00{normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        # Called with the lock held.
+        entry = self._entries.get(key)
+        if entry is not None:
+            created, vector = entry
+            if time.time() - created < self._ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return vector
+            del self._entries[key]
+            self._stats["expired"] += 1
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT created, vector FROM query_embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or time.time() - row[0] >= self._ttl:
+            return None
+        vector = np.frombuffer(row[1], dtype=np.float32)
+        self._remember(key, row[0], vector)
+        self._stats["disk_hits"] += 1
+        return vector
+
+    def _store(self, key: str, created: float, vector: np.ndarray) -> None:
+        # Called with the lock held.
+        self._remember(key, created, vector)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, created, vector) VALUES (?, ?, ?)",
+                (key, created, vector.tobytes()),
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, created: float, vector: np.ndarray) -> None:
+        self._entries[key] = (created, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Protocol
+
+import numpy as np
+from openai import OpenAI
+
+from .settings import ConfigurationError, Settings
+
+# Written by the seed script into the collection description, e.g.
+# "[embedding backend=openai model=text-embedding-3-large dimensions=1024]".
+_EMBEDDING_MARKER = re.compile(r"\[embedding(?P<fields>(?: \w+=[^\s\]]+)*)\]")
+
+
+@dataclass(frozen=True)
+class EmbeddingSpec:
+    model: str
+    dimensions: Optional[int] = None
+    backend: str = "openai"
+
+    @classmethod
+    def from_description(cls, description: Optional[str]) -> Optional["EmbeddingSpec"]:
+        match = _EMBEDDING_MARKER.search(description or "")
+        if match is None:
+            return None
+        fields = dict(item.split("=", 1) for item in match.group("fields").split())
+        dimensions = fields.get("dimensions")
+        return cls(
+            model=fields["model"],
+            dimensions=int(dimensions) if dimensions else None,
+            # Collections seeded before backends were recorded used OpenAI.
+            backend=fields.get("backend", "openai"),
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "EmbeddingSpec":
+        return cls(
+            model=settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+            backend=settings.embedding_backend,
+        )
+
+    def request_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"model": self.model}
+        if self.dimensions is not None:
+            kwargs["dimensions"] = self.dimensions
+        return kwargs
+
+
+class EmbeddingBackend(Protocol):
+    def embed(self, texts: List[str]) -> List[List[float]]: ...
+
+
+class OpenAIEmbeddingBackend:
+    def __init__(self, client: OpenAI, spec: EmbeddingSpec):
+        self._client = client
+        self._spec = spec
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self._client.embeddings.create(input=texts, **self._spec.request_kwargs())
+        if len(response.data) != len(texts):
+            raise RuntimeError("OpenAI embeddings response size did not match the input.")
+        return [item.embedding for item in response.data]
+
+
+class LocalEmbeddingBackend:
+    """sentence-transformers model on the CPU, matching the seed script's local backend.
+
+    Vectors are truncated to ``spec.dimensions`` and L2-normalised with NumPy,
+    exactly as they were at ingest time.
+    """
+
+    def __init__(self, spec: EmbeddingSpec, runtime: str = "torch", threads: Optional[int] = None):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise ConfigurationError(
+                "The collection was seeded with the local embedding backend; "
+                "install sentence-transformers (`uv sync --extra local`) to query it."
+            ) from exc
+        model_kwargs: Optional[Dict[str, Any]] = None
+        if runtime == "onnx":
+            model_kwargs = {"provider": "CPUExecutionProvider"}
+            if threads:
+                import onnxruntime
+
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = threads
+                model_kwargs["session_options"] = session_options
+        elif threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self._model = SentenceTransformer(
+            spec.model, device="cpu", backend=runtime, model_kwargs=model_kwargs
+        )
+        self._dimensions = spec.dimensions
+        # Model inference is not guaranteed to be re-entrant across request threads.
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            vectors = self._model.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            ).astype(np.float32, copy=False)
+        if self._dimensions is not None:
+            vectors = vectors[:, : self._dimensions]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-12)).tolist()
+
+
+def create_embedding_backend(spec: EmbeddingSpec, settings: Settings) -> EmbeddingBackend:
+    if spec.backend == "local":
+        return LocalEmbeddingBackend(
+            spec,
+            runtime=settings.local_embedding_runtime,
+            threads=settings.local_embedding_threads,
+        )
+    if spec.backend != "openai":
+        raise ConfigurationError(f"Unsupported embedding backend `{spec.backend}`.")
+    if not settings.openai_api_key:
+        raise ConfigurationError("`OPENAI_API_KEY` is required to query collections embedded with OpenAI.")
+    return OpenAIEmbeddingBackend(OpenAI(api_key=settings.openai_api_key), spec)
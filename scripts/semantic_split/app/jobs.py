@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .dataset_generator import DatasetGenerator
+from .settings import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class Job(BaseModel):
+    id: str
+    query: str
+    # Requested queries, replaced by the expanded list once the job has run.
+    queries: List[str] = Field(default_factory=list)
+    model_uuid: str
+    status: JobStatus = "queued"
+    stage: str = "queued"
+    progress: float = Field(default=0.0, ge=0.0, le=1.0)
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    repo_id: Optional[str] = None
+    row_count: Optional[int] = None
+    # Seconds spent on MMR diversity selection, when it is enabled.
+    selection_seconds: Optional[float] = None
+    # Size of the published Parquet files and how long the commit took.
+    data_bytes: Optional[int] = None
+    publish_seconds: Optional[float] = None
+    # Earlier dataset repo the result was reused from, if any.
+    reused_from: Optional[str] = None
+    # "not_found" when nothing matched the query, "upstream" when Weaviate,
+    # OpenAI or Hugging Face failed, "configuration" when the service lacks a
+    # key or package the request needs, "internal" for anything else.
+    error_kind: Optional[Literal["not_found", "upstream", "configuration", "internal"]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobManager:
+    """Runs dataset generation in a bounded worker pool and keeps job state.
+
+    At most ``workers`` jobs run at a time; the rest wait in submission order.
+    The ``history`` most recent jobs stay queryable. With ``store_path`` set,
+    jobs are also written to a JSON file and reloaded on start; jobs that were
+    still queued or running when the service stopped are marked failed.
+    """
+
+    def __init__(
+        self,
+        generator: DatasetGenerator,
+        workers: int,
+        history: int,
+        store_path: Optional[Path] = None,
+    ) -> None:
+        self._generator = generator
+        self._history = history
+        self._store_path = store_path
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset-job")
+        if store_path is not None:
+            self._load()
+
+    def submit(self, queries: List[str], model_uuid: str) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex,
+            query=queries[0],
+            queries=queries,
+            model_uuid=model_uuid,
+            created_at=_now(),
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            self._save()
+        self._executor.submit(self._run, job.id)
+        return job.model_copy()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job is not None else None
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return [job.model_copy() for job in reversed(self._jobs.values())]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str) -> None:
+        self._update(job_id, status="running", stage="starting", started_at=_now())
+        job = self.get(job_id)
+        assert job is not None
+
+        def progress(stage: str, fraction: float) -> None:
+            self._update(job_id, stage=stage, progress=fraction)
+
+        try:
+            result = self._generator.generate(
+                queries=job.queries or [job.query], model_uuid=job.model_uuid, progress=progress
+            )
+        except ConfigurationError as exc:
+            self._fail(job_id, "configuration", exc)
+        except ValueError as exc:
+            self._fail(job_id, "not_found", exc)
+        except RuntimeError as exc:
+            self._fail(job_id, "upstream", exc)
+        except Exception as exc:
+            logger.exception("Dataset job %s failed", job_id)
+            self._fail(job_id, "internal", exc)
+        else:
+            self._update(
+                job_id,
+                status="succeeded",
+                stage="done",
+                progress=1.0,
+                finished_at=_now(),
+                repo_id=result.repo_id,
+                row_count=result.row_count,
+                queries=result.queries,
+                selection_seconds=result.retrieval.mmr_seconds,
+                data_bytes=result.publish.bytes,
+                publish_seconds=result.publish.seconds,
+                reused_from=result.reused_from,
+            )
+
+    def _fail(self, job_id: str, kind: str, exc: Exception) -> None:
+        self._update(job_id, status="failed", finished_at=_now(), error_kind=kind, error=str(exc))
+
+    def _update(self, job_id: str, **changes: object) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._jobs[job_id] = job.model_copy(update=changes)
+            # Progress ticks are not worth a write; state changes are.
+            if set(changes) - {"stage", "progress"}:
+                self._save()
+
+    def _prune(self) -> None:
+        # Called with the lock held; drops the oldest finished jobs first.
+        excess = len(self._jobs) - self._history
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][: max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _save(self) -> None:
+        # Called with the lock held.
+        if self._store_path is None:
+            return
+        payload = [job.model_dump(mode="json") for job in self._jobs.values()]
+        tmp_path = self._store_path.with_name(f"{self._store_path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._store_path)
+
+    def _load(self) -> None:
+        assert self._store_path is not None
+        self._store_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._store_path.exists():
+            return
+        try:
+            payload = json.loads(self._store_path.read_text(encoding="utf-8"))
+            jobs = [Job.model_validate(item) for item in payload]
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable job store %s: %s", self._store_path, exc)
+            return
+        for job in jobs:
+            if not job.finished:
+                job = job.model_copy(
+                    update={
+                        "status": "failed",
+                        "finished_at": _now(),
+                        "error_kind": "internal",
+                        "error": "The service restarted before the job finished.",
+                    }
+                )
+            self._jobs[job.id] = job
+        with self._lock:
+            self._prune()
+            self._save()
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Arrow snapshots written by the seed script (`main.py --export-snapshot`).
+_SNAPSHOT_FORMAT = b"1"
+_VECTOR_COLUMN = "vector"
+_INDEX_FORMAT = 1
+# k-means trains on at most this many vectors per list.
+_TRAIN_POINTS_PER_LIST = 256
+_CHUNK_ROWS = 65_536
+
+
+@dataclass
+class IndexStats:
+    rows: int
+    lists: int
+    dimensions: int
+    seconds: float
+
+    def summary(self) -> str:
+        return (
+            f"Indexed {self.rows} vectors ({self.dimensions} dimensions) into {self.lists} lists "
+            f"in {self.seconds:.1f}s."
+        )
+
+
+def build_index(
+    snapshot_path: Path,
+    directory: Path,
+    *,
+    lists: Optional[int] = None,
+    iterations: int = 10,
+    seed: int = 0,
+) -> IndexStats:
+    """Build an IVF index over a seed vector snapshot.
+
+    Vectors are L2-normalised and clustered with spherical k-means into
+    ``lists`` inverted lists (``sqrt(rows)`` by default). Each list's vectors
+    are written contiguously to ``vectors.npy``, so a probe is one sequential
+    scan of a memory-mapped slice. The snapshot itself stays the source of
+    the object properties. Memory use is bounded by the k-means sample and
+    one snapshot batch, whatever the collection size.
+    """
+    started = time.perf_counter()
+    source = pa.memory_map(str(snapshot_path))
+    reader = pa.ipc.open_file(source)
+    metadata = reader.schema.metadata or {}
+    if metadata.get(b"seed.format") != _SNAPSHOT_FORMAT:
+        raise RuntimeError(f"'{snapshot_path}' is not a seed vector snapshot.")
+    dimensions = int(metadata[b"seed.dimensions"])
+    batch_rows = [reader.get_batch(index).num_rows for index in range(reader.num_record_batches)]
+    rows = sum(batch_rows)
+    if not rows:
+        raise RuntimeError(f"Snapshot '{snapshot_path}' holds no vectors.")
+    lists = max(1, min(lists or round(rows**0.5), rows))
+    property_names = [name for name in reader.schema.names if name != _VECTOR_COLUMN]
+
+    def batches() -> Iterator[Tuple[int, np.ndarray, pa.RecordBatch]]:
+        start = 0
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            values = batch.column(_VECTOR_COLUMN).flatten().to_numpy(zero_copy_only=True)
+            yield start, _normalize(values.reshape(batch.num_rows, dimensions)), batch
+            start += batch.num_rows
+
+    rng = np.random.default_rng(seed)
+    sample_size = min(rows, lists * _TRAIN_POINTS_PER_LIST)
+    sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+    sample = np.concatenate(
+        [
+            vectors[sample_rows[(sample_rows >= start) & (sample_rows < start + len(vectors))] - start]
+            for start, vectors, _ in batches()
+        ]
+    )
+    centroids = _spherical_kmeans(sample, lists, iterations, rng)
+
+    labels = np.empty(rows, dtype=np.int32)
+    for start, vectors, _ in batches():
+        labels[start : start + len(vectors)] = _assign(vectors, centroids)
+    order = np.argsort(labels, kind="stable")
+    offsets = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=lists), out=offsets[1:])
+    position = np.empty(rows, dtype=np.int64)
+    position[order] = np.arange(rows)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    packed = np.lib.format.open_memmap(
+        directory / "vectors.npy", mode="w+", dtype=np.float32, shape=(rows, dimensions)
+    )
+    uuids = np.empty((rows, 16), dtype=np.uint8)
+    for start, vectors, batch in batches():
+        targets = position[start : start + len(vectors)]
+        packed[targets] = vectors
+        columns = [batch.column(name).to_pylist() for name in property_names]
+        for row, values in enumerate(zip(*columns)):
+            sample_properties = dict(zip(property_names, values))
+            uuids[targets[row]] = np.frombuffer(object_uuid(sample_properties).bytes, dtype=np.uint8)
+    packed.flush()
+    del packed
+    np.save(directory / "centroids.npy", centroids)
+    np.save(directory / "offsets.npy", offsets)
+    np.save(directory / "rows.npy", order.astype(np.int64))
+    np.save(directory / "uuids.npy", uuids)
+    (directory / "index.json").write_text(
+        json.dumps(
+            {
+                "format": _INDEX_FORMAT,
+                "snapshot": str(snapshot_path.resolve()),
+                "collection": metadata[b"seed.collection"].decode("utf-8"),
+                "description": metadata[b"seed.description"].decode("utf-8"),
+                "rows": rows,
+                "dimensions": dimensions,
+                "lists": lists,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    source.close()
+    return IndexStats(rows=rows, lists=lists, dimensions=dimensions, seconds=time.perf_counter() - started)
+
+
+def object_uuid(properties: Dict[str, Any]) -> uuid.UUID:
+    """The UUID the seed script gave the object with these properties (see its ``sample_uuid``)."""
+    content = json.dumps(properties, sort_keys=True, ensure_ascii=False)
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    namespace = f"{properties.get('datasetName', '')}/{properties.get('datasetSplit', '')}/"
+    return uuid.uuid5(uuid.NAMESPACE_DNS, namespace + content_hash)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _CHUNK_ROWS):
+        chunk = vectors[start : start + _CHUNK_ROWS]
+        labels[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(
+    sample: np.ndarray, lists: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=lists)
+        empty = counts == 0
+        # Empty lists restart from random sample points instead of staying dead.
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class LocalVectorIndex:
+    """Memory-mapped IVF index written by :func:`build_index`.
+
+    Loading maps the index arrays and the snapshot without reading them, so
+    start-up time does not depend on the collection size; pages are read on
+    first use. ``search`` probes the ``nprobe`` lists whose centroids are
+    closest to the query and returns cosine distances, like Weaviate's
+    default metric; ``nprobe >= lists`` is an exact search.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        try:
+            self.meta = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise RuntimeError(f"Could not read local index '{directory}': {exc}") from exc
+        if self.meta.get("format") != _INDEX_FORMAT:
+            raise RuntimeError(f"'{directory}' is not a local vector index.")
+        self.centroids = np.load(directory / "centroids.npy")
+        self.offsets = np.load(directory / "offsets.npy")
+        self.vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        self.rows = np.load(directory / "rows.npy", mmap_mode="r")
+        self.uuids = np.load(directory / "uuids.npy", mmap_mode="r")
+        self._source = pa.memory_map(self.meta["snapshot"])
+        self.table = pa.ipc.open_file(self._source).read_all()
+
+    @property
+    def lists(self) -> int:
+        return len(self.centroids)
+
+    def search(self, vector: Sequence[float], k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the index positions and cosine distances of the ``k`` nearest vectors."""
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        if nprobe >= self.lists:
+            probes = np.arange(self.lists)
+        else:
+            probes = np.argpartition(-(self.centroids @ query), nprobe)[:nprobe]
+        positions = [np.arange(self.offsets[probe], self.offsets[probe + 1]) for probe in probes]
+        similarities = [
+            self.vectors[self.offsets[probe] : self.offsets[probe + 1]] @ query for probe in probes
+        ]
+        candidates = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        scores = np.concatenate(similarities) if similarities else np.empty(0, dtype=np.float32)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return candidates[order], 1.0 - scores[order]
+
+    def close(self) -> None:
+        self._source.close()
+
+
+@dataclass
+class LocalMetadata:
+    distance: Optional[float] = None
+
+
+@dataclass
+class LocalObject:
+    """Shaped like the objects of a Weaviate ``near_vector`` response."""
+
+    uuid: uuid.UUID
+    properties: Dict[str, Any]
+    metadata: LocalMetadata
+    vector: Dict[str, List[float]] = field(default_factory=dict)
+
+
+@dataclass
+class LocalQueryReturn:
+    objects: List[LocalObject]
+
+
+@dataclass
+class _Tenancy:
+    enabled: bool = False
+
+
+@dataclass
+class _CollectionConfig:
+    name: str
+    description: str
+    multi_tenancy_config: _Tenancy = field(default_factory=_Tenancy)
+
+
+@dataclass
+class _AggregateReturn:
+    total_count: int
+
+
+class _LocalQuery:
+    def __init__(self, index: LocalVectorIndex, nprobe: int) -> None:
+        self._index = index
+        self._nprobe = nprobe
+
+    def near_vector(
+        self,
+        near_vector: Sequence[float],
+        limit: int,
+        offset: int = 0,
+        return_metadata: Any = None,
+        return_properties: Union[List[str], bool, None] = None,
+        include_vector: bool = False,
+    ) -> LocalQueryReturn:
+        positions, distances = self._index.search(near_vector, offset + limit, self._nprobe)
+        positions, distances = positions[offset:], distances[offset:]
+        if return_properties is False:
+            rows: List[Dict[str, Any]] = [{} for _ in positions]
+        else:
+            names = return_properties or [
+                name for name in self._index.table.column_names if name != _VECTOR_COLUMN
+            ]
+            names = [name for name in names if name in self._index.table.column_names]
+            rows = self._index.table.select(names).take(pa.array(self._index.rows[positions])).to_pylist()
+        return LocalQueryReturn(
+            objects=[
+                LocalObject(
+                    uuid=uuid.UUID(bytes=self._index.uuids[position].tobytes()),
+                    properties=properties,
+                    metadata=LocalMetadata(distance=float(distance)),
+                    vector={"default": self._index.vectors[position].tolist()} if include_vector else {},
+                )
+                for position, distance, properties in zip(positions, distances, rows)
+            ]
+        )
+
+
+class _LocalAggregate:
+    def __init__(self, index: LocalVectorIndex) -> None:
+        self._index = index
+
+    def over_all(self, total_count: bool = True) -> _AggregateReturn:
+        return _AggregateReturn(total_count=len(self._index.rows))
+
+
+class _LocalConfig:
+    def __init__(self, index: LocalVectorIndex) -> None:
+        self._index = index
+
+    def get(self) -> _CollectionConfig:
+        return _CollectionConfig(
+            name=self._index.meta["collection"], description=self._index.meta["description"]
+        )
+
+
+class LocalCollection:
+    """The subset of a Weaviate collection handle that ``DatasetGenerator`` uses."""
+
+    def __init__(self, index: LocalVectorIndex, nprobe: int) -> None:
+        self.name = index.meta["collection"]
+        self.query = _LocalQuery(index, nprobe)
+        self.aggregate = _LocalAggregate(index)
+        self.config = _LocalConfig(index)
+
+
+class _LocalCollections:
+    def __init__(self, collection: LocalCollection) -> None:
+        self._collection = collection
+
+    def get(self, name: str) -> LocalCollection:
+        if name != self._collection.name:
+            raise ValueError(f"The local index holds `{self._collection.name}`, not `{name}`.")
+        return self._collection
+
+    def list_all(self) -> Dict[str, Any]:
+        return {self._collection.name: self._collection.config.get()}
+
+
+class LocalClient:
+    """Stands in for the Weaviate client when ``retrieval_backend`` is ``local``."""
+
+    def __init__(self, directory: Path, nprobe: int) -> None:
+        started = time.perf_counter()
+        self.index = LocalVectorIndex(directory)
+        self.collections = _LocalCollections(LocalCollection(self.index, nprobe))
+        logger.info(
+            "Mapped local index %s (%d vectors, %d lists) in %.3fs",
+            directory,
+            len(self.index.rows),
+            self.index.lists,
+            time.perf_counter() - started,
+        )
+
+    def warm_up(self, collection_name: str) -> None:
+        # Fault the centroids and list offsets in; list pages load on first probe.
+        float(self.index.centroids.sum())
+
+    def stats(self) -> Dict[str, int]:
+        return {"vectors": len(self.index.rows), "lists": self.index.lists}
+
+    def close(self) -> None:
+        self.index.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build a local IVF index from a seed vector snapshot (seed `main.py --export-snapshot`)."
+    )
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--lists", type=int, help="Inverted lists (default: sqrt of the vector count).")
+    parser.add_argument("--iterations", type=int, default=10, help="k-means iterations.")
+    args = parser.parse_args()
+    stats = build_index(args.snapshot, args.directory, lists=args.lists, iterations=args.iterations)
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
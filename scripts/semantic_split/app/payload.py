@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import base64
+
+import pyarrow as pa
+
+# Written by the seed script with DEFAULT_PAYLOAD_COMPRESSION = "zstd":
+# "zstd:" followed by the base64 of a zstd frame. Plain values start with "[".
+ZSTD_PREFIX = "zstd:"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def decode_payload(value: str) -> str:
+    """Return a stored property value, decompressing it if the seed script compressed it."""
+    if not value.startswith(ZSTD_PREFIX):
+        return value
+    frame = base64.b64decode(value[len(ZSTD_PREFIX) :])
+    data = pa.decompress(
+        frame, decompressed_size=_frame_content_size(frame), codec="zstd", asbytes=True
+    )
+    return data.decode("utf-8")
+
+
+def _frame_content_size(frame: bytes) -> int:
+    # Arrow's decompressor needs the output size up front; one-shot zstd
+    # frames record it in the frame header (RFC 8878, section 3.1.1.1).
+    if frame[:4] != _ZSTD_MAGIC or len(frame) < 6:
+        raise ValueError("Not a zstd frame.")
+    descriptor = frame[4]
+    single_segment = descriptor >> 5 & 1
+    size_bytes = (1 if single_segment else 0, 2, 4, 8)[descriptor >> 6]
+    if not size_bytes:
+        raise ValueError("zstd frame does not record its content size.")
+    offset = 5 + (0 if single_segment else 1) + (0, 1, 2, 4)[descriptor & 3]
+    size = int.from_bytes(frame[offset : offset + size_bytes], "little")
+    return size + 256 if size_bytes == 2 else size
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+from openai import OpenAI
+
+from .embedding_cache import normalize_query
+
+_PROMPT = (
+    "A dataset of training examples will be retrieved by semantic search for the intent below. "
+    "Write {count} short search queries, one per line, that each cover a different sub-topic "
+    "of the intent. Reply with the queries only.\n\nIntent: {query}"
+)
+# "1. ", "- ", "* " and similar list markers the model may add anyway.
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+def expand_query(client: OpenAI, model: str, query: str, count: int) -> List[str]:
+    """Return ``query`` followed by up to ``count`` related sub-topic queries."""
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": _PROMPT.format(count=count, query=query)}],
+    )
+    content = response.choices[0].message.content or ""
+    queries = [query]
+    seen = {normalize_query(query).casefold()}
+    for line in content.splitlines():
+        candidate = _LIST_MARKER.sub("", line).strip().strip('"')
+        key = normalize_query(candidate).casefold()
+        if candidate and key not in seen:
+            seen.add(key)
+            queries.append(candidate)
+    return queries[: count + 1]
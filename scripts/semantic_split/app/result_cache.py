@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResult(BaseModel):
+    key: str
+    # Collection state the result was generated from; see ResultCache.
+    version: str
+    repo_id: str
+    row_count: int
+    queries: List[str]
+    retrieval: Dict[str, Any] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class ResultCache:
+    """Completed dataset generations, addressed by a request fingerprint.
+
+    ``key`` identifies what was asked (queries, limit, collection, embedding
+    model, selection settings); ``version`` identifies the collection state it
+    was answered from. A lookup whose version no longer matches drops the
+    entry, so a reseeded collection is searched again. With ``directory`` set
+    the index and a copy of each result's Parquet shards are kept there and
+    survive restarts; otherwise the index lives in memory and reuse copies
+    the files from the earlier dataset repo.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedResult] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidated": 0}
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def lookup(self, key: str, version: str) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                logger.info("Collection changed since %s was generated; dropping it", entry.repo_id)
+                self._drop(key)
+                self._stats["invalidated"] += 1
+                entry = None
+            self._stats["hits" if entry is not None else "misses"] += 1
+            return entry
+
+    def store(self, entry: CachedResult, shards: List[Path]) -> None:
+        with self._lock:
+            if self._directory is not None:
+                artifact_dir = self._directory / entry.key
+                shutil.rmtree(artifact_dir, ignore_errors=True)
+                artifact_dir.mkdir()
+                for path in shards:
+                    shutil.copy2(path, artifact_dir / path.name)
+            self._entries[entry.key] = entry
+            self._save()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self._stats["invalidated"] += 1
+
+    def artifacts(self, key: str) -> List[Path]:
+        """The stored Parquet shards of ``key``, or an empty list."""
+        if self._directory is None:
+            return []
+        return sorted((self._directory / key).glob("*.parquet"))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def _drop(self, key: str) -> None:
+        # Called with the lock held.
+        del self._entries[key]
+        if self._directory is not None:
+            shutil.rmtree(self._directory / key, ignore_errors=True)
+        self._save()
+
+    def _save(self) -> None:
+        # Called with the lock held.
+        if self._directory is None:
+            return
+        path = self._directory / "index.json"
+        payload = [entry.model_dump(mode="json") for entry in self._entries.values()]
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _load(self) -> None:
+        assert self._directory is not None
+        path = self._directory / "index.json"
+        if not path.exists():
+            return
+        try:
+            entries = [CachedResult.model_validate(item) for item in json.loads(path.read_text("utf-8"))]
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable result cache %s: %s", path, exc)
+            return
+        self._entries = {entry.key: entry for entry in entries}
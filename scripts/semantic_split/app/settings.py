@@ -1,14 +1,34 @@
 from functools import lru_cache
-from typing import Literal, Optional
+from pathlib import Path
+from typing import List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ConfigurationError(Exception):
+    """The service is not set up to answer a request; the fix is on the server."""
+
+
 class Settings(BaseSettings):
     """Runtime configuration loaded from environment variables."""
 
-    weaviate_url: str = Field(..., description="Base URL of the Weaviate cluster")
+    retrieval_backend: Literal["weaviate", "local"] = Field(
+        default="weaviate",
+        description="Search Weaviate, or a local index built from a seed snapshot with `python -m app.local_index`",
+    )
+    local_index_path: Optional[Path] = Field(
+        default=None,
+        description="Directory of the local vector index; required for the local retrieval backend",
+    )
+    local_index_nprobe: int = Field(
+        default=16,
+        ge=1,
+        description="Inverted lists the local index scans per query; more is slower and more accurate",
+    )
+    weaviate_url: Optional[str] = Field(
+        default=None, description="Base URL of the Weaviate cluster; required for the weaviate retrieval backend"
+    )
     weaviate_api_key: Optional[str] = Field(
         default=None, description="Optional API key for authenticating with Weaviate"
     )
@@ -19,10 +39,172 @@ class Settings(BaseSettings):
     weaviate_query_limit: int = Field(
         default=200,
         ge=1,
+        description=(
+            "Maximum number of rows to retrieve from Weaviate for a dataset; beyond "
+            "the server's QUERY_MAXIMUM_RESULTS (10000 by default) Weaviate rejects the query"
+        ),
+    )
+    weaviate_page_size: int = Field(
+        default=500,
+        ge=1,
         le=5000,
-        description="Maximum number of rows to retrieve from Weaviate for a dataset",
+        description="Rows fetched per near-vector request while paging through results",
+    )
+    weaviate_tenants: Optional[List[str]] = Field(
+        default=None,
+        description="Tenants to search in a multi-tenant collection (defaults to all of them)",
+    )
+    weaviate_pool_size: int = Field(
+        default=2,
+        ge=1,
+        description="Weaviate connections kept open; requests are spread over them",
+    )
+    weaviate_max_concurrent_requests: int = Field(
+        default=16,
+        ge=1,
+        description="Weaviate requests in flight at once across all jobs; further requests wait",
+    )
+    weaviate_health_check_seconds: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds between connection health checks; unready connections are replaced (0 disables)",
+    )
+    weaviate_query_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Near-vector requests in flight at once across queries, tenants and pages",
+    )
+    openai_api_key: Optional[str] = Field(
+        default=None,
+        description="API key for accessing OpenAI services; required for the openai embedding backend",
+    )
+    embedding_backend: Literal["openai", "local"] = Field(
+        default="openai",
+        description="Embedding backend used for queries when the collection does not record one",
+    )
+    embedding_model: str = Field(
+        default="text-embedding-3-large",
+        description="Embedding model used for queries when the collection does not record one",
+    )
+    embedding_dimensions: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Reduced embedding size for text-embedding-3-* models when the collection does not record one",
+    )
+    local_embedding_runtime: Literal["torch", "onnx"] = Field(
+        default="torch",
+        description="Runtime for the local sentence-transformers backend",
+    )
+    local_embedding_threads: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="CPU threads for the local embedding backend (defaults to all cores)",
+    )
+    query_embedding_cache_size: int = Field(
+        default=1024,
+        ge=1,
+        description="Query embeddings kept in memory, least recently used first out",
+    )
+    query_embedding_cache_ttl_seconds: float = Field(
+        default=86400.0,
+        gt=0,
+        description="Seconds a cached query embedding stays valid",
+    )
+    query_embedding_cache_path: Optional[Path] = Field(
+        default=None,
+        description="SQLite file that keeps query embeddings across restarts (in memory only when unset)",
+    )
+    query_expansion_count: int = Field(
+        default=0,
+        ge=0,
+        description="Related sub-topic queries an OpenAI chat model adds to a single-query request (0 disables expansion)",
+    )
+    query_expansion_model: str = Field(
+        default="gpt-4o-mini",
+        description="OpenAI chat model used for query expansion",
+    )
+    query_fusion: Literal["distance", "rrf"] = Field(
+        default="distance",
+        description="How hits of several queries are merged: by vector distance, or by reciprocal rank",
+    )
+    row_selection: Literal["limit", "adaptive"] = Field(
+        default="limit",
+        description=(
+            "How many rows a dataset gets: always weaviate_query_limit, or as many as stay "
+            "relevant, cut where the hits' distances cross adaptive_max_distance or bend sharply upwards"
+        ),
+    )
+    adaptive_min_rows: int = Field(
+        default=20,
+        ge=1,
+        description="Fewest rows an adaptive cut-off keeps; weaviate_query_limit is the most",
+    )
+    adaptive_max_distance: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=2.0,
+        description="Vector distance beyond which adaptive selection stops (unset: no threshold)",
+    )
+    adaptive_knee: bool = Field(
+        default=True,
+        description="Cut adaptive selection at the knee of the distance curve, where relevance drops off",
+    )
+    mmr_rows: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Rows kept by maximal-marginal-relevance selection from the weaviate_query_limit "
+            "nearest candidates (unset keeps every candidate)"
+        ),
+    )
+    mmr_lambda: float = Field(
+        default=0.5,
+        ge=0.0,
+        le=1.0,
+        description="MMR trade-off: 1 ranks by relevance only, lower values favour diverse rows",
+    )
+    dataset_row_group_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Rows per Parquet row group in published datasets",
+    )
+    dataset_shard_rows: int = Field(
+        default=500_000,
+        ge=1,
+        description="Rows per Parquet file; larger datasets are split into several files",
+    )
+    dataset_compression_level: int = Field(
+        default=3,
+        ge=1,
+        le=22,
+        description="zstd level of published Parquet files",
+    )
+    result_cache_dir: Optional[Path] = Field(
+        default=None,
+        description=(
+            "Directory keeping the result cache index and a copy of each dataset's Parquet files "
+            "(in memory only when unset; reuse then copies files from the earlier repo)"
+        ),
+    )
+    dataset_job_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Dataset generation jobs that run at the same time; later jobs wait in a queue",
+    )
+    dataset_job_history: int = Field(
+        default=1000,
+        ge=1,
+        description="Jobs kept for GET /datasets/{job_id}; the oldest finished ones are dropped first",
+    )
+    dataset_job_store_path: Optional[Path] = Field(
+        default=None,
+        description="JSON file that keeps job state and results across restarts (in memory only when unset)",
+    )
+    huggingface_upload_concurrency: int = Field(
+        default=2,
+        ge=1,
+        description="Jobs allowed to upload to Hugging Face at the same time",
     )
-    openai_api_key: str = Field(..., description="API key for accessing OpenAI services")
 
     huggingface_token: str = Field(
         ..., description="User or service token with write access to the organisation"
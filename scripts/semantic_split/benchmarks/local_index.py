@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""Latency and recall of the local IVF index against exact search and Weaviate.
+
+Builds a local index from a seed snapshot (``--snapshot``, written by the seed
+script's ``--export-snapshot``) or from synthetic clustered vectors, maps it
+the way the service does at start-up, and runs ``--queries`` searches of
+``--limit`` hits at every ``--nprobe`` value. Recall is measured against an
+exact scan of the same vectors. With ``--weaviate-url`` the same queries also
+run against the live collection the snapshot came from, which gives the
+remote round-trip latency and how many of Weaviate's hits the local index
+returns.
+
+Run from the semantic_split directory:
+
+    python -m benchmarks.local_index --rows 200000 --dims 1024 --nprobe 4 16 64
+    python -m benchmarks.local_index --snapshot ../seed/snapshot.arrow \\
+        --weaviate-url https://cluster.weaviate.cloud --weaviate-api-key ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+from app.local_index import LocalClient, build_index
+
+
+def write_synthetic_snapshot(path: Path, rows: int, dims: int, clusters: int, seed: int) -> None:
+    """A seed-format snapshot of clustered random vectors, like topic-grouped embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dims), dtype=np.float32)
+    schema = pa.schema(
+        [("input", pa.string()), ("output_reference", pa.string()), ("vector", pa.list_(pa.float32(), dims))],
+        metadata={
+            b"seed.format": b"1",
+            b"seed.collection": b"DatasetEntry",
+            b"seed.description": b"Synthetic vectors",
+            b"seed.dimensions": str(dims).encode("ascii"),
+        },
+    )
+    with pa.ipc.new_file(str(path), schema) as writer:
+        for start in range(0, rows, 10_000):
+            count = min(10_000, rows - start)
+            vectors = centres[rng.integers(clusters, size=count)]
+            vectors = vectors + 0.5 * rng.standard_normal((count, dims), dtype=np.float32)
+            ids = [str(start + row) for row in range(count)]
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(ids),
+                        pa.array(ids),
+                        pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), dims),
+                    ],
+                    schema=schema,
+                )
+            )
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+    }
+
+
+def run(
+    client: LocalClient, queries: np.ndarray, limit: int, nprobe: int, exact: List[set]
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for query, truth in zip(queries, exact):
+        started = time.perf_counter()
+        positions, _ = client.index.search(query, limit, nprobe)
+        latencies.append(time.perf_counter() - started)
+        recalls.append(len(truth.intersection(positions.tolist())) / max(1, len(truth)))
+    return {"nprobe": nprobe, "recall": round(float(np.mean(recalls)), 4), **percentiles(latencies)}
+
+
+def compare_weaviate(args: argparse.Namespace, client: LocalClient, queries: np.ndarray) -> Dict[str, Any]:
+    import weaviate
+    from weaviate.classes.init import Auth
+
+    remote = weaviate.connect_to_weaviate_cloud(
+        cluster_url=args.weaviate_url,
+        auth_credentials=Auth.api_key(args.weaviate_api_key) if args.weaviate_api_key else None,
+    )
+    try:
+        collection = remote.collections.get(client.index.meta["collection"])
+        local = client.collections.get(client.index.meta["collection"])
+        latencies: List[float] = []
+        overlaps: List[float] = []
+        for query in queries:
+            started = time.perf_counter()
+            remote_hits = collection.query.near_vector(near_vector=query.tolist(), limit=args.limit).objects
+            latencies.append(time.perf_counter() - started)
+            local_hits = local.query.near_vector(near_vector=query, limit=args.limit).objects
+            expected = {str(obj.uuid) for obj in remote_hits}
+            overlaps.append(
+                len(expected.intersection(str(obj.uuid) for obj in local_hits)) / max(1, len(expected))
+            )
+    finally:
+        remote.close()
+    return {"recall_vs_weaviate": round(float(np.mean(overlaps)), 4), **percentiles(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", type=Path, help="Seed snapshot to index (default: synthetic vectors).")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic vectors.")
+    parser.add_argument("--dims", type=int, default=1024, help="Synthetic vector size.")
+    parser.add_argument("--clusters", type=int, default=200, help="Topics of the synthetic vectors.")
+    parser.add_argument("--lists", type=int, help="Inverted lists (default: sqrt of the vector count).")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=200, help="Hits per query.")
+    parser.add_argument("--weaviate-url", help="Also query this Weaviate cluster for comparison.")
+    parser.add_argument("--weaviate-api-key")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = args.snapshot
+        if snapshot is None:
+            snapshot = Path(directory) / "snapshot.arrow"
+            write_synthetic_snapshot(snapshot, args.rows, args.dims, args.clusters, seed=0)
+        stats = build_index(snapshot, Path(directory) / "index", lists=args.lists)
+        print(stats.summary())
+        results["build_seconds"] = round(stats.seconds, 2)
+
+        started = time.perf_counter()
+        client = LocalClient(Path(directory) / "index", nprobe=args.nprobe[0])
+        results["load_seconds"] = round(time.perf_counter() - started, 4)
+        print(f"Mapped the index in {results['load_seconds'] * 1000:.1f} ms.")
+
+        rng = np.random.default_rng(1)
+        picks = rng.choice(stats.rows, size=min(args.queries, stats.rows), replace=False)
+        queries = np.asarray(client.index.vectors[np.sort(picks)])
+        queries = queries + 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+        started = time.perf_counter()
+        exact = [set(client.index.search(query, args.limit, client.index.lists)[0].tolist()) for query in queries]
+        exact_ms = (time.perf_counter() - started) / len(queries) * 1000
+        print(f"Exact scan: {exact_ms:.2f} ms per query over {stats.rows} vectors.")
+        results["exact_ms"] = round(exact_ms, 2)
+
+        print(f"{'nprobe':>6} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        results["ivf"] = []
+        for nprobe in args.nprobe:
+            row = run(client, queries, args.limit, nprobe, exact)
+            results["ivf"].append(row)
+            print(f"{nprobe:>6} {row['recall']:>7.3f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+        if args.weaviate_url:
+            results["weaviate"] = compare_weaviate(args, client, queries)
+            print(
+                f"Weaviate: p50 {results['weaviate']['p50_ms']} ms, p95 {results['weaviate']['p95_ms']} ms; "
+                f"local index (nprobe={args.nprobe[0]}) returned "
+                f"{results['weaviate']['recall_vs_weaviate']:.1%} of its hits."
+            )
+        client.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"arguments": vars(args), "results": results}, handle, indent=2, default=str)
+        print(f"Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
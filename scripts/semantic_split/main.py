@@ -1,52 +1,143 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from datetime import datetime
 from functools import lru_cache
+from typing import AsyncIterator, List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import Depends, FastAPI, HTTPException, status
+from pydantic import BaseModel, Field, model_validator
 
-from app.dataset_generator import DatasetGenerator, build_weaviate_client
+from app.dataset_generator import DatasetGenerator, build_retrieval_client
+from app.jobs import Job, JobManager
 from app.settings import get_settings
 
 
 class DatasetRequest(BaseModel):
-    query: str = Field(..., description="Semantic concept to search for in Weaviate")
+    query: Optional[str] = Field(default=None, description="Semantic concept to search for in Weaviate")
+    queries: Optional[List[str]] = Field(
+        default=None,
+        description="Several related concepts to search for; their hits are merged and deduplicated",
+    )
     uuid: str = Field(..., description="Model UUID used to name the Hugging Face dataset")
 
+    @model_validator(mode="after")
+    def _require_query(self) -> "DatasetRequest":
+        if not self.all_queries():
+            raise ValueError("Provide `query` or a non-empty `queries` list.")
+        return self
+
+    def all_queries(self) -> List[str]:
+        queries = ([self.query] if self.query else []) + list(self.queries or [])
+        return [query for query in queries if query.strip()]
+
 
-class DatasetResponse(BaseModel):
-    repo_id: str
-    row_count: int
+class DatasetJobResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    progress: float
     query: str
+    queries: List[str]
+    repo_id: Optional[str] = None
+    row_count: Optional[int] = None
+    selection_seconds: Optional[float] = None
+    data_bytes: Optional[int] = None
+    publish_seconds: Optional[float] = None
+    reused_from: Optional[str] = None
+    error_kind: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_job(cls, job: Job) -> "DatasetJobResponse":
+        return cls(
+            job_id=job.id,
+            status=job.status,
+            stage=job.stage,
+            progress=job.progress,
+            query=job.query,
+            queries=job.queries or [job.query],
+            repo_id=job.repo_id,
+            row_count=job.row_count,
+            selection_seconds=job.selection_seconds,
+            data_bytes=job.data_bytes,
+            publish_seconds=job.publish_seconds,
+            reused_from=job.reused_from,
+            error_kind=job.error_kind,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Connect and warm up before the first request, not during it.
+    generator = _get_cached_generator()
+    generator.warm_up()
+    yield
+    if _get_cached_job_manager.cache_info().currsize:
+        _get_cached_job_manager().shutdown()
+    generator.close()
+    _get_cached_job_manager.cache_clear()
+    _get_cached_generator.cache_clear()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Semantic Split Dataset Generator",
         description="Generates semantic datasets from Weaviate and publishes them to Hugging Face",
+        lifespan=_lifespan,
     )
 
     @app.get("/healthz", tags=["health"])
     def healthcheck() -> dict[str, str]:
         return {"status": "ok"}
 
-    @app.post("/datasets", response_model=DatasetResponse, tags=["datasets"])
+    @app.get("/stats/embedding-cache", tags=["health"])
+    def embedding_cache_stats(
+        generator: DatasetGenerator = Depends(_generator_dependency),
+    ) -> dict[str, float]:
+        return generator.embedding_cache_stats()
+
+    @app.get("/stats/weaviate", tags=["health"])
+    def weaviate_stats(
+        generator: DatasetGenerator = Depends(_generator_dependency),
+    ) -> dict[str, int]:
+        return generator.client_stats()
+
+    @app.get("/stats/result-cache", tags=["health"])
+    def result_cache_stats(
+        generator: DatasetGenerator = Depends(_generator_dependency),
+    ) -> dict[str, int]:
+        return generator.result_cache_stats()
+
+    @app.post(
+        "/datasets",
+        response_model=DatasetJobResponse,
+        status_code=status.HTTP_202_ACCEPTED,
+        tags=["datasets"],
+    )
     def create_dataset(
         payload: DatasetRequest,
-        generator: DatasetGenerator = Depends(_generator_dependency),
-    ) -> DatasetResponse:
-        try:
-            result = generator.generate(query=payload.query, model_uuid=payload.uuid)
-        except ValueError as exc:
-            raise HTTPException(status_code=404, detail=str(exc)) from exc
-        except RuntimeError as exc:
-            raise HTTPException(status_code=502, detail=str(exc)) from exc
-
-        return DatasetResponse(
-            repo_id=result.repo_id,
-            row_count=result.row_count,
-            query=result.query,
-        )
+        jobs: JobManager = Depends(_job_manager_dependency),
+    ) -> DatasetJobResponse:
+        job = jobs.submit(queries=payload.all_queries(), model_uuid=payload.uuid)
+        return DatasetJobResponse.from_job(job)
+
+    @app.get("/datasets/{job_id}", response_model=DatasetJobResponse, tags=["datasets"])
+    def get_dataset_job(
+        job_id: str,
+        jobs: JobManager = Depends(_job_manager_dependency),
+    ) -> DatasetJobResponse:
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown dataset job `{job_id}`")
+        return DatasetJobResponse.from_job(job)
 
     return app
 
@@ -54,7 +145,7 @@ def create_app() -> FastAPI:
 @lru_cache(maxsize=1)
 def _get_cached_generator() -> DatasetGenerator:
     settings = get_settings()
-    client = build_weaviate_client(settings)
+    client = build_retrieval_client(settings)
     return DatasetGenerator(client, settings)
 
 
@@ -62,6 +153,21 @@ def _generator_dependency() -> DatasetGenerator:
     return _get_cached_generator()
 
 
+@lru_cache(maxsize=1)
+def _get_cached_job_manager() -> JobManager:
+    settings = get_settings()
+    return JobManager(
+        _get_cached_generator(),
+        workers=settings.dataset_job_workers,
+        history=settings.dataset_job_history,
+        store_path=settings.dataset_job_store_path,
+    )
+
+
+def _job_manager_dependency() -> JobManager:
+    return _get_cached_job_manager()
+
+
 app = create_app()
 
 
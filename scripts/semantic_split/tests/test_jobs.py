@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from app.dataset_generator import DatasetGenerator, build_retrieval_client
+from app.jobs import Job, JobManager
+from app.local_index import build_index
+from app.settings import Settings
+from benchmarks.local_index import write_synthetic_snapshot
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 10.0) -> Job:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        assert job is not None
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_missing_openai_key_fails_job_as_configuration_error(tmp_path: Path) -> None:
+    # The synthetic collection records no embedding backend, so queries are
+    # embedded with OpenAI, which needs a key the service does not have.
+    write_synthetic_snapshot(tmp_path / "snapshot.arrow", rows=64, dims=8, clusters=4, seed=0)
+    build_index(tmp_path / "snapshot.arrow", tmp_path / "index")
+    settings = Settings(
+        _env_file=None,
+        huggingface_token="token",
+        huggingface_org="org",
+        retrieval_backend="local",
+        local_index_path=tmp_path / "index",
+        openai_api_key=None,
+    )
+    generator = DatasetGenerator(build_retrieval_client(settings), settings)
+    manager = JobManager(generator, workers=1, history=10)
+    try:
+        job = _wait(manager, manager.submit(["cardiology"], "model").id)
+    finally:
+        manager.shutdown()
+        generator.close()
+
+    assert job.status == "failed"
+    assert job.error_kind == "configuration"
+    assert "OPENAI_API_KEY" in (job.error or "")